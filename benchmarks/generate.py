@@ -0,0 +1,128 @@
+"""Synthetic calendar CSV generator for benchmarks.
+
+Produces CSV files in the format read by :func:`~src.utils.ical.csv_to_ical`
+with a configurable number of rows, mix of timezones, share of all-day
+events and number of distinct addresses.  Output is fully determined by
+the parameters and the random seed, so runs are comparable across
+releases.
+
+Usage::
+
+    python -m benchmarks.generate data/synthetic.csv --rows 10000 --all-day-ratio 0.2
+"""
+
+import argparse
+import csv
+import random
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+
+FIELDNAMES = ["date", "time", "duration", "location_name", "location", "place", "name", "description", "timezone"]
+
+DEFAULT_TIMEZONES = ("Europe/Berlin", "Europe/London", "America/New_York", "Asia/Tokyo", "UTC")
+
+_STREETS = ("Hauptstraße", "Bahnhofstraße", "Gartenweg", "Schillerplatz", "Lindenallee", "Marktplatz")
+_CITIES = (("10115", "Berlin"), ("20095", "Hamburg"), ("80331", "München"), ("50667", "Köln"), ("60311", "Frankfurt"))
+_WORDS = ("Meetup", "Workshop", "Konzert", "Lesung", "Treffen", "Sprint", "Review", "Café", "Vortrag", "Übung")
+
+
+@dataclass(frozen=True)
+class CalendarSpec:
+    """Parameters of a synthetic calendar.
+
+    Attributes:
+        rows: Number of events.
+        timezones: IANA zones; each event gets one chosen uniformly at
+            random.
+        all_day_ratio: Fraction of events that are all-day (``"<N>d"``
+            durations).
+        addresses: Number of distinct addresses; ``0`` leaves every
+            event without a location.
+        start: Date of the earliest event.
+        span_days: Events are spread uniformly over this many days.
+        seed: Random seed.
+    """
+
+    rows: int = 1000
+    timezones: tuple[str, ...] = DEFAULT_TIMEZONES
+    all_day_ratio: float = 0.1
+    addresses: int = 50
+    start: date = date(2024, 1, 1)
+    span_days: int = 730
+    seed: int = 0
+
+
+def make_addresses(count: int, seed: int = 0) -> list[str]:
+    """Return *count* distinct, plausible street addresses."""
+    rng = random.Random(f"addresses-{seed}")
+    addresses = []
+    for i in range(count):
+        postcode, city = rng.choice(_CITIES)
+        addresses.append(f"{rng.choice(_STREETS)} {i + 1} {postcode} {city}")
+    return addresses
+
+
+def generate_rows(spec: CalendarSpec) -> list[dict[str, str]]:
+    """Generate the CSV rows described by *spec*."""
+    rng = random.Random(spec.seed)
+    addresses = make_addresses(spec.addresses, spec.seed)
+    rows = []
+    for i in range(spec.rows):
+        day = spec.start + timedelta(days=rng.randrange(spec.span_days))
+        all_day = rng.random() < spec.all_day_ratio
+        if all_day:
+            time_str, duration = "00:00", f"{rng.randint(1, 3)}d"
+        else:
+            time_str = f"{rng.randrange(7, 22):02}:{rng.choice((0, 15, 30, 45)):02}"
+            duration = rng.choice(("30min", "45min", "90min", "1h", "2h", "3h"))
+        title = f"{rng.choice(_WORDS)} {i}"
+        rows.append(
+            {
+                "date": day.strftime("%d.%m.%Y"),
+                "time": time_str,
+                "duration": duration,
+                "location_name": rng.choice(("", f"Saal {rng.randint(1, 9)}")),
+                "location": rng.choice(addresses) if addresses else "",
+                "place": "Germany",
+                "name": title,
+                "description": " ".join(rng.choices(_WORDS, k=rng.randint(3, 20))),
+                "timezone": rng.choice(spec.timezones),
+            }
+        )
+    return rows
+
+
+def write_calendar(path: Path, spec: CalendarSpec) -> Path:
+    """Write the calendar described by *spec* to *path* and return *path*."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(generate_rows(spec))
+    return path
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic calendar CSV.")
+    parser.add_argument("output", type=Path, help="CSV file to write")
+    parser.add_argument("--rows", type=int, default=CalendarSpec.rows)
+    parser.add_argument("--timezones", default=",".join(DEFAULT_TIMEZONES), help="comma-separated IANA zones")
+    parser.add_argument("--all-day-ratio", type=float, default=CalendarSpec.all_day_ratio)
+    parser.add_argument("--addresses", type=int, default=CalendarSpec.addresses)
+    parser.add_argument("--seed", type=int, default=CalendarSpec.seed)
+    args = parser.parse_args(argv)
+
+    spec = CalendarSpec(
+        rows=args.rows,
+        timezones=tuple(args.timezones.split(",")),
+        all_day_ratio=args.all_day_ratio,
+        addresses=args.addresses,
+        seed=args.seed,
+    )
+    write_calendar(args.output, spec)
+    print(f"Wrote {spec.rows} events to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
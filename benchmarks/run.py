@@ -0,0 +1,326 @@
+"""Benchmark suite for the CSV-to-iCal pipeline.
+
+Runs micro-benchmarks for the individual render stages and an
+end-to-end load benchmark against the ASGI app, on synthetic calendars
+from :mod:`benchmarks.generate`.  Geocoding is stubbed locally: every
+synthetic address is written to a throwaway geocode store beforehand,
+so renders include ``GEO`` properties without any network access.
+
+Results are written as JSON so runs can be compared across releases::
+
+    python -m benchmarks.run --rows 5000 --output results.json
+    python -m benchmarks.run --rows 5000 --compare results.json
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tomllib
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import UTC, datetime
+from pathlib import Path
+
+import httpx
+
+from benchmarks.generate import CalendarSpec, make_addresses, write_calendar
+from src.main import app
+from src.models import CSVEntry
+from src.settings import settings
+from src.utils.cache import render_cache
+from src.utils.compression import compress_variants
+from src.utils.fragments import fragment_cache
+from src.utils.geostore import get_geocode_store
+from src.utils.ical import _build_event, _read_entries, _write_event, csv_to_ical, event_coordinates
+from src.utils.ingest import read_columns, validate_columns, validate_rows
+from src.utils.location import format_address
+from src.utils.serializer import ICalWriter
+from src.utils.snapshot import compile_snapshot, load_snapshot
+from src.utils.time import event_times, parse_duration
+from src.utils.window import build_index
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@contextmanager
+def override_settings(**values) -> Iterator[None]:
+    """Temporarily replace attributes of the global settings object."""
+    previous = {name: getattr(settings, name) for name in values}
+    for name, value in values.items():
+        setattr(settings, name, value)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            setattr(settings, name, value)
+
+
+def _summary(name: str, group: str, samples: list[float], ops: int, **extra) -> dict:
+    """Summarise per-operation timings in seconds."""
+    median = statistics.median(samples)
+    return {
+        "name": name,
+        "group": group,
+        "samples": len(samples),
+        "ops_per_sample": ops,
+        "min": min(samples),
+        "median": median,
+        "mean": statistics.fmean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "ops_per_sec": 1 / median if median else None,
+        **extra,
+    }
+
+
+def measure(name: str, group: str, func: Callable[[], object], *, repeat: int = 5, number: int = 1) -> dict:
+    """Time *func*, reporting the per-call duration of each of *repeat* samples."""
+    func()  # warm-up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+    return _summary(name, group, samples, number)
+
+
+def seed_geocode_store(spec: CalendarSpec) -> None:
+    """Store deterministic coordinates for every address used by *spec*."""
+    store = get_geocode_store()
+    for i, address in enumerate(make_addresses(spec.addresses, spec.seed)):
+        store.put(format_address(address, "Germany"), (52.0 + i * 1e-3, 13.0 + i * 1e-3))
+
+
+def stage_benchmarks(csv_path: Path, repeat: int) -> list[dict]:
+    """Micro-benchmarks of the individual render stages."""
+    results = []
+    with override_settings(snapshot_enabled=False):
+        entries: list[CSVEntry] = list(_read_entries(csv_path))
+    rows = len(entries)
+    durations = [entry.duration for entry in entries]
+
+    results.append(measure("parse_duration", "stage", lambda: [parse_duration(d) for d in durations], repeat=repeat))
+    results.append(measure("event_times", "stage", lambda: [event_times(e) for e in entries], repeat=repeat))
+    coords = [event_coordinates(e) for e in entries]
+    now = datetime.now(UTC)
+    results.append(
+        measure(
+            "_build_event",
+            "stage",
+            lambda: [_build_event(e, "bench", c, now) for e, c in zip(entries, coords)],
+            repeat=repeat,
+        )
+    )
+
+    def write_all() -> None:
+        writer = ICalWriter()
+        for entry, coord in zip(entries, coords):
+            _write_event(writer, entry, "bench", coord, now)
+        writer.getvalue()
+
+    results.append(measure("_write_event", "stage", write_all, repeat=repeat))
+
+    with override_settings(snapshot_enabled=False):
+        results.append(measure("csv_parse", "stage", lambda: list(_read_entries(csv_path)), repeat=repeat))
+    with open(csv_path, encoding="utf-8") as f:
+        raw_rows = list(csv.DictReader(f))
+    results.append(measure("ingest[per_row]", "stage", lambda: [CSVEntry(**row) for row in raw_rows], repeat=repeat))
+    results.append(
+        measure("ingest[columns]", "stage", lambda: validate_columns(raw_rows, csv_path.name), repeat=repeat)
+    )
+    results.append(measure("ingest[entries]", "stage", lambda: validate_rows(raw_rows, csv_path.name), repeat=repeat))
+    results.append(measure("read_columns", "stage", lambda: read_columns(csv_path), repeat=repeat))
+    results.append(measure("compile_snapshot", "stage", lambda: compile_snapshot(csv_path), repeat=repeat))
+    results.append(measure("load_snapshot", "stage", lambda: list(load_snapshot(csv_path).entries()), repeat=repeat))
+
+    with override_settings(snapshot_enabled=True):
+        results.append(measure("build_index", "stage", lambda: build_index(csv_path), repeat=repeat))
+
+    for serializer in ("icalendar", "fast"):
+        for snapshot in (False, True):
+            with override_settings(ical_serializer=serializer, snapshot_enabled=snapshot, fragment_cache_max_bytes=0):
+                label = f"csv_to_ical[{serializer}{',snapshot' if snapshot else ''}]"
+                results.append(measure(label, "render", lambda: csv_to_ical(csv_path, "bench"), repeat=repeat))
+
+    # Rebuild with every event already in the fragment cache, as after editing one row.
+    fragment_cache.clear()
+    with override_settings(ical_serializer="fast", snapshot_enabled=True):
+        csv_to_ical(csv_path, "bench")
+        label = "csv_to_ical[fast,snapshot,fragments]"
+        results.append(measure(label, "render", lambda: csv_to_ical(csv_path, "bench"), repeat=repeat))
+
+    with override_settings(ical_serializer="fast"):
+        payload = csv_to_ical(csv_path, "bench")
+    results.append(measure("compress_variants", "render", lambda: compress_variants(payload), repeat=repeat))
+
+    for result in results:
+        result["rows"] = rows
+    return results
+
+
+async def _load(client: httpx.AsyncClient, path: str, requests: int, concurrency: int, cold: bool) -> dict:
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    remaining = iter(range(requests))
+
+    async def worker() -> None:
+        for _ in remaining:
+            if cold:
+                render_cache.clear()
+                fragment_cache.clear()
+            start = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "throughput_rps": requests / elapsed,
+        "p50": latencies[len(latencies) // 2],
+        "p90": latencies[int(len(latencies) * 0.9)],
+        "p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        "statuses": {str(code): count for code, count in statuses.items()},
+        "latencies": latencies,
+    }
+
+
+def http_benchmarks(name: str, requests: int, concurrency: int) -> list[dict]:
+    """End-to-end load benchmark of ``GET /{name}.ics`` through the ASGI app."""
+
+    async def run() -> list[dict]:
+        results = []
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for label, path, cold, headers in (
+                ("http_cold", f"/{name}.ics", True, {}),
+                ("http_warm", f"/{name}.ics", False, {}),
+                ("http_warm_gzip", f"/{name}.ics", False, {"Accept-Encoding": "gzip"}),
+            ):
+                client.headers.clear()
+                client.headers.update(headers or {"Accept-Encoding": "identity"})
+                count = max(1, requests // 10) if cold else requests
+                stats = await _load(client, path, count, 1 if cold else concurrency, cold)
+                latencies = stats.pop("latencies")
+                results.append(_summary(label, "http", latencies, 1, **stats))
+        return results
+
+    return asyncio.run(run())
+
+
+def _metadata() -> dict:
+    with open(ROOT / "pyproject.toml", "rb") as f:
+        version = tomllib.load(f)["project"]["version"]
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "version": version,
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+    }
+
+
+def run_suite(spec: CalendarSpec, *, repeat: int = 5, requests: int = 200, concurrency: int = 8) -> dict:
+    """Run every benchmark on a calendar generated from *spec* and return the results document."""
+    with tempfile.TemporaryDirectory(prefix="ical-bench-") as tmp:
+        data_dir = Path(tmp)
+        with override_settings(
+            data_dir=data_dir,
+            geocode_cache_path=data_dir / "geocode.sqlite3",
+            geocode_enabled=True,
+            watch_enabled=False,
+            stream_threshold_bytes=0,
+        ):
+            csv_path = write_calendar(data_dir / "bench.csv", spec)
+            seed_geocode_store(spec)
+            render_cache.clear()
+            results = stage_benchmarks(csv_path, repeat)
+            results += http_benchmarks("bench", requests, concurrency)
+            render_cache.clear()
+
+    return {
+        "meta": _metadata(),
+        "params": {
+            "rows": spec.rows,
+            "timezones": list(spec.timezones),
+            "all_day_ratio": spec.all_day_ratio,
+            "addresses": spec.addresses,
+            "seed": spec.seed,
+            "repeat": repeat,
+            "requests": requests,
+            "concurrency": concurrency,
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict) -> list[tuple[str, float, float, float]]:
+    """Return ``(name, baseline_median, current_median, ratio)`` for benchmarks present in both runs."""
+    previous = {result["name"]: result for result in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        before = previous.get(result["name"])
+        if before is not None and before["median"]:
+            rows.append((result["name"], before["median"], result["median"], result["median"] / before["median"]))
+    return rows
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the CSV-to-iCal pipeline.")
+    parser.add_argument("--rows", type=int, default=CalendarSpec.rows)
+    parser.add_argument("--timezones", default=",".join(CalendarSpec.timezones), help="comma-separated IANA zones")
+    parser.add_argument("--all-day-ratio", type=float, default=CalendarSpec.all_day_ratio)
+    parser.add_argument("--addresses", type=int, default=CalendarSpec.addresses)
+    parser.add_argument("--seed", type=int, default=CalendarSpec.seed)
+    parser.add_argument("--repeat", type=int, default=5, help="samples per micro-benchmark")
+    parser.add_argument("--requests", type=int, default=200, help="requests per HTTP benchmark")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--output", type=Path, help="write JSON results to this file")
+    parser.add_argument("--compare", type=Path, help="baseline JSON results to compare against")
+    args = parser.parse_args(argv)
+
+    spec = CalendarSpec(
+        rows=args.rows,
+        timezones=tuple(args.timezones.split(",")),
+        all_day_ratio=args.all_day_ratio,
+        addresses=args.addresses,
+        seed=args.seed,
+    )
+    document = run_suite(spec, repeat=args.repeat, requests=args.requests, concurrency=args.concurrency)
+
+    for result in document["results"]:
+        print(f"{result['name']:<40} median {result['median'] * 1e3:10.3f} ms", file=sys.stderr)
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        print(f"\nCompared with {args.compare}:", file=sys.stderr)
+        for name, before, after, ratio in compare(document, baseline):
+            print(f"{name:<40} {before * 1e3:10.3f} -> {after * 1e3:10.3f} ms  ({ratio:5.2f}x)", file=sys.stderr)
+
+    if args.output:
+        args.output.write_text(json.dumps(document, indent=2) + "\n")
+    else:
+        json.dump(document, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
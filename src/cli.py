@@ -0,0 +1,227 @@
+"""Command-line tools for operating the calendar server.
+
+Usage::
+
+    python -m src.cli geocode [--data-dir DIR] [--dry-run]
+    python -m src.cli export OUTPUT_DIR [--data-dir DIR] [--workers N] [--force]
+
+``geocode``
+    Warms the persistent geocode store before going live.  Every CSV in
+    the data directory is scanned for the distinct addresses its events
+    use, and only the addresses the store does not know yet are resolved,
+    under the same ``GEOCODE_RATE_LIMIT`` / ``GEOCODE_BURST`` limits as
+    the server's background geocoder.  Progress is reported on stderr,
+    and the command exits with status 1 if any CSV could not be read or
+    any lookup failed; failed lookups are not stored and are retried on
+    the next run.
+
+``export``
+    Renders every calendar into ``OUTPUT_DIR`` as ``.ics`` files with
+    pre-compressed variants and a ``manifest.json`` of content hashes,
+    for nginx or a CDN to serve without running the application (see
+    :mod:`src.utils.export`).  Unchanged calendars are skipped; the
+    command exits with status 1 if any calendar failed to export.
+
+``--data-dir`` replaces ``DATA_DIR`` for the run, so the geocode store
+defaults to ``DIR/.cache/geocode.sqlite3`` unless ``CACHE_DIR`` or
+``GEOCODE_CACHE_PATH`` point elsewhere.
+"""
+
+import argparse
+import asyncio
+import sys
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import httpx
+from pydantic import ValidationError
+
+from src.settings import settings
+from src.utils.export import export_calendars
+from src.utils.geocoder import AsyncGeocoder, GeocodingError
+from src.utils.geoqueue import TokenBucket
+from src.utils.geostore import get_geocode_store
+from src.utils.ingest import iter_csv_entries
+from src.utils.location import format_address
+
+
+@dataclass
+class GeocodeReport:
+    """Outcome of a :func:`warm_geocode_store` run.
+
+    Attributes:
+        known: Addresses that were already in the store.
+        found: Addresses resolved to coordinates.
+        not_found: Addresses the geocoder does not know.
+        failed: Addresses whose lookup failed, with the error message.
+    """
+
+    known: int = 0
+    found: int = 0
+    not_found: int = 0
+    failed: dict[str, str] = field(default_factory=dict)
+
+
+def collect_addresses(data_dir: Path) -> tuple[set[str], dict[str, str]]:
+    """Return the distinct event addresses used by the calendars in *data_dir*.
+
+    Addresses are formatted exactly as rendering formats them, so they
+    match the keys looked up in the geocode store.
+
+    Returns:
+        A ``(addresses, errors)`` tuple; ``errors`` maps the name of each
+        CSV file that could not be read or validated to the reason.
+    """
+    addresses: set[str] = set()
+    errors: dict[str, str] = {}
+    for csv_path in sorted(data_dir.glob("*.csv")):
+        try:
+            addresses.update(format_address(e.location, e.place) for e in iter_csv_entries(csv_path) if e.location)
+        except (OSError, UnicodeDecodeError, ValidationError) as e:
+            errors[csv_path.name] = str(e)
+    return addresses, errors
+
+
+async def warm_geocode_store(
+    addresses: Iterable[str],
+    geocoder: AsyncGeocoder | None = None,
+    progress: Callable[[int, int, str, str], None] = lambda done, total, address, outcome: None,
+) -> GeocodeReport:
+    """Geocode every address in *addresses* the store does not know yet.
+
+    Requests are started no faster than ``settings.geocode_rate_limit``
+    per second, with at most ``settings.geocode_max_connections`` in
+    flight.
+
+    Args:
+        addresses: Addresses to make sure are stored.
+        geocoder: The geocoder to query; a fresh :class:`AsyncGeocoder`
+            by default.
+        progress: Called after each lookup with the number of lookups
+            done, the number to do, the address and its outcome
+            (``"found"``, ``"not found"`` or the error message).
+
+    Returns:
+        Counts of known, found, not-found and failed addresses.
+    """
+    store = get_geocode_store()
+    report = GeocodeReport()
+    missing = []
+    for address in sorted(addresses):
+        if store.get(address)[0]:
+            report.known += 1
+        else:
+            missing.append(address)
+
+    geocoder = geocoder or AsyncGeocoder()
+    limiter = TokenBucket(settings.geocode_rate_limit, settings.geocode_burst)
+    slots = asyncio.Semaphore(max(1, settings.geocode_max_connections))
+    done = 0
+
+    async def resolve(address: str) -> None:
+        nonlocal done
+        try:
+            coords = await geocoder.lookup(address)
+        except (GeocodingError, httpx.HTTPError, ValueError, KeyError, OSError) as e:
+            report.failed[address] = outcome = str(e) or type(e).__name__
+        else:
+            await asyncio.to_thread(store.put, address, coords)
+            if coords:
+                report.found += 1
+                outcome = "found"
+            else:
+                report.not_found += 1
+                outcome = "not found"
+        finally:
+            slots.release()
+        done += 1
+        progress(done, len(missing), address, outcome)
+
+    await geocoder.start()
+    try:
+        tasks = []
+        for address in missing:
+            await slots.acquire()
+            await limiter.acquire()
+            tasks.append(asyncio.create_task(resolve(address)))
+        await asyncio.gather(*tasks)
+    finally:
+        await geocoder.aclose()
+    return report
+
+
+def _print_progress(done: int, total: int, address: str, outcome: str) -> None:
+    print(f"[{done}/{total}] {address}: {outcome}", file=sys.stderr)
+
+
+def geocode_command(args: argparse.Namespace) -> int:
+    """Run the ``geocode`` subcommand and return the exit status."""
+    if not settings.geocode_enabled:
+        print("Geocoding is disabled (GEOCODE_ENABLED=false).", file=sys.stderr)
+        return 2
+
+    addresses, errors = collect_addresses(args.data_dir)
+    for name, error in errors.items():
+        print(f"Skipping {name}: {error}", file=sys.stderr)
+
+    if args.dry_run:
+        store = get_geocode_store()
+        missing = sorted(address for address in addresses if not store.get(address)[0])
+        for address in missing:
+            print(address)
+        print(f"{len(addresses)} addresses, {len(missing)} not yet geocoded.", file=sys.stderr)
+        return 1 if errors else 0
+
+    report = asyncio.run(warm_geocode_store(addresses, progress=_print_progress))
+    print(
+        f"{len(addresses)} addresses: {report.known} already known, {report.found} found, "
+        f"{report.not_found} not found, {len(report.failed)} failed.",
+        file=sys.stderr,
+    )
+    for address, error in report.failed.items():
+        print(f"Failed: {address}: {error}", file=sys.stderr)
+    return 1 if errors or report.failed else 0
+
+
+def export_command(args: argparse.Namespace) -> int:
+    """Run the ``export`` subcommand and return the exit status."""
+    report = export_calendars(
+        args.data_dir,
+        args.output_dir,
+        workers=args.workers,
+        force=args.force,
+        progress=lambda name, outcome: print(f"{name}: {outcome}", file=sys.stderr),
+    )
+    print(
+        f"{len(report.exported)} exported, {len(report.skipped)} unchanged, "
+        f"{len(report.removed)} removed, {len(report.failed)} failed.",
+        file=sys.stderr,
+    )
+    return 1 if report.failed else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="Simple iCal Server tools.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    geocode = commands.add_parser("geocode", help="pre-populate the geocode store for every calendar")
+    geocode.add_argument("--data-dir", type=Path, default=settings.data_dir, help="directory of CSV calendars")
+    geocode.add_argument("--dry-run", action="store_true", help="list addresses that are not geocoded yet")
+    geocode.set_defaults(handler=geocode_command)
+
+    export = commands.add_parser("export", help="render every calendar into static files")
+    export.add_argument("output_dir", type=Path, help="directory receiving .ics files and manifest.json")
+    export.add_argument("--data-dir", type=Path, default=settings.data_dir, help="directory of CSV calendars")
+    export.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    export.add_argument("--force", action="store_true", help="re-export calendars even if unchanged")
+    export.set_defaults(handler=export_command)
+
+    args = parser.parse_args(argv)
+    # The geocode store defaults to a cache inside the data directory.
+    settings.data_dir = args.data_dir
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
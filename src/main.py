@@ -1,13 +1,41 @@
 """Entry point for the simple-ical-server FastAPI application.
 
 This module creates the FastAPI application instance and registers the API
-router that handles calendar listing and iCal file serving.
+router that handles calendar listing and iCal file serving, behind the
+admission-control middleware that sheds excess calendar requests.  The
+application lifespan starts and stops the pooled geocoding client and
+its background worker, the data-directory watcher and the calendar
+render pool.
 """
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from src.routes import router
+from src.settings import settings
+from src.utils.admission import AdmissionMiddleware
+from src.utils.geocoder import geocoder
+from src.utils.geoqueue import geocode_queue
+from src.utils.render import render_pool
+from src.utils.watcher import data_dir_watcher
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run background services for the lifetime of the application."""
+    await geocoder.start()
+    geocode_queue.start()
+    if settings.watch_enabled:
+        data_dir_watcher.start()
+    yield
+    await data_dir_watcher.stop()
+    await geocode_queue.stop()
+    await geocoder.aclose()
+    render_pool.shutdown()
+
 
-app = FastAPI(title="Simple iCal Server")
+app = FastAPI(title="Simple iCal Server", lifespan=lifespan)
 
+app.add_middleware(AdmissionMiddleware)
 app.include_router(router)
@@ -3,13 +3,40 @@
 Endpoints
 ---------
 GET /
-    Returns a JSON object with a single key ``"calendars"`` whose value
-    is a list of calendar name strings derived from the ``.csv`` files
-    present in the configured data directory.
+    Returns a JSON object whose ``"calendars"`` key lists the calendar
+    names derived from the ``.csv`` files present in the configured data
+    directory, and whose ``"catalog"`` key maps each name to its event
+    count, date range, last-modified time and ``ETag``.
 
 GET /{name}.ics
     Generates and returns an iCal (``.ics``) file for the calendar whose
-    CSV data file is named ``{name}.csv``.
+    CSV data file is named ``{name}.csv``.  Rendered payloads are cached
+    per CSV version and carry ``ETag`` / ``Last-Modified`` validators;
+    conditional requests are answered with ``304 Not Modified``.
+    Pre-compressed variants are served according to ``Accept-Encoding``.
+    ``HEAD`` requests are answered from the calendar catalog without
+    rendering.  CSV files of at least ``settings.stream_threshold_bytes``
+    are streamed event by event instead.  ``?from=`` / ``?to=`` restrict
+    the payload to events overlapping a time window and ``?since=`` omits
+    all events when the calendar has not changed since the given time.
+
+GET /{name}/events
+    Lists the events of a calendar as JSON, ordered by start time, with
+    ``?from=`` / ``?to=`` filtering, ``?fields=`` selection and
+    cursor-based pagination (``?limit=`` / ``?cursor=``).  Served from
+    the same per-version index as windowed ``.ics`` requests.
+
+GET /calendars/merged.ics
+    Merges several calendars, chosen by name (``?calendars=a,b``) and/or
+    shell-style pattern (``?glob=team-*``), into one ``.ics`` feed.
+    Members are rendered in parallel through the same cache and render
+    pool as ``GET /{name}.ics``; duplicate ``UID`` values and
+    ``VTIMEZONE`` components are removed.  Feeds with a member above the
+    streaming threshold are streamed.
+
+GET /metrics
+    Render, cache and geocoding metrics in the Prometheus text
+    exposition format (404 when ``settings.metrics_enabled`` is off).
 
 GET /healthz
     Kubernetes-style liveness probe — always returns ``{"status": "ok"}``.
@@ -24,48 +51,236 @@ GET /readyz
     sequences before constructing the file path.
 """
 
+import asyncio
+import fnmatch
+import itertools
+import json
 import os
+from pathlib import Path
 
-from fastapi import APIRouter, HTTPException, Response
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
 from src.settings import settings
-from src.utils.ical import csv_to_ical
+from src.utils.admission import retry_after_headers
+from src.utils.cache import CacheKey, RenderedCalendar, cache_key, merged_cache
+from src.utils.catalog import catalog
+from src.utils.compression import compress_variants, negotiate
+from src.utils.events import list_events, parse_fields
+from src.utils.http import http_date, is_not_modified
+from src.utils.ical import entries_to_ical, iter_ical
+from src.utils.merge import iter_merged, merge_calendars
+from src.utils.metrics import REGISTRY
+from src.utils.render import RenderQueueFullError, cached_render, current_render, render_pool
+from src.utils.watcher import data_dir_watcher
+from src.utils.window import get_index, parse_timestamp
 
 router = APIRouter()
 
+# Largest page size accepted by GET /{name}/events.
+_MAX_EVENTS_LIMIT = 1000
+
 
 @router.get("/")
 async def list_calendars():
-    """List all available calendar names.
+    """List all available calendars with their catalog metadata.
 
-    Scans the configured data directory for files with a ``.csv``
-    extension and returns their base names (without the extension).
+    Returns the base names (without the extension) of the ``.csv``
+    files in the configured data directory, described by the in-memory
+    calendar catalog (:mod:`src.utils.catalog`).  While the
+    data-directory watcher is running the names come from its index;
+    otherwise the directory is rescanned when it may have changed.
+    Only calendars whose CSV changed since the last listing are
+    summarised again; none are rendered.
 
     Returns:
-        A JSON object with a single key ``"calendars"`` whose value is
-        a list of calendar name strings.  Returns an empty list when
-        the data directory does not exist yet.
+        A JSON object whose ``"calendars"`` key lists the calendar
+        names and whose ``"catalog"`` key maps each name to its number
+        of events, the earliest event start and latest event end
+        (``null`` for calendars large enough to be streamed), the CSV's
+        modification time and size, and the ``ETag`` of the identity
+        payload (``null`` until the calendar has been rendered).  Both
+        are empty when the data directory does not exist yet.
 
     Example response::
 
-        {"calendars": ["events", "workshops"]}
+        {
+            "calendars": ["events"],
+            "catalog": {
+                "events": {
+                    "events": 12,
+                    "first_start": "2025-01-01T09:00:00+00:00",
+                    "last_end": "2025-06-30T17:00:00+00:00",
+                    "last_modified": "2025-01-10T08:15:00+00:00",
+                    "size": 1834,
+                    "etag": "\"3f2a...\""
+                }
+            }
+        }
     """
+    states = data_dir_watcher.states if data_dir_watcher.serves(settings.data_dir) else None
+    entries = await run_in_threadpool(catalog.update, settings.data_dir, states)
+    return {
+        "calendars": [entry.name for entry in entries],
+        "catalog": {entry.name: entry.as_dict() for entry in entries},
+    }
+
+
+def _calendar_names() -> list[str]:
+    """Return the names of the calendars in the data directory, preferring the watcher's index."""
+    if data_dir_watcher.serves(settings.data_dir):
+        return data_dir_watcher.calendars
+
     if not settings.data_dir.exists():
-        return {"calendars": []}
+        return []
+
+    return [f.stem for f in settings.data_dir.glob("*.csv")]
+
+
+def _calendar_path(name: str) -> tuple[Path, Path]:
+    """Return the CSV path of calendar *name* and its resolved form.
+
+    Raises:
+        HTTPException: 400 when *name* contains path separators or the
+            resolved path would escape the configured data directory.
+    """
+    # Reject names containing path separators (the main traversal vector).
+    # Note: ".." alone is safe here because f"{name}.csv" = "...csv", which
+    # resolves inside data_dir.  The resolve() guard below handles symlinks
+    # and any other filesystem-level escape attempts.
+    if "/" in name or "\\" in name:
+        raise HTTPException(status_code=400, detail="Invalid calendar name")
+
+    csv_path = settings.data_dir / f"{name}.csv"
+
+    # Defense in depth: resolved path must stay inside data_dir.
+    # Catches symlink traversal and any OS-specific path quirks.
+    try:
+        resolved = csv_path.resolve()
+        data_dir_resolved = settings.data_dir.resolve()
+        resolved.relative_to(data_dir_resolved)
+    except (ValueError, OSError, RuntimeError):
+        raise HTTPException(status_code=400, detail="Invalid calendar name")
+    return csv_path, resolved
+
+
+async def _rendered_calendar(key: CacheKey, csv_path: Path, name: str, stat: os.stat_result) -> RenderedCalendar:
+    """Return the cached render for *key*, rendering it in the pool on a miss or when stale.
+
+    Raises:
+        HTTPException: 500 when rendering fails, 503 with ``Retry-After``
+            when the render queue is full or the render times out.
+    """
+    rendered = await current_render(key)
+    if rendered is not None:
+        return rendered
+    try:
+        return await render_pool.render(key, csv_path, name, stat.st_mtime)
+    except RenderQueueFullError:
+        raise HTTPException(status_code=503, detail="Server busy", headers=retry_after_headers())
+    except TimeoutError:
+        raise HTTPException(status_code=503, detail="Calendar rendering timed out", headers=retry_after_headers())
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _calendar_response(request: Request, rendered: RenderedCalendar) -> Response:
+    """Answer *request* with *rendered*, negotiating the encoding and honouring validators."""
+    encoding = negotiate(request.headers.get("accept-encoding"), rendered.encodings)
+    etag = rendered.etag_for(encoding)
+    headers = {"ETag": etag, "Last-Modified": http_date(rendered.last_modified), "Vary": "Accept-Encoding"}
+    if is_not_modified(request.headers, etag, rendered.last_modified):
+        return Response(status_code=304, headers=headers)
+    if encoding is None:
+        return Response(content=rendered.content, media_type="text/calendar", headers=headers)
+    headers["Content-Encoding"] = encoding
+    return Response(content=rendered.encodings[encoding], media_type="text/calendar", headers=headers)
 
-    calendars = [f.stem for f in settings.data_dir.glob("*.csv")]
-    return {"calendars": calendars}
+
+@router.head("/{name}.ics")
+async def head_calendar(name: str, request: Request):
+    """Answer a ``HEAD`` request for the named calendar from the catalog.
+
+    Nothing is rendered: the ``ETag`` and ``Content-Length`` of the
+    negotiated encoding are reported when the current version is in the
+    render cache, otherwise only ``Last-Modified``.  Conditional
+    requests are answered with ``304 Not Modified`` as for ``GET``.
+
+    Raises:
+        HTTPException: 400 when ``name`` is invalid, 404 when no CSV
+            file with the given name exists.
+    """
+    _calendar_path(name)
+    entry = await run_in_threadpool(catalog.lookup, settings.data_dir, name)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Calendar not found")
+
+    headers = {"Last-Modified": http_date(entry.last_modified)}
+    rendered = cached_render(entry.key)
+    etag = None
+    if rendered is not None:
+        encoding = negotiate(request.headers.get("accept-encoding"), rendered.encodings)
+        etag = rendered.etag_for(encoding)
+        body = rendered.encodings[encoding] if encoding else rendered.content
+        headers.update({"ETag": etag, "Vary": "Accept-Encoding", "Content-Length": str(len(body))})
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+    if is_not_modified(request.headers, etag, entry.last_modified):
+        headers.pop("Content-Length", None)
+        headers.pop("Content-Encoding", None)
+        return Response(status_code=304, headers=headers)
+    return Response(media_type="text/calendar", headers=headers)
 
 
 @router.get("/{name}.ics")
-async def get_calendar(name: str):
+async def get_calendar(
+    name: str,
+    request: Request,
+    from_: str | None = Query(None, alias="from"),
+    to: str | None = None,
+    since: str | None = None,
+):
     """Generate and serve an iCal file for the named calendar.
 
     Reads the CSV file at ``{data_dir}/{name}.csv``, converts every row
     to an iCal ``VEVENT`` component, and returns the full ``VCALENDAR``
     payload as a ``text/calendar`` response body.
 
+    The rendered payload is cached in-process, keyed on the CSV file's
+    path, modification time and size, so repeated polls of an unchanged
+    calendar skip the converter entirely.  Cache misses are rendered in
+    a worker pool, off the event loop; concurrent requests for the same
+    calendar version share a single render.  Addresses without known
+    coordinates are handed to the background geocoder; a cached render
+    that lacked coordinates is refreshed once new results arrive.
+    Responses carry a strong ``ETag`` and a ``Last-Modified`` header;
+    requests whose ``If-None-Match`` / ``If-Modified-Since`` validators
+    still match receive an empty ``304 Not Modified`` response.  Clients that send
+    ``Accept-Encoding`` receive the best matching pre-compressed variant
+    (``br``, ``zstd`` or ``gzip``) with its own ``ETag``; every response
+    carries ``Vary: Accept-Encoding``.
+
+    Very large CSV files (see ``settings.stream_threshold_bytes``) are
+    neither cached nor rendered in one piece: they are streamed through
+    :func:`~src.utils.ical.iter_ical` so memory use stays proportional to
+    a single event and the client starts receiving data immediately.
+    Streamed responses carry ``Last-Modified`` but no ``ETag`` and are
+    not compressed.
+
+    The optional ``from`` and ``to`` query parameters restrict the
+    payload to events that overlap ``[from, to)``; the events are found
+    by bisecting a per-calendar start-time index
+    (:mod:`src.utils.window`).  ``since`` enables incremental polling.
+    Rows carry no change history, so every event counts as changed when
+    the CSV file was last modified: if that is not after ``since`` the
+    calendar is returned without events, otherwise in full (or
+    windowed).  All three accept ISO 8601 dates or date-times and
+    iCalendar ``DTSTAMP`` values; times without an offset are read in
+    ``settings.tz``.
+    Filtered responses are rendered per request, are not streamed or
+    compressed, and carry their own ``ETag``.
+
     Args:
         name: The calendar identifier, which must correspond to a file
             named ``{name}.csv`` inside the configured data directory.
@@ -74,44 +289,302 @@ async def get_calendar(name: str):
             cannot escape ``data_dir`` even via symlinks or other
             filesystem tricks.
 
+        request: The incoming request, inspected for conditional and
+            ``Accept-Encoding`` headers.
+        from_: Start of the time window (query parameter ``from``).
+        to: End of the time window, exclusive.
+        since: Only return events changed after this time.
+
     Returns:
         An HTTP response with ``Content-Type: text/calendar`` and the
-        raw iCal bytes as the body.
+        raw iCal bytes as the body, or an empty ``304`` response when
+        the client's copy is current.
 
     Raises:
         HTTPException: 400 when ``name`` contains path separators or the
-            resolved path would escape the configured data directory.
+            resolved path would escape the configured data directory, or
+            when ``from``, ``to`` or ``since`` cannot be parsed.
         HTTPException: 404 when no CSV file with the given name exists.
         HTTPException: 500 when the CSV file exists but cannot be parsed
             or converted (the detail field contains the underlying error
             message).
+        HTTPException: 503 with a ``Retry-After`` header when the render
+            queue is full or the render exceeds ``settings.render_timeout``.
     """
-    # Reject names containing path separators (the main traversal vector).
-    # Note: ".." alone is safe here because f"{name}.csv" = "...csv", which
-    # resolves inside data_dir.  The resolve() guard below handles symlinks
-    # and any other filesystem-level escape attempts.
-    if "/" in name or "\\" in name:
-        raise HTTPException(status_code=400, detail="Invalid calendar name")
+    csv_path, resolved = _calendar_path(name)
 
-    csv_path = settings.data_dir / f"{name}.csv"
+    try:
+        start = parse_timestamp(from_) if from_ is not None else None
+        end = parse_timestamp(to) if to is not None else None
+        changed_after = parse_timestamp(since) if since is not None else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date in query parameters")
 
-    # Defense in depth: resolved path must stay inside data_dir.
-    # Catches symlink traversal and any OS-specific path quirks.
     try:
-        resolved = csv_path.resolve()
-        data_dir_resolved = settings.data_dir.resolve()
-        resolved.relative_to(data_dir_resolved)
-    except (ValueError, OSError, RuntimeError):
-        raise HTTPException(status_code=400, detail="Invalid calendar name")
+        stat = csv_path.stat()
+    except OSError:
+        raise HTTPException(status_code=404, detail="Calendar not found")
+
+    # DTSTAMP and Last-Modified carry whole seconds, so clients echo back a truncated mtime.
+    unchanged = changed_after is not None and int(stat.st_mtime) <= changed_after
+    if unchanged or start is not None or end is not None:
+        key = cache_key(resolved, stat)
+        return await _filtered_calendar(request, key, csv_path, name, stat, start, end, unchanged)
+
+    if settings.stream_threshold_bytes and stat.st_size >= settings.stream_threshold_bytes:
+        return await _stream_calendar(request, csv_path, name, stat)
+
+    key = cache_key(resolved, stat)
+    rendered = await _rendered_calendar(key, csv_path, name, stat)
+    return _calendar_response(request, rendered)
+
+
+async def _filtered_calendar(
+    request: Request,
+    key: CacheKey,
+    csv_path: Path,
+    name: str,
+    stat: os.stat_result,
+    start: float | None,
+    end: float | None,
+    unchanged: bool,
+) -> Response:
+    """Serve the events of a calendar that overlap ``[start, end)``, or none if *unchanged*."""
+
+    def render() -> bytes:
+        entries = [] if unchanged else get_index(key, csv_path).window(start, end)
+        return entries_to_ical(entries, name, stat.st_mtime)
+
+    try:
+        content = await run_in_threadpool(render)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+    rendered = RenderedCalendar.from_content(content, stat.st_mtime)
+    headers = {"ETag": rendered.etag, "Last-Modified": http_date(rendered.last_modified)}
+    if is_not_modified(request.headers, rendered.etag, rendered.last_modified):
+        return Response(status_code=304, headers=headers)
+    return Response(content=rendered.content, media_type="text/calendar", headers=headers)
+
+
+async def _stream_calendar(request: Request, csv_path: Path, name: str, stat: os.stat_result) -> Response:
+    """Serve a large calendar incrementally as a chunked ``text/calendar`` response."""
+    headers = {"Last-Modified": http_date(stat.st_mtime)}
+    if is_not_modified(request.headers, None, stat.st_mtime):
+        return Response(status_code=304, headers=headers)
+
+    chunks = iter_ical(csv_path, name)
+    try:
+        # Produce the header and first event before committing to a 200 so
+        # that unreadable or malformed files still get a proper 500.
+        head = await run_in_threadpool(list, itertools.islice(chunks, 2))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+    # Starlette iterates synchronous iterators in its thread pool.
+    return StreamingResponse(itertools.chain(head, chunks), media_type="text/calendar", headers=headers)
+
+
+@router.get("/{name}/events")
+async def get_events(
+    name: str,
+    request: Request,
+    from_: str | None = Query(None, alias="from"),
+    to: str | None = None,
+    fields: str | None = None,
+    cursor: str | None = None,
+    limit: int = Query(100, ge=1, le=_MAX_EVENTS_LIMIT),
+):
+    """List the events of the named calendar as JSON, one page at a time.
+
+    Events come from the per-version start-time index of the calendar
+    (:func:`~src.utils.window.get_index`), so rows are parsed once per
+    CSV version and only the events on the requested page are
+    materialised.  They are ordered by start time, ``UID`` and row; the
+    ``next_cursor`` of a page resumes right after its last event, even
+    if the CSV file changed in between.
+
+    Args:
+        name: The calendar identifier, validated as for ``GET /{name}.ics``.
+        request: The incoming request, inspected for conditional headers.
+        from_: Start of the time window (query parameter ``from``).
+        to: End of the time window, exclusive.
+        fields: Comma-separated event fields to include (see
+            :data:`~src.utils.events.FIELDS`); all fields by default.
+        cursor: ``next_cursor`` of the previous page.
+        limit: Maximum number of events per page.
 
-    if not csv_path.exists():
+    Returns:
+        ``{"events": [...], "next_cursor": ...}`` with ``ETag`` and
+        ``Last-Modified`` headers, or an empty ``304`` response when the
+        client's copy is current.
+
+    Raises:
+        HTTPException: 400 when ``name`` is invalid or ``from``, ``to``,
+            ``fields`` or ``cursor`` cannot be parsed.
+        HTTPException: 404 when no CSV file with the given name exists.
+        HTTPException: 500 when the CSV file cannot be parsed.
+    """
+    csv_path, resolved = _calendar_path(name)
+    try:
+        start = parse_timestamp(from_) if from_ is not None else None
+        end = parse_timestamp(to) if to is not None else None
+        selected = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        stat = csv_path.stat()
+    except OSError:
         raise HTTPException(status_code=404, detail="Calendar not found")
 
+    key = cache_key(resolved, stat)
     try:
-        ical_content = csv_to_ical(csv_path, name)
-        return Response(content=ical_content, media_type="text/calendar")
+        index = await run_in_threadpool(get_index, key, csv_path)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=500, detail=str(e)) from e
+    try:
+        page = await run_in_threadpool(list_events, index, name, selected, start, end, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    rendered = RenderedCalendar.from_content(json.dumps(page).encode(), stat.st_mtime)
+    headers = {"ETag": rendered.etag, "Last-Modified": http_date(rendered.last_modified)}
+    if is_not_modified(request.headers, rendered.etag, rendered.last_modified):
+        return Response(status_code=304, headers=headers)
+    return Response(content=rendered.content, media_type="application/json", headers=headers)
+
+
+@router.get("/calendars/merged.ics")
+async def get_merged_calendar(
+    request: Request,
+    calendars: str | None = None,
+    glob: str | None = None,
+    name: str = "merged",
+):
+    """Serve several calendars merged into one iCal feed.
+
+    Members are selected by a comma-separated list of names, a
+    shell-style pattern matched against the available calendar names,
+    or both.  The selection is treated as a set of existing calendars:
+    events appear in member-name order, whatever the order or repetition
+    of the names in the request.  Every member is fetched from the
+    render cache or rendered in the worker pool, all members
+    concurrently, exactly as for ``GET /{name}.ics``.  Events are
+    spliced out of the rendered members rather than rendered again;
+    events whose ``UID`` was already emitted are dropped and the
+    ``VTIMEZONE`` components of each ``TZID`` are combined into one
+    (see :mod:`src.utils.merge`).
+
+    The merged payload is pre-compressed, served with ``ETag`` /
+    ``Last-Modified`` validators like a single calendar, and cached in
+    :data:`~src.utils.cache.merged_cache` until a member changes; that
+    cache holds one feed per member set and is bounded separately from
+    the render cache.  When any member is at least
+    ``settings.stream_threshold_bytes`` large, the merged feed is
+    streamed instead, like a single large calendar.
+
+    Args:
+        request: The incoming request, inspected for conditional and
+            ``Accept-Encoding`` headers.
+        calendars: Comma-separated calendar names.
+        glob: Pattern such as ``team-*`` selecting calendars by name.
+        name: ``X-WR-CALNAME`` of the merged calendar.
+
+    Returns:
+        A ``text/calendar`` response, or an empty ``304`` response when
+        the client's copy is current.
+
+    Raises:
+        HTTPException: 400 when no calendar is selected, more than
+            ``settings.merge_max_calendars`` are, or a name is invalid.
+        HTTPException: 404 when a listed calendar does not exist.
+        HTTPException: 500 or 503 when a member cannot be rendered, as
+            for ``GET /{name}.ics``.
+    """
+    selected = {n.strip() for n in (calendars or "").split(",") if n.strip()}
+    if glob:
+        selected.update(fnmatch.filter(_calendar_names(), glob))
+    if not selected:
+        raise HTTPException(status_code=400, detail="No calendars selected")
+    if len(selected) > settings.merge_max_calendars:
+        raise HTTPException(status_code=400, detail=f"At most {settings.merge_max_calendars} calendars can be merged")
+
+    members = []
+    for member in sorted(selected):
+        csv_path, resolved = _calendar_path(member)
+        try:
+            stat = csv_path.stat()
+        except OSError:
+            raise HTTPException(status_code=404, detail=f"Calendar not found: {member}")
+        members.append((cache_key(resolved, stat), csv_path, member, stat))
+
+    threshold = settings.stream_threshold_bytes
+    if threshold and any(stat.st_size >= threshold for *_, stat in members):
+        return await _stream_merged(request, members, name)
+
+    rendered = await asyncio.gather(*(_rendered_calendar(*member) for member in members))
+
+    key = (
+        f"merged:{','.join(member[2] for member in members)}",
+        0,
+        0,
+        (name, *((member[0], r.etag) for member, r in zip(members, rendered))),
+    )
+    merged = merged_cache.get(key)
+    if merged is None:
+        merged = await run_in_threadpool(_merge, rendered, name)
+        merged_cache.put(key, merged)
+    return _calendar_response(request, merged)
+
+
+def _merge(members: list[RenderedCalendar], name: str) -> RenderedCalendar:
+    content = merge_calendars((member.content for member in members), name)
+    return RenderedCalendar.from_content(
+        content, max(member.last_modified for member in members), encodings=compress_variants(content)
+    )
+
+
+async def _stream_merged(
+    request: Request, members: list[tuple[CacheKey, Path, str, os.stat_result]], name: str
+) -> Response:
+    """Serve a merged feed with a large member incrementally, as :func:`_stream_calendar` does."""
+    last_modified = max(stat.st_mtime for *_, stat in members)
+    headers = {"Last-Modified": http_date(last_modified)}
+    if is_not_modified(request.headers, None, last_modified):
+        return Response(status_code=304, headers=headers)
+
+    threshold = settings.stream_threshold_bytes
+    small = [member for member in members if member[3].st_size < threshold]
+    rendered = await asyncio.gather(*(_rendered_calendar(*member) for member in small))
+    contents = {member[2]: r.content for member, r in zip(small, rendered)}
+    sources = [
+        [contents[member]] if member in contents else iter_ical(csv_path, member) for _, csv_path, member, _ in members
+    ]
+    chunks = iter_merged(sources, name)
+    try:
+        # Start the first member before committing to a 200, as for a single calendar.
+        head = await run_in_threadpool(list, itertools.islice(chunks, 2))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+    return StreamingResponse(itertools.chain(head, chunks), media_type="text/calendar", headers=headers)
+
+
+@router.get("/metrics")
+async def metrics():
+    """Expose application metrics for Prometheus.
+
+    Returns:
+        Render latency histograms per calendar, per-stage render timings,
+        rows processed, render-cache hit/miss counters and size,
+        geocode store hit/miss counters, Nominatim request latency and
+        the number of in-flight renders, in the text exposition format.
+
+    Raises:
+        HTTPException: 404 when metrics are disabled.
+    """
+    if not settings.metrics_enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 
 @router.get("/healthz")
@@ -8,6 +8,7 @@ project root is also read automatically when present.
 
 import tomllib
 from pathlib import Path
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -64,6 +65,117 @@ class Settings(BaseSettings):
         user_agent: ``User-Agent`` string sent with Nominatim HTTP
             requests.  Nominatim's usage policy requires a descriptive,
             application-specific value.
+        geocode_cache_path: Location of the SQLite database that
+            persists geocoding results across restarts and shares them
+            between worker processes.  ``None`` (the default) uses
+            ``geocode.sqlite3`` in :attr:`cache_path`.
+        geocode_cache_ttl: Lifetime in seconds of a cached successful
+            geocoding result.  Defaults to 90 days.
+        geocode_negative_ttl: Lifetime in seconds of a cached "address
+            not found" result.  Defaults to one day.
+        geocode_rate_limit: Maximum sustained number of geocoding
+            requests per second issued by the background geocoder.
+            Nominatim's usage policy allows at most one.
+        geocode_burst: Number of geocoding requests the background
+            geocoder may issue back-to-back before the rate limit applies.
+        geocode_url: Root URL of the Nominatim-compatible geocoding
+            service.  Point it at a self-hosted instance or a local
+            stand-in to avoid the public service.
+        geocode_timeout: Timeout in seconds for each geocoding request.
+        geocode_retries: Number of times a geocoding request is retried
+            after a timeout, connection error, rate-limit or server
+            error response.
+        geocode_backoff: Delay in seconds before the first retry; it
+            doubles with every further attempt unless the service sends
+            ``Retry-After``.
+        geocode_max_connections: Size of the keep-alive connection pool
+            used for geocoding requests.
+        render_cache_max_bytes: Upper bound, in bytes, on the memory used
+            by the in-process cache of rendered calendars.  Least
+            recently used calendars are evicted first.
+        fragment_cache_max_bytes: Upper bound, in bytes, on the memory
+            used by the in-process cache of serialised ``VEVENT`` blocks,
+            which lets a changed calendar re-serialise only its new or
+            edited rows.  ``0`` disables the cache.
+        ical_serializer: Serialiser used to produce iCal output.
+            ``"icalendar"`` (the default) builds ``icalendar`` components;
+            ``"fast"`` writes RFC 5545 content lines directly and yields
+            identical bytes at a fraction of the cost.
+        recurrence_enabled: When ``True``, rows that repeat the same
+            event at a regular daily or weekly interval are emitted as a
+            single ``VEVENT`` with ``RRULE`` and ``EXDATE`` instead of
+            one event per row.  Off by default.
+        vtimezone_enabled: When ``True`` (the default), each calendar
+            includes one ``VTIMEZONE`` component per timezone used by its
+            timed events, covering the years its events span.
+        snapshot_enabled: When ``True``, each CSV is parsed and validated
+            once per change and stored as a binary snapshot in the
+            ``snapshots`` directory of :attr:`cache_path`, which later
+            renders memory-map instead of re-parsing the text.  Falls
+            back to plain CSV parsing if the snapshot cannot be written.
+            Off by default.
+        stream_threshold_bytes: CSV files of at least this size are
+            streamed to the client event by event instead of being
+            rendered into memory and cached.  ``0`` disables streaming.
+        watch_enabled: When ``True`` (the default), the data directory
+            is watched for changes and modified calendars are re-rendered
+            in the background so requests are served from a warm cache.
+        watch_poll_interval: Seconds between directory scans when
+            ``inotify`` is not available.
+        render_executor: Kind of worker pool used to render calendars off
+            the event loop: ``"thread"`` (the default) or ``"process"``.
+        render_workers: Number of workers in the render pool.
+        render_queue_size: Maximum number of distinct calendar renders
+            that may be queued or running at once; further requests are
+            rejected with HTTP 503.
+        admission_enabled: When ``True`` (the default), calendar
+            requests (``GET /{name}.ics``, ``GET /{name}/events`` and
+            merged feeds) pass through admission control, which bounds
+            how many are processed at once and sheds load with HTTP 503.
+        admission_max_concurrent: Maximum number of calendar requests
+            processed at once across all calendars.
+        admission_max_per_calendar: Maximum number of requests for the
+            same calendar processed at once.
+        admission_queue_size: Maximum number of calendar requests
+            waiting for a slot.  When the queue is full, the most
+            expensive waiting request is rejected with HTTP 503 in
+            favour of a cheaper newcomer, or the newcomer is rejected.
+        admission_queue_timeout: Seconds a request may wait for a slot
+            before it is rejected with HTTP 503.
+        admission_retry_after: ``Retry-After`` value, in seconds, sent
+            with every ``503`` for an overloaded server: requests
+            rejected by admission control and renders that find the
+            queue full or time out.
+        merge_max_calendars: Maximum number of calendars a single
+            ``GET /calendars/merged.ics`` request may combine.
+        merge_cache_max_bytes: Upper bound, in bytes, on the memory used
+            by cached merged feeds, which are kept apart from the
+            render cache.
+        render_timeout: Seconds a request waits for its render before
+            giving up with HTTP 503.  The render itself continues and
+            still populates the cache.
+        compression_encodings: ``Content-Encoding`` tokens for which
+            pre-compressed variants of each rendered calendar are
+            produced, in order of preference.  Only ``"gzip"`` by
+            default; ``"br"`` and ``"zstd"`` need the ``brotli`` and
+            ``zstandard`` packages, which are not dependencies of the
+            project, and are skipped when those are missing.  An empty
+            list disables compression.
+        compression_min_bytes: Rendered calendars smaller than this are
+            always served uncompressed.
+        cache_dir: Directory for files derived from the calendars, such
+            as binary snapshots and the geocode database.  ``None`` (the
+            default) uses ``.cache`` inside ``data_dir``; see
+            :attr:`cache_path`.
+        shared_cache_dir: Directory for the host-wide cache of rendered
+            calendars shared by all worker processes (e.g. under
+            ``uvicorn --workers N``), so each calendar version is
+            rendered once per host.  ``None`` (the default) keeps
+            rendered calendars in process memory only.
+        metrics_enabled: When ``True`` (the default), render, cache and
+            geocoding metrics are recorded and exposed in the Prometheus
+            text format at ``GET /metrics``.  When ``False`` recording is
+            skipped and the endpoint returns 404.
     """
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
@@ -74,6 +186,47 @@ class Settings(BaseSettings):
     default_place: str = "Germany"
     geocode_enabled: bool = True
     user_agent: str = f"{_name}/{_version}"
+    geocode_cache_path: Path | None = None
+    geocode_cache_ttl: int = 90 * 24 * 60 * 60
+    geocode_negative_ttl: int = 24 * 60 * 60
+    geocode_rate_limit: float = 1.0
+    geocode_burst: int = 1
+    geocode_url: str = "https://nominatim.openstreetmap.org"
+    geocode_timeout: float = 10.0
+    geocode_retries: int = 2
+    geocode_backoff: float = 1.0
+    geocode_max_connections: int = 4
+    render_cache_max_bytes: int = 64 * 1024 * 1024
+    fragment_cache_max_bytes: int = 32 * 1024 * 1024
+    ical_serializer: Literal["icalendar", "fast"] = "icalendar"
+    recurrence_enabled: bool = False
+    vtimezone_enabled: bool = True
+    snapshot_enabled: bool = False
+    stream_threshold_bytes: int = 8 * 1024 * 1024
+    watch_enabled: bool = True
+    watch_poll_interval: float = 2.0
+    render_executor: Literal["thread", "process"] = "thread"
+    render_workers: int = 4
+    render_queue_size: int = 16
+    admission_enabled: bool = True
+    admission_max_concurrent: int = 64
+    admission_max_per_calendar: int = 16
+    admission_queue_size: int = 128
+    admission_queue_timeout: float = 10.0
+    admission_retry_after: int = 5
+    merge_max_calendars: int = 32
+    merge_cache_max_bytes: int = 16 * 1024 * 1024
+    render_timeout: float = 30.0
+    compression_encodings: list[str] = ["gzip"]
+    compression_min_bytes: int = 1024
+    cache_dir: Path | None = None
+    shared_cache_dir: Path | None = None
+    metrics_enabled: bool = True
+
+    @property
+    def cache_path(self) -> Path:
+        """The effective cache directory: ``cache_dir``, or ``.cache`` inside ``data_dir``."""
+        return self.cache_dir if self.cache_dir is not None else self.data_dir / ".cache"
 
 
 settings = Settings()
@@ -0,0 +1,250 @@
+"""Admission control and load shedding for calendar requests.
+
+A popular calendar polled by thousands of clients at once would
+otherwise start an unbounded number of concurrent requests, each holding
+memory and competing for the render pool.  :class:`AdmissionMiddleware`
+puts every calendar request (``GET /{name}.ics``, ``GET /{name}/events``
+and merged feeds) through :data:`admission`, which
+
+* processes at most ``settings.admission_max_concurrent`` requests at
+  once, and at most ``settings.admission_max_per_calendar`` for any
+  single calendar;
+* parks further requests in a wait queue of at most
+  ``settings.admission_queue_size`` entries, ordered by estimated cost:
+  calendars whose current version is already in the render cache cost
+  nothing, others cost their CSV size, merged feeds the most.  Cheap
+  requests are therefore admitted first, and when the queue is full the
+  most expensive waiting request is shed in favour of a cheaper one;
+* rejects requests it cannot admit within
+  ``settings.admission_queue_timeout`` seconds.
+
+Rejected requests receive an immediate ``503 Service Unavailable`` with
+``Retry-After``.  Decisions and wait times are exported on
+``GET /metrics`` (``ical_admission_*``) for tuning the limits.
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.settings import settings
+from src.utils.cache import cache_key
+from src.utils.metrics import ADMISSION_REQUESTS, ADMISSION_WAIT_SECONDS, REGISTRY, Gauge
+from src.utils.render import cached_render
+
+
+def retry_after_headers() -> dict[str, str]:
+    """Return the ``Retry-After`` header sent with every overload ``503``."""
+    return {"Retry-After": str(settings.admission_retry_after)}
+
+
+class AdmissionRejectedError(RuntimeError):
+    """Raised when a request cannot be admitted and should be answered with 503."""
+
+
+@dataclass(order=True)
+class _Waiter:
+    cost: float
+    seq: int
+    calendar: str = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+class AdmissionController:
+    """Bounds concurrent calendar requests globally and per calendar.
+
+    Must only be used from the event loop.
+    """
+
+    def __init__(self) -> None:
+        self._active = 0
+        self._per_calendar: Counter[str] = Counter()
+        self._waiting: list[_Waiter] = []
+        self._seq = itertools.count()
+
+    @property
+    def active(self) -> int:
+        """Number of admitted requests that have not been released yet."""
+        return self._active
+
+    @property
+    def waiting(self) -> int:
+        """Number of requests waiting for a slot."""
+        return len(self._waiting)
+
+    def _can_admit(self, calendar: str) -> bool:
+        return (
+            self._active < settings.admission_max_concurrent
+            and self._per_calendar[calendar] < settings.admission_max_per_calendar
+        )
+
+    def _admit(self, calendar: str) -> None:
+        self._active += 1
+        self._per_calendar[calendar] += 1
+
+    async def acquire(self, calendar: str, cost: Callable[[], float]) -> None:
+        """Wait for a slot to process a request for *calendar*.
+
+        Every call that returns must be paired with :meth:`release`.
+
+        Args:
+            calendar: Calendar the request is for.
+            cost: Estimates the cost of the request; only called when
+                the request has to wait.
+
+        Raises:
+            AdmissionRejectedError: If the wait queue is full of cheaper
+                requests, the request was shed in favour of a cheaper
+                one, or no slot became free within
+                ``settings.admission_queue_timeout`` seconds.
+        """
+        # Waiters are woken whenever a slot frees up, so any that remain
+        # are blocked by their calendar's limit and a free slot may go to
+        # this request.
+        if self._can_admit(calendar):
+            self._admit(calendar)
+            ADMISSION_REQUESTS.inc(outcome="admitted")
+            return
+
+        waiter = _Waiter(cost(), next(self._seq), calendar, asyncio.get_running_loop().create_future())
+        if len(self._waiting) >= settings.admission_queue_size:
+            costliest = max(self._waiting, default=None)
+            if costliest is None or costliest.cost <= waiter.cost:
+                ADMISSION_REQUESTS.inc(outcome="rejected")
+                raise AdmissionRejectedError("Admission queue is full")
+            self._remove(costliest)
+            costliest.future.set_exception(AdmissionRejectedError("Shed in favour of a cheaper request"))
+            ADMISSION_REQUESTS.inc(outcome="evicted")
+        heapq.heappush(self._waiting, waiter)
+
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), settings.admission_queue_timeout)
+        except TimeoutError:
+            if waiter.future.done() and not waiter.future.exception():
+                # Admitted just as the timeout fired.
+                self.release(calendar)
+            else:
+                self._remove(waiter)
+            ADMISSION_REQUESTS.inc(outcome="timeout")
+            raise AdmissionRejectedError("Timed out waiting for admission") from None
+        except asyncio.CancelledError:
+            # The client went away while waiting.
+            if waiter.future.done() and not waiter.future.exception():
+                self.release(calendar)
+            else:
+                self._remove(waiter)
+            raise
+        finally:
+            ADMISSION_WAIT_SECONDS.observe(time.perf_counter() - start)
+        ADMISSION_REQUESTS.inc(outcome="queued")
+
+    def release(self, calendar: str) -> None:
+        """Return the slot of a finished request for *calendar* and admit waiting requests."""
+        self._active -= 1
+        self._per_calendar[calendar] -= 1
+        if not self._per_calendar[calendar]:
+            del self._per_calendar[calendar]
+        self._dispatch()
+
+    def _remove(self, waiter: _Waiter) -> None:
+        if waiter in self._waiting:
+            self._waiting.remove(waiter)
+            heapq.heapify(self._waiting)
+
+    def _dispatch(self) -> None:
+        """Admit the cheapest waiting requests that fit the limits."""
+        if not self._waiting or self._active >= settings.admission_max_concurrent:
+            return
+        blocked = []
+        while self._waiting and self._active < settings.admission_max_concurrent:
+            waiter = heapq.heappop(self._waiting)
+            if waiter.future.done():
+                continue
+            if not self._can_admit(waiter.calendar):
+                blocked.append(waiter)
+                continue
+            self._admit(waiter.calendar)
+            waiter.future.set_result(None)
+        for waiter in blocked:
+            heapq.heappush(self._waiting, waiter)
+
+
+def _calendar_of(path: str) -> str | None:
+    """Return the calendar a request path is for, or ``None`` if it is not a calendar request."""
+    if path.endswith(".ics"):
+        return path[1:].removesuffix(".ics")
+    if path.endswith("/events") and path.count("/") == 2:
+        return path[1:].removesuffix("/events")
+    return None
+
+
+def request_cost(calendar: str) -> float:
+    """Estimate the cost of serving *calendar*.
+
+    Returns:
+        ``0`` when the current version is in the render cache (or the
+        calendar does not exist), the CSV size in bytes when it has to
+        be rendered, and infinity for merged feeds.
+    """
+    if "/" in calendar:
+        return math.inf
+    csv_path = settings.data_dir / f"{calendar}.csv"
+    try:
+        stat = csv_path.stat()
+        key = cache_key(csv_path.resolve(), stat)
+    except (OSError, RuntimeError):
+        return 0.0
+    return 0.0 if cached_render(key) is not None else float(stat.st_size)
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying :data:`admission` to calendar requests.
+
+    Args:
+        app: The wrapped application.
+        controller: Controller to use; defaults to :data:`admission`.
+    """
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController | None = None) -> None:
+        self.app = app
+        self.controller = controller or admission
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        calendar = None
+        if scope["type"] == "http" and scope["method"] == "GET" and settings.admission_enabled:
+            calendar = _calendar_of(scope["path"])
+        if calendar is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.controller.acquire(calendar, lambda: request_cost(calendar))
+        except AdmissionRejectedError:
+            response = JSONResponse(
+                {"detail": "Server busy"},
+                status_code=503,
+                headers=retry_after_headers(),
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(calendar)
+
+
+admission = AdmissionController()
+
+REGISTRY.register(Gauge("ical_admission_active", "Calendar requests currently admitted.", lambda: admission.active))
+REGISTRY.register(
+    Gauge("ical_admission_waiting", "Calendar requests waiting for an admission slot.", lambda: admission.waiting)
+)
@@ -0,0 +1,214 @@
+"""In-process cache for rendered iCal payloads.
+
+Calendar CSV files change rarely while subscribed clients poll them every
+few minutes, so re-running :func:`~src.utils.ical.csv_to_ical` for every
+request is wasted work.  This module keeps the rendered bytes of each
+calendar in a byte-bounded LRU cache keyed on the CSV file's identity
+(resolved path, ``st_mtime_ns`` and ``st_size``) plus the settings that
+influence the output.  Any edit to the file changes the key, so stale
+payloads are never served.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from src.settings import settings
+from src.utils.metrics import CACHE_REQUESTS, REGISTRY, Gauge
+
+CacheKey = tuple[str, int, int, tuple]
+
+
+@dataclass(frozen=True)
+class RenderedCalendar:
+    """A rendered calendar payload together with its HTTP validators.
+
+    Attributes:
+        content: The raw iCal bytes, or a read-only view of them when
+            served from the shared store.
+        etag: Strong entity tag (quoted) derived from a SHA-256 digest of
+            ``content``.
+        last_modified: Modification time of the source CSV file as a
+            POSIX timestamp.
+        unresolved: Addresses that had no known coordinates at render
+            time and were rendered without ``GEO`` properties.
+        geocode_generation: Value of the background geocoder's
+            generation counter when the render started.
+        encodings: Pre-compressed variants of ``content`` keyed by
+            ``Content-Encoding`` token, in server preference order.
+    """
+
+    content: bytes
+    etag: str
+    last_modified: float
+    unresolved: frozenset[str] = frozenset()
+    geocode_generation: int = 0
+    encodings: dict[str, bytes] = field(default_factory=dict, compare=False)
+
+    def __reduce__(self):
+        # Payloads served from the shared store are views of a memory
+        # map; they are copied when the object is sent to another process.
+        return (
+            type(self),
+            (
+                bytes(self.content),
+                self.etag,
+                self.last_modified,
+                self.unresolved,
+                self.geocode_generation,
+                {encoding: bytes(variant) for encoding, variant in self.encodings.items()},
+            ),
+        )
+
+    @property
+    def size(self) -> int:
+        """Bytes held by the payload and all of its compressed variants."""
+        return len(self.content) + sum(len(variant) for variant in self.encodings.values())
+
+    def etag_for(self, encoding: str | None) -> str:
+        """Return the entity tag of the representation served with *encoding*.
+
+        Each content coding is a distinct representation, so compressed
+        variants get their own strong ETag derived from :attr:`etag`.
+        """
+        if encoding is None:
+            return self.etag
+        return f'{self.etag[:-1]}-{encoding}"'
+
+    @classmethod
+    def from_content(cls, content: bytes, last_modified: float, **kwargs) -> "RenderedCalendar":
+        """Build a :class:`RenderedCalendar`, computing the ETag from *content*.
+
+        Extra keyword arguments are passed through to the constructor.
+        """
+        digest = hashlib.sha256(content).hexdigest()[:32]
+        return cls(content=content, etag=f'"{digest}"', last_modified=last_modified, **kwargs)
+
+
+def settings_fingerprint() -> tuple:
+    """Return the subset of settings that affects rendered output."""
+    return (
+        settings.project_name,
+        settings.tz,
+        settings.default_place,
+        settings.geocode_enabled,
+        settings.ical_serializer,
+        settings.recurrence_enabled,
+        settings.vtimezone_enabled,
+        tuple(settings.compression_encodings),
+        settings.compression_min_bytes,
+    )
+
+
+def cache_key(csv_path: Path, stat: os.stat_result) -> CacheKey:
+    """Build the cache key identifying one version of a calendar.
+
+    Args:
+        csv_path: Path to the calendar's CSV file.
+        stat: Result of ``os.stat`` on *csv_path*.
+
+    Returns:
+        A hashable tuple ``(path, mtime_ns, size, settings_fingerprint)``.
+    """
+    return (str(csv_path), stat.st_mtime_ns, stat.st_size, settings_fingerprint())
+
+
+class RenderCache:
+    """Byte-bounded LRU cache of :class:`RenderedCalendar` objects.
+
+    Only the most recent version of each calendar is retained: storing a
+    new key for a path replaces whatever was cached for that path before.
+    All operations are guarded by a lock so the cache can be shared with
+    worker threads.
+
+    Args:
+        max_bytes: Upper bound on the summed size of cached payloads.
+            When ``None`` the settings attribute named by *setting* is
+            read on every insertion.
+        setting: Name of the setting holding the default bound.
+    """
+
+    def __init__(self, max_bytes: int | None = None, setting: str = "render_cache_max_bytes") -> None:
+        self._max_bytes = max_bytes
+        self._setting = setting
+        self._entries: OrderedDict[str, tuple[CacheKey, RenderedCalendar]] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes if self._max_bytes is not None else getattr(settings, self._setting)
+
+    @property
+    def size_bytes(self) -> int:
+        """Total size of the cached payloads, including compressed variants, in bytes."""
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: CacheKey) -> RenderedCalendar | None:
+        """Return the cached payload for *key*, or ``None`` on a miss."""
+        with self._lock:
+            item = self._entries.get(key[0])
+            if item is None or item[0] != key:
+                CACHE_REQUESTS.inc(result="miss")
+                return None
+            self._entries.move_to_end(key[0])
+        CACHE_REQUESTS.inc(result="hit")
+        return item[1]
+
+    def peek(self, key: CacheKey) -> RenderedCalendar | None:
+        """Return the cached payload for *key* without counting a request or refreshing its recency."""
+        with self._lock:
+            item = self._entries.get(key[0])
+        return item[1] if item is not None and item[0] == key else None
+
+    def put(self, key: CacheKey, rendered: RenderedCalendar) -> None:
+        """Store *rendered* under *key*, evicting least-recently-used entries as needed.
+
+        Payloads larger than :attr:`max_bytes` are not cached at all.
+        """
+        max_bytes = self.max_bytes
+        size = rendered.size
+        with self._lock:
+            self._discard(key[0])
+            if size > max_bytes:
+                return
+            self._entries[key[0]] = (key, rendered)
+            self._size += size
+            while self._size > max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._size -= evicted.size
+
+    def discard(self, path: str) -> None:
+        """Drop whatever is cached for the calendar at *path*."""
+        with self._lock:
+            self._discard(path)
+
+    def clear(self) -> None:
+        """Drop every cached payload."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _discard(self, path: str) -> None:
+        item = self._entries.pop(path, None)
+        if item is not None:
+            self._size -= item[1].size
+
+
+render_cache = RenderCache()
+
+# Merged feeds are kept apart so that they cannot evict single calendars.
+merged_cache = RenderCache(setting="merge_cache_max_bytes")
+
+REGISTRY.register(
+    Gauge("ical_render_cache_bytes", "Bytes held by the rendered-calendar cache.", lambda: render_cache.size_bytes)
+)
+REGISTRY.register(
+    Gauge("ical_render_cache_entries", "Calendars held by the rendered-calendar cache.", lambda: len(render_cache))
+)
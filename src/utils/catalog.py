@@ -0,0 +1,255 @@
+"""In-memory catalog of the calendars in the data directory.
+
+The catalog describes every calendar without rendering it: its event
+count, the time span its events cover, the CSV's modification time and
+size, and the ``ETag`` of its rendered payload once one is cached.
+Clients poll ``GET /`` to learn which calendars changed instead of
+downloading every ``.ics`` file, and ``HEAD /{name}.ics`` is answered
+from the catalog.
+
+Entries are keyed on the CSV's ``(mtime_ns, size)`` and recomputed only
+when that changes.  An entry is built from ``stat`` alone; the event
+count and span are computed the first time they are asked for, from the
+calendar's existing snapshot if it has a current one and otherwise by
+parsing the CSV, without compiling a snapshot.  Calendars of at least
+``settings.stream_threshold_bytes`` are never parsed for the catalog and
+report only their size, modification time and ``ETag``, so ``HEAD``
+requests and listings stay cheap however large a calendar grows.  The
+list of calendars comes from the data-directory watcher while it runs,
+which also refreshes the catalog after every change.  Otherwise the
+directory is rescanned when its modification time changes (files added,
+removed or replaced by an atomic save), and at most every
+``settings.watch_poll_interval`` seconds to notice files modified in
+place.
+"""
+
+import csv
+import logging
+import operator
+import threading
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from functools import cached_property
+from pathlib import Path
+
+from pydantic import ValidationError
+
+from src.settings import settings
+from src.utils.cache import CacheKey, cache_key, settings_fingerprint
+from src.utils.ingest import read_columns
+from src.utils.render import cached_render
+from src.utils.snapshot import load_snapshot
+
+logger = logging.getLogger(__name__)
+
+FileState = tuple[int, int]
+
+# (events, first_start, last_end) of a calendar; all ``None`` when unknown.
+Summary = tuple[int | None, int | None, int | None]
+
+_UNKNOWN: Summary = (None, None, None)
+
+
+def _scan(directory: Path) -> dict[str, FileState]:
+    # Imported lazily: the watcher refreshes the catalog, so it imports this module.
+    from src.utils.watcher import scan_directory
+
+    return scan_directory(directory)
+
+
+def _isoformat(timestamp: float | None) -> str | None:
+    return None if timestamp is None else datetime.fromtimestamp(timestamp, UTC).isoformat()
+
+
+def _summary_of(starts, durations) -> Summary:
+    if not len(starts):
+        return (0, None, None)
+    return (len(starts), min(starts), max(map(operator.add, starts, durations)))
+
+
+def summarize(name: str, csv_path: Path, size: int) -> Summary:
+    """Count the events of *csv_path* and find the time span they cover.
+
+    Read from the calendar's snapshot when a current one exists, and
+    otherwise from the parsed CSV; no snapshot is compiled.  Calendars
+    streamed to clients (``size`` at least ``settings.stream_threshold_bytes``)
+    and CSVs that cannot be parsed are not summarised.
+    """
+    if 0 < settings.stream_threshold_bytes <= size:
+        return _UNKNOWN
+    try:
+        snapshot = load_snapshot(csv_path)
+        if snapshot is not None:
+            return _summary_of(snapshot.start, snapshot.duration)
+        columns = read_columns(csv_path)
+    except (OSError, UnicodeDecodeError, ValidationError, csv.Error) as e:
+        logger.warning("Could not summarise calendar %r: %s", name, e)
+        return _UNKNOWN
+    return _summary_of(columns.start, columns.duration)
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    """Metadata of one calendar version.
+
+    The event count and span are summarised on first access (see
+    :func:`summarize`) and then kept for the lifetime of the entry.
+
+    Attributes:
+        name: Calendar name (the CSV file name without ``.csv``).
+        key: Render-cache key of this version.
+        last_modified: Modification time of the CSV as a POSIX timestamp.
+        size: Size of the CSV in bytes.
+    """
+
+    name: str
+    key: CacheKey
+    last_modified: float
+    size: int
+
+    @cached_property
+    def _summary(self) -> Summary:
+        return summarize(self.name, Path(self.key[0]), self.size)
+
+    @property
+    def events(self) -> int | None:
+        """Number of events, or ``None`` if the calendar is streamed or cannot be parsed."""
+        return self._summary[0]
+
+    @property
+    def first_start(self) -> int | None:
+        """Earliest event start as a POSIX timestamp."""
+        return self._summary[1]
+
+    @property
+    def last_end(self) -> int | None:
+        """Latest event end as a POSIX timestamp."""
+        return self._summary[2]
+
+    @property
+    def etag(self) -> str | None:
+        """``ETag`` of the rendered payload, or ``None`` until this version has been rendered."""
+        rendered = cached_render(self.key)
+        return rendered.etag if rendered is not None else None
+
+    def as_dict(self) -> dict:
+        """Return the JSON representation served by ``GET /``."""
+        return {
+            "events": self.events,
+            "first_start": _isoformat(self.first_start),
+            "last_end": _isoformat(self.last_end),
+            "last_modified": _isoformat(self.last_modified),
+            "size": self.size,
+            "etag": self.etag,
+        }
+
+
+def describe(csv_path: Path) -> CatalogEntry:
+    """Build the :class:`CatalogEntry` for the current version of *csv_path* from its ``stat``.
+
+    Raises:
+        OSError: If *csv_path* cannot be read.
+    """
+    stat = csv_path.stat()
+    return CatalogEntry(csv_path.stem, cache_key(csv_path.resolve(), stat), stat.st_mtime, stat.st_size)
+
+
+class Catalog:
+    """Cached :class:`CatalogEntry` objects for the calendars of one directory."""
+
+    def __init__(self) -> None:
+        self._directory: Path | None = None
+        self._states: dict[str, FileState] = {}
+        self._directory_mtime: int | None = None
+        self._scanned_at = 0.0
+        self._entries: dict[str, CatalogEntry] = {}
+        self._lock = threading.Lock()
+
+    def clear(self) -> None:
+        """Forget every entry and the last directory scan."""
+        with self._lock:
+            self._reset(None)
+
+    def _reset(self, directory: Path | None) -> None:
+        self._directory = directory
+        self._states = {}
+        self._directory_mtime = None
+        self._entries.clear()
+
+    def _use(self, directory: Path) -> None:
+        """Drop everything known about another directory."""
+        with self._lock:
+            if directory != self._directory:
+                self._reset(directory)
+
+    def _current_states(self, directory: Path) -> dict[str, FileState]:
+        """Return the CSV states of *directory*, rescanning only when it may have changed."""
+        try:
+            directory_mtime = directory.stat().st_mtime_ns
+        except OSError:
+            return {}
+        with self._lock:
+            if (
+                directory_mtime == self._directory_mtime
+                and time.monotonic() - self._scanned_at < settings.watch_poll_interval
+            ):
+                return self._states
+        states = _scan(directory)
+        with self._lock:
+            self._states, self._directory_mtime, self._scanned_at = states, directory_mtime, time.monotonic()
+        return states
+
+    def _entry(self, directory: Path, name: str, state: FileState) -> CatalogEntry | None:
+        with self._lock:
+            cached = self._entries.get(name)
+        if cached is not None and cached.key[1:] == (*state, settings_fingerprint()):
+            return cached
+        try:
+            entry = describe(directory / f"{name}.csv")
+        except OSError:
+            return None
+        with self._lock:
+            self._entries[name] = entry
+        return entry
+
+    def update(self, directory: Path, states: dict[str, FileState] | None = None) -> list[CatalogEntry]:
+        """Bring the catalog up to date and return its entries, sorted by name.
+
+        Only calendars whose CSV changed since they were last described
+        get a new entry; entries of removed calendars are dropped.
+
+        Args:
+            directory: The data directory.
+            states: ``{name: (mtime_ns, size)}`` of its CSV files, as
+                maintained by the data-directory watcher.  Scanned from
+                *directory* when omitted.
+        """
+        self._use(directory)
+        if states is None:
+            states = self._current_states(directory)
+        entries = []
+        for name in sorted(states):
+            entry = self._entry(directory, name, states[name])
+            if entry is not None:
+                entries.append(entry)
+        with self._lock:
+            for name in self._entries.keys() - states.keys():
+                del self._entries[name]
+        return entries
+
+    def lookup(self, directory: Path, name: str) -> CatalogEntry | None:
+        """Return the entry of calendar *name*, describing only that calendar if it changed.
+
+        Returns:
+            The entry, or ``None`` if the calendar does not exist.
+        """
+        self._use(directory)
+        try:
+            stat = (directory / f"{name}.csv").stat()
+        except OSError:
+            return None
+        return self._entry(directory, name, (stat.st_mtime_ns, stat.st_size))
+
+
+catalog = Catalog()
@@ -0,0 +1,122 @@
+"""Pre-compressed variants of rendered calendars.
+
+iCal payloads are highly repetitive text and compress to a fraction of
+their size, but compressing on every response would burn CPU on each
+client poll.  :func:`compress_variants` instead produces every
+configured ``Content-Encoding`` once per calendar version, at render
+time, and the variants are cached alongside the identity bytes.
+:func:`negotiate` then picks the variant to serve from the request's
+``Accept-Encoding`` header.
+
+``gzip`` is always available.  ``br`` requires the optional ``brotli``
+package and ``zstd`` the optional ``zstandard`` package; encodings whose
+library is not installed are silently skipped.
+"""
+
+import gzip
+from collections.abc import Callable, Collection
+
+from src.settings import settings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+
+def _gzip(content: bytes) -> bytes:
+    # mtime=0 keeps the output deterministic for identical input.
+    return gzip.compress(content, compresslevel=9, mtime=0)
+
+
+# Levels trade a few percent of ratio for much faster compression: the
+# slowest brotli/zstd levels cost tens of times more CPU per render.
+COMPRESSORS: dict[str, Callable[[bytes], bytes]] = {"gzip": _gzip}
+if brotli is not None:
+    COMPRESSORS["br"] = lambda content: brotli.compress(content, mode=brotli.MODE_TEXT, quality=9)
+if zstandard is not None:
+    COMPRESSORS["zstd"] = lambda content: zstandard.ZstdCompressor(level=10).compress(content)
+
+
+def available_encodings() -> list[str]:
+    """Return the configured encodings that can be produced, in preference order."""
+    return [encoding for encoding in settings.compression_encodings if encoding in COMPRESSORS]
+
+
+def compress_variants(content: bytes) -> dict[str, bytes]:
+    """Compress *content* with every available encoding.
+
+    Payloads smaller than ``settings.compression_min_bytes`` are not
+    worth compressing, and variants that do not come out smaller than
+    the original are dropped.
+
+    Args:
+        content: The identity-encoded payload.
+
+    Returns:
+        A mapping of ``Content-Encoding`` token to compressed bytes,
+        ordered by preference.
+    """
+    if len(content) < settings.compression_min_bytes:
+        return {}
+    variants = {}
+    for encoding in available_encodings():
+        compressed = COMPRESSORS[encoding](content)
+        if len(compressed) < len(content):
+            variants[encoding] = compressed
+    return variants
+
+
+def _parse_accept_encoding(header: str) -> dict[str, float]:
+    """Parse an ``Accept-Encoding`` header into ``{coding: qvalue}``."""
+    accepted = {}
+    for item in header.split(","):
+        coding, *params = (part.strip() for part in item.split(";"))
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding.lower()] = q
+    return accepted
+
+
+def negotiate(header: str | None, available: Collection[str]) -> str | None:
+    """Choose a content coding for a response.
+
+    Among the *available* codings the client accepts with a non-zero
+    quality value, the one with the highest quality wins; ties are
+    broken by the order of *available* (the server's preference).  An
+    explicit ``identity`` entry with a higher quality disables
+    compression.
+
+    Args:
+        header: The request's ``Accept-Encoding`` header, if any.
+        available: Codings for which a pre-compressed variant exists,
+            in preference order.
+
+    Returns:
+        The chosen coding, or ``None`` to serve the identity payload.
+    """
+    if not header or not available:
+        return None
+    accepted = _parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+    best, best_q = None, 0.0
+    for coding in available:
+        q = accepted.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    if best_q < accepted.get("identity", 0.0):
+        return None
+    return best
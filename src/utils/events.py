@@ -0,0 +1,141 @@
+"""JSON event listings with cursor-based pagination.
+
+``GET /{name}/events`` serves the events of a calendar as JSON for web
+clients that should not have to download and parse a whole ``.ics``
+file.  Listings are read from the cached
+:class:`~src.utils.window.CalendarIndex` of the calendar version, so
+rows are neither re-parsed nor re-validated per request and only the
+events on the requested page are materialised.
+
+Events are ordered by start time, then by ``UID``, then by row, since
+identical rows share a ``UID``.  A cursor encodes the ``(start, UID,
+row)`` position of the last event on a page, so it stays valid across
+requests and even across edits of the CSV file: the next page resumes
+after that position, whatever was inserted or removed before it.
+"""
+
+import base64
+import binascii
+import json
+from collections.abc import Callable
+from itertools import groupby
+from operator import itemgetter
+
+from src.models import CSVEntry
+from src.utils.ical import event_coordinates, make_uid
+from src.utils.location import format_address
+from src.utils.time import event_times
+from src.utils.window import CalendarIndex
+
+# (event start, UID, row) of an event; rows only separate identical events.
+Position = tuple[int, str, int]
+
+
+def _geo(entry: CSVEntry) -> list[float] | None:
+    coords = event_coordinates(entry)
+    return list(coords) if coords else None
+
+
+# Field name -> value for an entry; the UID is computed once per event and passed in.
+FIELDS: dict[str, Callable[[CSVEntry, str], object]] = {
+    "uid": lambda entry, uid: uid,
+    "name": lambda entry, uid: entry.name,
+    "description": lambda entry, uid: entry.description,
+    "start": lambda entry, uid: event_times(entry)[0].isoformat(),
+    "end": lambda entry, uid: event_times(entry)[1].isoformat(),
+    "all_day": lambda entry, uid: entry.duration.endswith("d"),
+    "timezone": lambda entry, uid: entry.timezone,
+    "location_name": lambda entry, uid: entry.location_name or entry.name,
+    "address": lambda entry, uid: format_address(entry.location, entry.place) if entry.location else "",
+    "geo": lambda entry, uid: _geo(entry),
+}
+
+
+def parse_fields(value: str | None) -> list[str]:
+    """Parse a comma-separated ``fields`` parameter.
+
+    Returns:
+        The requested field names, or every field when *value* is empty.
+
+    Raises:
+        ValueError: If a name is not in :data:`FIELDS`.
+    """
+    if not value:
+        return list(FIELDS)
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return names
+
+
+def encode_cursor(position: Position) -> str:
+    """Return the opaque cursor for the event at *position*."""
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Position:
+    """Return the position encoded in *cursor*.
+
+    Raises:
+        ValueError: If *cursor* was not produced by :func:`encode_cursor`.
+    """
+    try:
+        start, uid, row = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+    if isinstance(start, int) and isinstance(uid, str) and isinstance(row, int):
+        return start, uid, row
+    raise ValueError("Invalid cursor")
+
+
+def list_events(
+    index: CalendarIndex,
+    calendar_name: str,
+    fields: list[str],
+    start: float | None = None,
+    end: float | None = None,
+    cursor: str | None = None,
+    limit: int = 100,
+) -> dict:
+    """Return one page of the events overlapping ``[start, end)``.
+
+    Args:
+        index: Index of the calendar version to list.
+        calendar_name: Name of the calendar, part of every ``UID``.
+        fields: Names from :data:`FIELDS` to include per event.
+        start: Window start as a POSIX timestamp.
+        end: Window end as a POSIX timestamp.
+        cursor: ``next_cursor`` of the previous page, if any.
+        limit: Maximum number of events on the page.
+
+    Returns:
+        ``{"events": [...], "next_cursor": str | None}``, where
+        ``next_cursor`` is ``None`` on the last page.
+
+    Raises:
+        ValueError: If *cursor* is invalid.
+    """
+    after = decode_cursor(cursor) if cursor else None
+    page: list[tuple[Position, CSVEntry]] = []
+    more = False
+
+    scan = index.scan(start, end, after[0] if after else None)
+    for event_start, group in groupby(scan, key=itemgetter(0)):
+        # Order events starting at the same time by UID, then row, for stable cursors.
+        ties = sorted(
+            (((event_start, make_uid(e.name, e.date_str, e.time_str, calendar_name), row), e) for _, row, e in group),
+            key=itemgetter(0),
+        )
+        for position, entry in ties:
+            if after is not None and position <= after:
+                continue
+            if len(page) == limit:
+                more = True
+                break
+            page.append((position, entry))
+        if more:
+            break
+
+    events = [{field: FIELDS[field](entry, uid) for field in fields} for (_, uid, _), entry in page]
+    return {"events": events, "next_cursor": encode_cursor(page[-1][0]) if more else None}
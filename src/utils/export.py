@@ -0,0 +1,208 @@
+"""Static export of every calendar for serving without Python.
+
+:func:`export_calendars` renders each CSV in the data directory with the
+same pipeline as the server (:func:`~src.utils.render.render_calendar`),
+spread over a process pool, and writes the results into an output
+directory that nginx or a CDN can serve directly::
+
+    <name>.ics          identity payload
+    <name>.ics.gz       pre-compressed variants (``gzip_static``,
+    <name>.ics.br       ``brotli_static`` and similar), when they are
+    <name>.ics.zst      smaller than the payload
+    manifest.json       content hashes and export metadata
+
+Every file is written to a temporary name and atomically renamed into
+place, and ``manifest.json`` is replaced last, so readers never see a
+partially written file.  A calendar is skipped when its CSV content hash
+and the output-relevant settings match the previous manifest and no
+address it was missing coordinates for has been geocoded since; files
+of calendars that no longer exist are removed.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from src.utils.cache import settings_fingerprint
+from src.utils.geostore import get_geocode_store
+from src.utils.render import render_calendar
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+MANIFEST_VERSION = 1
+
+# File suffixes of the pre-compressed variants, as expected by nginx and CDNs.
+SUFFIXES = {"gzip": ".gz", "br": ".br", "zstd": ".zst"}
+
+
+@dataclass
+class ExportReport:
+    """Outcome of an :func:`export_calendars` run.
+
+    Attributes:
+        exported: Calendars that were rendered and written.
+        skipped: Calendars whose previous export was still current.
+        removed: Calendars whose files were deleted because their CSV is gone.
+        failed: Calendars that could not be exported, with the error message.
+    """
+
+    exported: list[str] = field(default_factory=list)
+    skipped: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    failed: dict[str, str] = field(default_factory=dict)
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write *data* to *path* through a temporary file and an atomic rename."""
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+
+def _load_manifest(output_dir: Path) -> dict[str, dict]:
+    try:
+        manifest = json.loads((output_dir / MANIFEST).read_text())
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest.get("calendars", {})
+
+
+def _files_of(entry: dict) -> list[str]:
+    return [entry["file"], *(variant["file"] for variant in entry.get("encodings", {}).values())]
+
+
+def _is_current(entry: dict | None, csv_hash: str, fingerprint: str, output_dir: Path) -> bool:
+    """Return ``True`` if the manifest *entry* still describes the current output."""
+    if entry is None or entry.get("csv_sha256") != csv_hash or entry.get("settings") != fingerprint:
+        return False
+    if not all((output_dir / name).is_file() for name in _files_of(entry)):
+        return False
+    store = get_geocode_store()
+    return not any(store.get(address)[0] for address in entry.get("unresolved", ()))
+
+
+def _export_one(csv_path: Path, csv_hash: str, fingerprint: str, last_modified: float, output_dir: Path) -> dict:
+    """Render one calendar, write its files and return its manifest entry."""
+    name = csv_path.stem
+    rendered = render_calendar(csv_path, name, last_modified)
+    entry = {
+        "file": f"{name}.ics",
+        "sha256": _sha256(rendered.content),
+        "size": len(rendered.content),
+        "etag": rendered.etag,
+        "last_modified": last_modified,
+        "csv_sha256": csv_hash,
+        "settings": fingerprint,
+        "unresolved": sorted(rendered.unresolved),
+        "encodings": {},
+    }
+    for encoding, blob in rendered.encodings.items():
+        variant = f"{name}.ics{SUFFIXES.get(encoding, '.' + encoding)}"
+        _write_atomic(output_dir / variant, blob)
+        entry["encodings"][encoding] = {"file": variant, "sha256": _sha256(blob), "size": len(blob)}
+    # The identity file goes last so a complete set of variants exists once it changes.
+    _write_atomic(output_dir / entry["file"], rendered.content)
+    return entry
+
+
+def export_calendars(
+    data_dir: Path,
+    output_dir: Path,
+    workers: int | None = None,
+    force: bool = False,
+    progress: Callable[[str, str], None] = lambda name, outcome: None,
+) -> ExportReport:
+    """Render every calendar in *data_dir* into *output_dir*.
+
+    Args:
+        data_dir: Directory of CSV calendars.
+        output_dir: Where ``.ics`` files, variants and the manifest are
+            written.  Created if missing.
+        workers: Number of worker processes; ``1`` renders in this
+            process, ``None`` uses one per CPU.
+        force: Re-export every calendar even if it is unchanged.
+        progress: Called with each calendar name and its outcome
+            (``"exported"``, ``"unchanged"``, ``"removed"`` or the
+            error message).
+
+    Returns:
+        Which calendars were exported, skipped, removed or failed.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    previous = _load_manifest(output_dir)
+    calendars: dict[str, dict] = {}
+    report = ExportReport()
+
+    fingerprint = _sha256(repr(settings_fingerprint()).encode())[:16]
+    jobs = []
+    for csv_path in sorted(data_dir.glob("*.csv")):
+        name = csv_path.stem
+        try:
+            stat = csv_path.stat()
+            csv_hash = _sha256(csv_path.read_bytes())
+        except OSError as e:
+            report.failed[name] = str(e)
+            progress(name, str(e))
+            continue
+        if not force and _is_current(previous.get(name), csv_hash, fingerprint, output_dir):
+            calendars[name] = previous[name]
+            report.skipped.append(name)
+            progress(name, "unchanged")
+            continue
+        jobs.append((csv_path, csv_hash, fingerprint, stat.st_mtime))
+
+    executor: Executor = ThreadPoolExecutor(max_workers=1) if workers == 1 else ProcessPoolExecutor(max_workers=workers)
+    with executor:
+        futures = {executor.submit(_export_one, *job, output_dir): job[0].stem for job in jobs}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                calendars[name] = future.result()
+            except Exception as e:
+                logger.exception("Could not export %s", name)
+                report.failed[name] = str(e)
+                progress(name, str(e))
+                # Keep serving the previous export, if any.
+                if name in previous:
+                    calendars[name] = previous[name]
+                continue
+            report.exported.append(name)
+            progress(name, "exported")
+
+    present = {csv_path.stem for csv_path in data_dir.glob("*.csv")} | set(report.failed)
+    for name, entry in previous.items():
+        if name not in present and name not in calendars:
+            for filename in _files_of(entry):
+                (output_dir / filename).unlink(missing_ok=True)
+            report.removed.append(name)
+            progress(name, "removed")
+    # Variants no longer produced (e.g. after a settings change) are stale.
+    for name, entry in calendars.items():
+        old = previous.get(name)
+        if old is not None and old is not entry:
+            for filename in set(_files_of(old)) - set(_files_of(entry)):
+                (output_dir / filename).unlink(missing_ok=True)
+
+    manifest = {"version": MANIFEST_VERSION, "calendars": dict(sorted(calendars.items()))}
+    _write_atomic(output_dir / MANIFEST, (json.dumps(manifest, indent=2) + "\n").encode())
+    report.exported.sort()
+    return report
@@ -0,0 +1,149 @@
+"""Content-addressed cache of serialised ``VEVENT`` blocks.
+
+Editing one row of a large calendar changes its cache key, so the whole
+calendar is rendered again, yet every other row would produce exactly
+the same ``VEVENT`` bytes as before.  :class:`FragmentCache` keeps the
+serialised block of each event keyed on a digest of everything that
+determines it (see :func:`fragment_key`): the row's fields, the calendar
+name that also seeds the event ``UID``, the coordinates known for its
+address and the serializer in use.  A rebuild then only serialises rows
+that are new or changed and concatenates cached fragments for the rest.
+
+``DTSTAMP`` is the one property that does not derive from the row (it
+is the CSV file's modification time), so fragments are stored with that
+line cut out (see :class:`Fragment`) and the renderer splices in the
+value for the calendar version being rendered.
+
+The cache lives in the process that renders; with
+``RENDER_EXECUTOR=process`` each worker process keeps its own.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+from src.models import CSVEntry
+from src.settings import settings
+from src.utils.metrics import FRAGMENT_CACHE_REQUESTS, REGISTRY, Gauge
+
+# Rough per-entry bookkeeping cost on top of the fragment bytes.
+_OVERHEAD = 200
+
+
+class Fragment(NamedTuple):
+    """A serialised ``VEVENT`` with its ``DTSTAMP`` line removed.
+
+    Attributes:
+        head: Everything before the ``DTSTAMP`` line.
+        tail: Everything after it.
+    """
+
+    head: bytes
+    tail: bytes
+
+    @classmethod
+    def split(cls, event: bytes) -> "Fragment":
+        """Split a serialised ``VEVENT`` around its ``DTSTAMP`` line."""
+        # Folded continuation lines start with a space, so this can only
+        # match the property itself.
+        start = event.index(b"\r\nDTSTAMP:") + 2
+        end = event.index(b"\r\n", start) + 2
+        return cls(event[:start], event[end:])
+
+    def join(self, dtstamp_line: bytes) -> bytes:
+        """Return the complete ``VEVENT`` with *dtstamp_line* spliced back in."""
+        return self.head + dtstamp_line + self.tail
+
+    @property
+    def size(self) -> int:
+        return len(self.head) + len(self.tail) + _OVERHEAD
+
+
+def fragment_key(entry: CSVEntry, calendar_name: str, coords: tuple[float, float] | None) -> bytes:
+    """Return the digest identifying the ``VEVENT`` rendered for *entry*.
+
+    Args:
+        entry: The validated CSV row.
+        calendar_name: Name of the containing calendar; part of the
+            event's ``UID``.
+        coords: Coordinates known for the row's address, if any.
+    """
+    identity = (
+        settings.project_name,
+        settings.ical_serializer,
+        calendar_name,
+        coords,
+        tuple(entry.__dict__.values()),
+    )
+    return hashlib.blake2b(repr(identity).encode(), digest_size=16).digest()
+
+
+class FragmentCache:
+    """Byte-bounded LRU cache of :class:`Fragment` objects.
+
+    All operations are guarded by a lock so the cache can be shared
+    between render threads.
+
+    Args:
+        max_bytes: Upper bound on the summed size of cached fragments.
+            When ``None`` the value of
+            ``settings.fragment_cache_max_bytes`` is read on every
+            insertion; ``0`` disables the cache.
+    """
+
+    def __init__(self, max_bytes: int | None = None) -> None:
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[bytes, Fragment] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes if self._max_bytes is not None else settings.fragment_cache_max_bytes
+
+    @property
+    def size_bytes(self) -> int:
+        """Total size of the cached fragments in bytes."""
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: bytes) -> Fragment | None:
+        """Return the fragment stored under *key*, or ``None`` on a miss."""
+        with self._lock:
+            fragment = self._entries.get(key)
+            if fragment is not None:
+                self._entries.move_to_end(key)
+        FRAGMENT_CACHE_REQUESTS.inc(result="miss" if fragment is None else "hit")
+        return fragment
+
+    def put(self, key: bytes, fragment: Fragment) -> None:
+        """Store *fragment* under *key*, evicting least-recently-used fragments as needed."""
+        max_bytes = self.max_bytes
+        size = fragment.size
+        if size > max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous.size
+            self._entries[key] = fragment
+            self._size += size
+            while self._size > max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted.size
+
+    def clear(self) -> None:
+        """Drop every cached fragment."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+fragment_cache = FragmentCache()
+
+REGISTRY.register(
+    Gauge("ical_fragment_cache_bytes", "Bytes held by the VEVENT fragment cache.", lambda: fragment_cache.size_bytes)
+)
@@ -0,0 +1,189 @@
+"""Asynchronous geocoding over a pooled HTTP client.
+
+The background :data:`~src.utils.geoqueue.geocode_queue` resolves
+addresses through :data:`geocoder`, an :class:`AsyncGeocoder` that keeps
+one keep-alive :class:`httpx.AsyncClient` for the lifetime of the
+application (opened and closed by the FastAPI lifespan in
+:mod:`src.main`) instead of opening a new connection per lookup.
+Requests time out after ``settings.geocode_timeout`` seconds and
+transient failures are retried with exponential backoff.
+
+The HTTP details live in a :class:`GeocodingProvider`.
+:class:`NominatimProvider` talks to any Nominatim-compatible
+``/search`` endpoint at ``settings.geocode_url``, so a local stand-in
+server can replace the public service; tests can also pass their own
+provider or an ``httpx`` transport to :class:`AsyncGeocoder`.
+"""
+
+import asyncio
+import logging
+from typing import Protocol
+
+import httpx
+
+from src.settings import settings
+from src.utils.geostore import get_geocode_store
+from src.utils.metrics import GEOCODE_REQUEST_SECONDS, GEOCODE_REQUESTS, timer
+
+logger = logging.getLogger(__name__)
+
+Coordinates = tuple[float, float]
+
+# Upper bound on a single backoff delay, in seconds.
+_MAX_BACKOFF = 60.0
+
+
+class GeocodingError(RuntimeError):
+    """A lookup failed for a reason that may go away on retry.
+
+    Args:
+        message: Description of the failure.
+        retry_after: Seconds the service asked us to wait, if it said so.
+    """
+
+    def __init__(self, message: str, retry_after: float | None = None) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class GeocodingProvider(Protocol):
+    """Resolves a single address over HTTP."""
+
+    async def geocode(self, client: httpx.AsyncClient, address: str) -> Coordinates | None:
+        """Return the coordinates of *address*, or ``None`` if it is unknown.
+
+        Raises:
+            GeocodingError: For failures worth retrying (timeouts,
+                connection errors, rate limiting, server errors).
+        """
+        ...
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    try:
+        return float(response.headers["retry-after"])
+    except (KeyError, ValueError):
+        return None
+
+
+class NominatimProvider:
+    """Provider for the Nominatim ``/search`` API.
+
+    Args:
+        base_url: Root URL of the Nominatim instance; defaults to
+            ``settings.geocode_url``.
+    """
+
+    def __init__(self, base_url: str | None = None) -> None:
+        self.base_url = (base_url or settings.geocode_url).rstrip("/")
+
+    async def geocode(self, client: httpx.AsyncClient, address: str) -> Coordinates | None:
+        try:
+            response = await client.get(
+                f"{self.base_url}/search", params={"q": address, "format": "jsonv2", "limit": "1"}
+            )
+        except httpx.TransportError as e:
+            raise GeocodingError(f"{type(e).__name__}: {e}") from e
+
+        if response.status_code == 429 or response.status_code >= 500:
+            raise GeocodingError(f"HTTP {response.status_code}", retry_after=_retry_after(response))
+        response.raise_for_status()
+
+        results = response.json()
+        if not results:
+            return None
+        return float(results[0]["lat"]), float(results[0]["lon"])
+
+
+class AsyncGeocoder:
+    """Geocodes addresses through a provider and persists the results.
+
+    Args:
+        provider: The provider to query; defaults to a
+            :class:`NominatimProvider`.
+        transport: Optional ``httpx`` transport for the pooled client,
+            e.g. :class:`httpx.MockTransport` in tests.
+    """
+
+    def __init__(self, provider: GeocodingProvider | None = None, transport: httpx.AsyncBaseTransport | None = None):
+        self.provider = provider
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+
+    def _new_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            headers={"User-Agent": settings.user_agent},
+            timeout=settings.geocode_timeout,
+            limits=httpx.Limits(max_connections=settings.geocode_max_connections, keepalive_expiry=30.0),
+            transport=self._transport,
+            follow_redirects=True,
+        )
+
+    async def start(self) -> None:
+        """Open the pooled HTTP client."""
+        if self._client is None:
+            self._client = self._new_client()
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client and its connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def lookup(self, address: str) -> Coordinates | None:
+        """Query the provider for *address*, retrying transient failures.
+
+        Makes up to ``settings.geocode_retries + 1`` attempts, waiting
+        ``settings.geocode_backoff * 2**n`` seconds (or the service's
+        ``Retry-After``) between them.
+
+        Raises:
+            GeocodingError: When every attempt failed.
+        """
+        if self._client is None:
+            await self.start()
+        provider = self.provider or NominatimProvider()
+        attempt = 0
+        while True:
+            try:
+                with timer(GEOCODE_REQUEST_SECONDS):
+                    coords = await provider.geocode(self._client, address)
+            except GeocodingError as e:
+                GEOCODE_REQUESTS.inc(outcome="error")
+                if attempt >= settings.geocode_retries:
+                    raise
+                delay = e.retry_after if e.retry_after is not None else settings.geocode_backoff * 2**attempt
+                logger.info("Geocoding %r failed (%s); retrying in %.1fs", address, e, delay)
+                await asyncio.sleep(min(delay, _MAX_BACKOFF))
+                attempt += 1
+                continue
+            GEOCODE_REQUESTS.inc(outcome="found" if coords else "not_found")
+            return coords
+
+    async def resolve(self, address: str) -> Coordinates | None:
+        """Resolve *address* through the persistent store, falling back to the provider.
+
+        Definitive answers, including "not found", are written to the
+        store.  Failures are logged and not persisted, so the address is
+        retried on its next lookup.
+
+        Returns:
+            The coordinates, or ``None`` if geocoding is disabled, the
+            address is unknown or the lookup failed.
+        """
+        if not settings.geocode_enabled:
+            return None
+        store = get_geocode_store()
+        found, coords = await asyncio.to_thread(store.get, address)
+        if found:
+            return coords
+        try:
+            coords = await self.lookup(address)
+        except (GeocodingError, httpx.HTTPError, ValueError, KeyError) as e:
+            logger.warning("Geocoding %r failed: %s", address, e)
+            return None
+        await asyncio.to_thread(store.put, address, coords)
+        return coords
+
+
+geocoder = AsyncGeocoder()
@@ -0,0 +1,246 @@
+"""Background, rate-limited geocoding for calendar rendering.
+
+Rendering a calendar must never wait on Nominatim.  Instead of geocoding
+inline, the renderer calls :func:`lookup_coordinates`, which only reads
+the persistent :class:`~src.utils.geostore.GeocodeStore`.  Addresses the
+store does not know yet are handed to the process-wide
+:data:`geocode_queue`, whose worker task resolves them through the
+pooled :data:`~src.utils.geocoder.geocoder` behind a
+:class:`TokenBucket` so the service's one-request-per-second usage
+policy is respected.  The bucket paces when requests are *sent*; a slow
+response does not hold back the next request, and up to
+``settings.geocode_max_connections`` lookups may be in flight at once.
+The calendar is served immediately without coordinates for those
+addresses; once results land the queue's :attr:`GeocodeQueue.generation`
+advances and subsequent renders pick them up.
+
+The worker runs on the application's event loop and is started and
+stopped from the FastAPI lifespan in :mod:`src.main`.  Addresses
+enqueued before the worker starts are kept and processed on start-up.
+"""
+
+import asyncio
+import inspect
+import logging
+import threading
+import time
+from collections.abc import Awaitable, Callable, Iterable, Iterator
+from contextlib import contextmanager
+
+from src.settings import settings
+from src.utils.geocoder import geocoder
+from src.utils.geostore import GeocodeStore, get_geocode_store
+from src.utils.metrics import GEOCODE_LOOKUPS, REGISTRY, Gauge
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Token-bucket rate limiter.
+
+    Tokens accrue continuously at *rate* per second up to *capacity*;
+    each acquisition consumes one token.
+
+    Args:
+        rate: Tokens added per second.
+        capacity: Maximum number of tokens that can be banked, i.e. the
+            largest permitted burst.
+        clock: Monotonic time source, injectable for tests.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0, clock: Callable[[], float] = time.monotonic) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+
+    def try_acquire(self) -> float:
+        """Take a token if one is available.
+
+        Returns:
+            ``0.0`` when a token was taken, otherwise the number of
+            seconds until the next token becomes available.
+        """
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return 0.0
+        return (1.0 - self._tokens) / self.rate
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        while (delay := self.try_acquire()) > 0:
+            await asyncio.sleep(delay)
+
+
+class GeocodeQueue:
+    """De-duplicating queue of addresses awaiting background geocoding.
+
+    :meth:`enqueue` is thread-safe and may be called from the event loop
+    or from worker threads.  An address is queued at most once until its
+    lookup has finished.
+
+    Args:
+        resolve: Function that geocodes one address and persists the
+            result; defaults to :meth:`AsyncGeocoder.resolve
+            <src.utils.geocoder.AsyncGeocoder.resolve>` of the shared
+            geocoder.  Coroutine functions are awaited on the event loop,
+            blocking functions run in a thread.
+    """
+
+    def __init__(self, resolve: Callable[[str], object] | Callable[[str], Awaitable[object]] | None = None) -> None:
+        self._resolve = resolve
+        self._pending: set[str] = set()
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue[str] | None = None
+        self._task: asyncio.Task | None = None
+        self._lookups: set[asyncio.Task] = set()
+        self.generation = 0
+
+    @property
+    def pending(self) -> frozenset[str]:
+        """Addresses that are queued or currently being resolved."""
+        with self._lock:
+            return frozenset(self._pending)
+
+    def enqueue(self, address: str) -> None:
+        """Schedule *address* for geocoding unless it is already pending."""
+        with self._lock:
+            if address in self._pending:
+                return
+            self._pending.add(address)
+            loop, queue = self._loop, self._queue
+        if loop is not None and queue is not None:
+            loop.call_soon_threadsafe(queue.put_nowait, address)
+
+    def enqueue_many(self, addresses: Iterable[str]) -> None:
+        """Schedule every address in *addresses* (see :meth:`enqueue`)."""
+        for address in addresses:
+            self.enqueue(address)
+
+    def start(self) -> None:
+        """Start the worker task on the running event loop."""
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        with self._lock:
+            for address in self._pending:
+                self._queue.put_nowait(address)
+        self._task = self._loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Cancel the worker task and any lookups in flight, and wait for them to finish."""
+        if self._task is None:
+            return
+        tasks = [self._task, *self._lookups]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = self._loop = self._queue = None
+
+    async def _run(self) -> None:
+        limiter = TokenBucket(settings.geocode_rate_limit, settings.geocode_burst)
+        slots = asyncio.Semaphore(max(1, settings.geocode_max_connections))
+        while True:
+            batch = [await self._queue.get()]
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            await self._process(batch, limiter, slots)
+
+    async def _process(self, batch: list[str], limiter: TokenBucket, slots: asyncio.Semaphore) -> None:
+        store = get_geocode_store()
+        for address in batch:
+            try:
+                if store.get(address)[0]:
+                    self._finish(address, resolved=True)
+                    continue
+            except Exception:
+                logger.exception("Background geocoding failed for %r", address)
+                self._finish(address, resolved=False)
+                continue
+            await slots.acquire()
+            await limiter.acquire()
+            task = asyncio.get_running_loop().create_task(self._lookup(address, store))
+            self._lookups.add(task)
+            task.add_done_callback(lambda task: (self._lookups.discard(task), slots.release()))
+
+    async def _lookup(self, address: str, store: GeocodeStore) -> None:
+        resolved = False
+        try:
+            resolve = self._resolve or geocoder.resolve
+            if inspect.iscoroutinefunction(resolve):
+                await resolve(address)
+            else:
+                await asyncio.to_thread(resolve, address)
+            resolved = store.get(address)[0]
+        except Exception:
+            logger.exception("Background geocoding failed for %r", address)
+        finally:
+            self._finish(address, resolved)
+
+    def _finish(self, address: str, resolved: bool) -> None:
+        if resolved:
+            self.generation += 1
+        with self._lock:
+            self._pending.discard(address)
+
+
+geocode_queue = GeocodeQueue()
+
+REGISTRY.register(
+    Gauge("geocode_queue_pending", "Addresses waiting for background geocoding.", lambda: len(geocode_queue.pending))
+)
+
+_local = threading.local()
+
+
+@contextmanager
+def collect_unresolved() -> Iterator[set[str]]:
+    """Collect unresolved addresses instead of enqueueing them directly.
+
+    Inside the ``with`` block, :func:`lookup_coordinates` calls made on
+    the current thread add unknown addresses to the yielded set rather
+    than to :data:`geocode_queue`.  This lets renders running in another
+    process or thread report their misses back to the caller.
+    """
+    previous = getattr(_local, "unresolved", None)
+    _local.unresolved = unresolved = set()
+    try:
+        yield unresolved
+    finally:
+        _local.unresolved = previous
+
+
+def lookup_coordinates(address: str) -> tuple[float, float] | None:
+    """Return already-known coordinates for *address* without any network I/O.
+
+    Only the persistent geocode store is consulted.  Unknown addresses
+    are recorded by the active :func:`collect_unresolved` block, or
+    enqueued on :data:`geocode_queue` when there is none, and ``None`` is
+    returned so rendering can proceed immediately.
+
+    Args:
+        address: A full address string, as produced by
+            :func:`~src.utils.location.format_address`.
+
+    Returns:
+        A ``(latitude, longitude)`` tuple when the address has been
+        geocoded before, otherwise ``None``.
+    """
+    if not settings.geocode_enabled:
+        return None
+
+    found, coords = get_geocode_store().get(address)
+    GEOCODE_LOOKUPS.inc(result="miss" if not found else "hit" if coords else "negative")
+    if not found:
+        unresolved = getattr(_local, "unresolved", None)
+        if unresolved is not None:
+            unresolved.add(address)
+        else:
+            geocode_queue.enqueue(address)
+    return coords
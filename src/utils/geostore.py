@@ -0,0 +1,141 @@
+"""Persistent, process-shared store for geocoding results.
+
+Geocoded coordinates are written to a small SQLite database so that they
+survive restarts and deployments and are shared by every uvicorn worker
+on the host.  Failed lookups ("address not found") are stored as well,
+with a shorter time-to-live, so that unresolvable addresses are not sent
+to Nominatim on every render.
+
+SQLite in WAL mode allows concurrent readers alongside a single writer;
+each thread gets its own connection and writers wait up to
+:data:`_BUSY_TIMEOUT` seconds for the write lock.  Any database error is
+logged and treated as a cache miss so that a broken or read-only cache
+file never prevents a calendar from being served.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_BUSY_TIMEOUT = 5.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS geocode (
+    address TEXT PRIMARY KEY,
+    latitude REAL,
+    longitude REAL,
+    expires_at REAL NOT NULL
+)
+"""
+
+
+class GeocodeStore:
+    """SQLite-backed mapping from address strings to coordinates.
+
+    Args:
+        path: Location of the SQLite database file.  Parent directories
+            are created on first use.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=_BUSY_TIMEOUT, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def get(self, address: str) -> tuple[bool, tuple[float, float] | None]:
+        """Look up *address* in the store.
+
+        Args:
+            address: The exact address string that was geocoded.
+
+        Returns:
+            A ``(found, coords)`` pair.  ``found`` is ``False`` when the
+            address has never been stored, its entry has expired, or the
+            database is unavailable.  When ``found`` is ``True``,
+            ``coords`` is either a ``(latitude, longitude)`` tuple or
+            ``None`` for a cached negative result.
+        """
+        try:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT latitude, longitude FROM geocode WHERE address = ? AND expires_at > ?",
+                    (address, time.time()),
+                )
+                .fetchone()
+            )
+        except sqlite3.Error as e:
+            logger.warning("Geocode cache read failed: %s", e)
+            return False, None
+        if row is None:
+            return False, None
+        if row[0] is None or row[1] is None:
+            return True, None
+        return True, (row[0], row[1])
+
+    def put(self, address: str, coords: tuple[float, float] | None) -> None:
+        """Store the geocoding result for *address*.
+
+        Positive results expire after ``settings.geocode_cache_ttl``
+        seconds, negative results (``coords is None``) after
+        ``settings.geocode_negative_ttl`` seconds.
+        """
+        ttl = settings.geocode_cache_ttl if coords is not None else settings.geocode_negative_ttl
+        lat, lon = coords if coords is not None else (None, None)
+        try:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO geocode (address, latitude, longitude, expires_at) VALUES (?, ?, ?, ?)",
+                (address, lat, lon, time.time() + ttl),
+            )
+        except sqlite3.Error as e:
+            logger.warning("Geocode cache write failed: %s", e)
+
+    def purge_expired(self) -> int:
+        """Delete expired entries and return how many were removed."""
+        try:
+            cursor = self._connect().execute("DELETE FROM geocode WHERE expires_at <= ?", (time.time(),))
+        except sqlite3.Error as e:
+            logger.warning("Geocode cache purge failed: %s", e)
+            return 0
+        return cursor.rowcount
+
+
+_store: GeocodeStore | None = None
+_store_lock = threading.Lock()
+
+
+def geocode_store_path() -> Path:
+    """Return ``settings.geocode_cache_path``, or ``geocode.sqlite3`` in the cache directory when unset."""
+    if settings.geocode_cache_path is not None:
+        return settings.geocode_cache_path
+    return settings.cache_path / "geocode.sqlite3"
+
+
+def get_geocode_store() -> GeocodeStore:
+    """Return the process-wide :class:`GeocodeStore` for :func:`geocode_store_path`.
+
+    The store is created lazily and recreated if the configured path
+    changes at runtime.
+    """
+    global _store
+    path = geocode_store_path()
+    with _store_lock:
+        if _store is None or _store.path != path:
+            _store = GeocodeStore(path)
+        return _store
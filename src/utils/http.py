@@ -0,0 +1,59 @@
+"""Helpers for HTTP conditional requests (``ETag`` / ``Last-Modified``).
+
+Implements the subset of RFC 9110 section 13 needed to answer polling
+calendar clients with ``304 Not Modified``.
+"""
+
+from email.utils import formatdate, parsedate_to_datetime
+
+from starlette.datastructures import Headers
+
+
+def http_date(timestamp: float) -> str:
+    """Format a POSIX timestamp as an IMF-fixdate string (``Last-Modified`` format)."""
+    return formatdate(timestamp, usegmt=True)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Return ``True`` when *etag* appears in an ``If-None-Match`` header value.
+
+    ``If-None-Match`` uses weak comparison, so a ``W/`` prefix on either
+    side is ignored.
+    """
+    if header.strip() == "*":
+        return True
+    bare = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == bare for candidate in header.split(","))
+
+
+def is_not_modified(headers: Headers, etag: str | None, last_modified: float) -> bool:
+    """Decide whether a conditional GET can be answered with ``304``.
+
+    ``If-None-Match`` takes precedence; ``If-Modified-Since`` is only
+    evaluated when no ``If-None-Match`` header was sent.  Unparseable
+    dates are ignored, as the RFC requires.
+
+    Args:
+        headers: The incoming request headers.
+        etag: Current entity tag of the resource (quoted), or ``None``
+            if the resource has none, in which case ``If-None-Match``
+            never matches.
+        last_modified: Current modification time as a POSIX timestamp.
+
+    Returns:
+        ``True`` if the client's cached representation is still current.
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag is not None and _etag_matches(if_none_match, etag)
+
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        return False
+    return int(last_modified) <= since.timestamp()
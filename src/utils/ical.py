@@ -1,13 +1,24 @@
 """Core iCal generation logic: converts a CSV calendar file to iCal bytes.
 
-The public API of this module is the single function :func:`csv_to_ical`.
-It reads a CSV file row-by-row, validates each row against the
-:class:`~src.models.CSVEntry` schema, builds a ``VEVENT`` component for
-every entry, and assembles them into a ``VCALENDAR`` payload.
+The public API of this module consists of :func:`iter_ical`,
+:func:`csv_to_ical` and :func:`entries_to_ical`.  The first two read a
+CSV file row-by-row, validate each row against the
+:class:`~src.models.CSVEntry` schema and build a ``VEVENT`` for every
+entry.  :func:`iter_ical` yields the ``VCALENDAR`` payload incrementally,
+one event at a time, so memory use stays proportional to a single event;
+:func:`csv_to_ical` collects it into one ``bytes`` object.
+:func:`entries_to_ical` renders an already selected subset of entries.
+
+Every ``DTSTAMP`` is the CSV file's modification time, so an unchanged
+calendar renders to identical bytes on every request and its ETag stays
+stable.  Serialised events are cached by content in
+:data:`~src.utils.fragments.fragment_cache`, so re-rendering a calendar
+after an edit only serialises the rows that changed.
 """
 
-import csv
 import hashlib
+import time
+from collections.abc import Iterable, Iterator
 from datetime import datetime
 from pathlib import Path
 
@@ -16,11 +27,21 @@ from icalendar import Calendar, Event
 
 from src.models import CSVEntry
 from src.settings import settings
-from src.utils.location import format_address, get_coordinates
-from src.utils.time import parse_duration
+from src.utils.fragments import Fragment, fragment_cache, fragment_key
+from src.utils.geoqueue import lookup_coordinates
+from src.utils.ingest import iter_csv_entries
+from src.utils.location import format_address
+from src.utils.metrics import RENDER_ROWS, RENDER_STAGE_SECONDS
+from src.utils.recurrence import Recurrence, collapse_series
+from src.utils.serializer import ICalWriter, format_date, format_datetime
+from src.utils.snapshot import load_snapshot
+from src.utils.time import event_times
+from src.utils.timezones import TimezoneTracker, tzid_for
 
+_TRAILER = b"END:VCALENDAR\r\n"
 
-def _make_uid(name: str, date_str: str, time_str: str, calendar_name: str) -> str:
+
+def make_uid(name: str, date_str: str, time_str: str, calendar_name: str) -> str:
     """Build a stable, deterministic UID for a calendar event.
 
     The UID is an MD5 hex digest of the event identity fields, qualified
@@ -39,28 +60,47 @@ def _make_uid(name: str, date_str: str, time_str: str, calendar_name: str) -> st
     return f"{hashlib.md5(seed.encode()).hexdigest()}@{settings.project_name}"
 
 
-def _add_location_properties(event: Event, entry: CSVEntry) -> None:
-    """Populate location-related iCal properties on *event* from *entry*.
+def event_coordinates(entry: CSVEntry) -> tuple[float, float] | None:
+    """Return the already-known coordinates of the address of *entry*, if any.
+
+    Addresses that have not been geocoded yet are queued for background
+    geocoding and picked up by a later render.
+    """
+    if not entry.location:
+        return None
+    return lookup_coordinates(format_address(entry.location, entry.place)) or None
+
 
-    Sets the ``LOCATION`` property and, when geocoding succeeds, also
-    adds ``GEO`` and ``X-APPLE-STRUCTURED-LOCATION``.
+def _location_details(entry: CSVEntry) -> tuple[str, str, str]:
+    """Derive the location-related values of an event from *entry*.
 
     Args:
-        event: The ``VEVENT`` component to mutate.
         entry: The parsed CSV row providing address and venue data.
+
+    Returns:
+        A ``(location, full_address, venue_name)`` tuple, where
+        ``location`` is the ``LOCATION`` text.
     """
     full_address = format_address(entry.location, entry.place)
     venue_name = entry.location_name or entry.name
+    location = f"{venue_name}\n{full_address}" if full_address else venue_name
+    return location, full_address, venue_name
 
-    if full_address:
-        event.add("location", f"{venue_name}\n{full_address}")
-    else:
-        event.add("location", venue_name)
 
-    if not entry.location:
-        return
+def _add_location_properties(event: Event, entry: CSVEntry, coords: tuple[float, float] | None) -> None:
+    """Populate location-related iCal properties on *event* from *entry*.
+
+    Sets the ``LOCATION`` property and, when the address has been
+    geocoded, also adds ``GEO`` and ``X-APPLE-STRUCTURED-LOCATION``.
 
-    coords = get_coordinates(full_address)
+    Args:
+        event: The ``VEVENT`` component to mutate.
+        entry: The parsed CSV row providing address and venue data.
+        coords: Coordinates of the address, as returned by
+            :func:`event_coordinates`.
+    """
+    location, full_address, venue_name = _location_details(entry)
+    event.add("location", location)
     if not coords:
         return
 
@@ -81,35 +121,25 @@ def _add_location_properties(event: Event, entry: CSVEntry) -> None:
 def _add_time_properties(event: Event, entry: CSVEntry) -> None:
     """Populate ``DTSTART`` and ``DTEND`` on *event* from *entry*.
 
-    Handles both timed events (timezone-aware ``datetime`` values) and
-    all-day events (plain ``date`` values), determined by whether the
-    duration string ends with ``"d"``.
-
     Args:
         event: The ``VEVENT`` component to mutate.
         entry: The parsed CSV row providing date, time, duration, and
             timezone data.
     """
-    is_all_day = entry.duration.endswith("d")
-    duration = parse_duration(entry.duration)
-    tz = pytz.timezone(entry.timezone)
-    start_dt = tz.localize(datetime.strptime(f"{entry.date_str} {entry.time_str}", "%d.%m.%Y %H:%M"))
-
-    if is_all_day:
-        event.add("dtstart", start_dt.date())
-        event.add("dtend", (start_dt + duration).date())
-    else:
-        event.add("dtstart", start_dt)
-        event.add("dtend", start_dt + duration)
+    start, end = event_times(entry)
+    event.add("dtstart", start)
+    event.add("dtend", end)
 
 
-def _build_event(entry: CSVEntry, calendar_name: str) -> Event:
+def _build_event(entry: CSVEntry, calendar_name: str, coords: tuple[float, float] | None, dtstamp: datetime) -> Event:
     """Construct a single ``VEVENT`` component from a parsed CSV row.
 
     Args:
         entry: Validated CSV row data.
         calendar_name: Name of the containing calendar, used for UID
             generation.
+        coords: Coordinates of the event's address, if known.
+        dtstamp: UTC timestamp written as ``DTSTAMP``.
 
     Returns:
         A fully populated :class:`icalendar.Event` component.
@@ -117,15 +147,260 @@ def _build_event(entry: CSVEntry, calendar_name: str) -> Event:
     event = Event()
     event.add("summary", entry.name)
     event.add("description", entry.description)
-    event.add("dtstamp", datetime.now(pytz.utc))
-    event.add("uid", _make_uid(entry.name, entry.date_str, entry.time_str, calendar_name))
+    event.add("dtstamp", dtstamp)
+    event.add("uid", make_uid(entry.name, entry.date_str, entry.time_str, calendar_name))
 
-    _add_location_properties(event, entry)
+    _add_location_properties(event, entry, coords)
     _add_time_properties(event, entry)
 
     return event
 
 
+def _write_event(
+    writer: ICalWriter, entry: CSVEntry, calendar_name: str, coords: tuple[float, float] | None, dtstamp: datetime
+) -> None:
+    """Serialise one ``VEVENT`` directly, without building an :class:`icalendar.Event`.
+
+    Produces the same properties, in the same order, as
+    :func:`_build_event` followed by ``to_ical()``.
+
+    Args:
+        writer: Content-line writer receiving the event.
+        entry: Validated CSV row data.
+        calendar_name: Name of the containing calendar, used for UID
+            generation.
+        coords: Coordinates of the event's address, if known.
+        dtstamp: UTC timestamp written as ``DTSTAMP``.
+    """
+    start, end = event_times(entry)
+    location, full_address, venue_name = _location_details(entry)
+
+    writer.line("BEGIN", "VEVENT")
+    writer.text("SUMMARY", entry.name)
+    if isinstance(start, datetime):
+        tzid = tzid_for(entry.timezone)
+        params = {"TZID": tzid} if tzid else None
+        writer.line("DTSTART", format_datetime(start, tzid), params)
+        writer.line("DTEND", format_datetime(end, tzid), params)
+    else:
+        writer.line("DTSTART", format_date(start), {"VALUE": "DATE"})
+        writer.line("DTEND", format_date(end), {"VALUE": "DATE"})
+    writer.line("DTSTAMP", format_datetime(dtstamp, None))
+    writer.text("UID", make_uid(entry.name, entry.date_str, entry.time_str, calendar_name))
+    writer.text("DESCRIPTION", entry.description)
+    if coords:
+        lat, lon = coords
+        writer.line("GEO", f"{float(lat)};{float(lon)}")
+    writer.text("LOCATION", location)
+    if coords:
+        writer.text(
+            "X-APPLE-STRUCTURED-LOCATION",
+            f"geo:{lat},{lon}",
+            {"VALUE": "URI", "X-ADDRESS": full_address, "X-TITLE": venue_name, "X-APPLE-RADIUS": "70"},
+        )
+    writer.line("END", "VEVENT")
+
+
+def _read_entries(csv_path: Path) -> Iterator[CSVEntry]:
+    """Yield a validated :class:`~src.models.CSVEntry` for every row of *csv_path*.
+
+    When snapshots are enabled and a current one exists, rows are read
+    from the memory-mapped snapshot instead of re-parsing the CSV text.
+    Otherwise rows are validated in batches (see :mod:`src.utils.ingest`).
+    """
+    if settings.snapshot_enabled:
+        snapshot = load_snapshot(csv_path)
+        if snapshot is not None:
+            yield from snapshot.entries()
+            return
+
+    yield from iter_csv_entries(csv_path)
+
+
+def _calendar_header(calendar_name: str) -> bytes:
+    """Return ``BEGIN:VCALENDAR`` and the calendar properties with the configured serializer."""
+    if settings.ical_serializer == "fast":
+        header = ICalWriter()
+        header.line("BEGIN", "VCALENDAR")
+        header.text("VERSION", "2.0")
+        header.text("PRODID", f"-//{settings.project_name}//mxm.dk//")
+        header.text("X-WR-CALNAME", calendar_name)
+        return header.getvalue()
+
+    cal = Calendar()
+    cal.add("prodid", f"-//{settings.project_name}//mxm.dk//")
+    cal.add("version", "2.0")
+    cal.add("x-wr-calname", calendar_name)
+    return cal.to_ical().removesuffix(_TRAILER)
+
+
+def _serialize_event(
+    entry: CSVEntry, calendar_name: str, coords: tuple[float, float] | None, dtstamp: datetime
+) -> bytes:
+    """Serialise one ``VEVENT`` with the configured serializer (see :mod:`src.utils.serializer`)."""
+    if settings.ical_serializer == "fast":
+        writer = ICalWriter()
+        _write_event(writer, entry, calendar_name, coords, dtstamp)
+        return writer.getvalue()
+    return _build_event(entry, calendar_name, coords, dtstamp).to_ical()
+
+
+def _dtstamp(last_modified: float) -> datetime:
+    """Return the ``DTSTAMP`` for a calendar last modified at *last_modified* (POSIX seconds).
+
+    :rfc:`5545` lets ``DTSTAMP`` reflect when the event information was
+    last revised, so the CSV modification time is used instead of the
+    render time.  It is truncated to whole seconds, the resolution of
+    the property.
+    """
+    return datetime.fromtimestamp(int(last_modified), tz=pytz.utc)
+
+
+def _iter_events(
+    events: Iterable[tuple[CSVEntry, Recurrence | None]], calendar_name: str, dtstamp: datetime
+) -> Iterator[bytes]:
+    """Yield one serialised ``VEVENT`` per ``(entry, recurrence)`` pair, reusing cached fragments.
+
+    Events whose row, calendar name and coordinates were serialised
+    before are assembled from :data:`~src.utils.fragments.fragment_cache`
+    with *dtstamp* spliced in.  Events with a recurrence rule get its
+    ``RRULE`` / ``EXDATE`` lines added.
+    """
+    dtstamp_line = f"DTSTAMP:{format_datetime(dtstamp, None)}\r\n".encode()
+    use_cache = fragment_cache.max_bytes > 0
+
+    for entry, recurrence in events:
+        coords = event_coordinates(entry)
+        if not use_cache:
+            event = _serialize_event(entry, calendar_name, coords, dtstamp)
+        else:
+            key = fragment_key(entry, calendar_name, coords)
+            fragment = fragment_cache.get(key)
+            if fragment is None:
+                fragment = Fragment.split(_serialize_event(entry, calendar_name, coords, dtstamp))
+                fragment_cache.put(key, fragment)
+            event = fragment.join(dtstamp_line)
+        yield event if recurrence is None else recurrence.apply(event, entry)
+
+
+def iter_ical(csv_path: Path, calendar_name: str) -> Iterator[bytes]:
+    """Yield the iCal payload for a CSV calendar file chunk by chunk.
+
+    The first chunk holds ``BEGIN:VCALENDAR`` and the calendar
+    properties, each following chunk one complete ``VEVENT``, then an
+    optional chunk with the ``VTIMEZONE`` components of the zones in use,
+    and the last chunk ``END:VCALENDAR``.  The CSV is read lazily, so rows are
+    only parsed as chunks are consumed and errors surface during
+    iteration.  Concatenating all chunks gives exactly the output of
+    :func:`csv_to_ical`.
+
+    Args:
+        csv_path: Path to the ``.csv`` file to read (see
+            :func:`csv_to_ical`).
+        calendar_name: Display name embedded in the ``X-WR-CALNAME``
+            property and incorporated into event UIDs.
+
+    Yields:
+        Consecutive ``bytes`` chunks of the iCal payload.
+    """
+    yield from _iter_entries(_read_entries(csv_path), calendar_name, csv_path.stat().st_mtime)
+
+
+class _TimedIterator:
+    """Wraps an iterator and accumulates the time spent producing its items."""
+
+    def __init__(self, items: Iterable[CSVEntry]) -> None:
+        self._items = iter(items)
+        self.elapsed = 0.0
+        self.count = 0
+
+    def __iter__(self) -> Iterator[CSVEntry]:
+        return self
+
+    def __next__(self) -> CSVEntry:
+        start = time.perf_counter()
+        try:
+            item = next(self._items)
+        finally:
+            self.elapsed += time.perf_counter() - start
+        self.count += 1
+        return item
+
+
+def _iter_entries(entries: Iterable[CSVEntry], calendar_name: str, last_modified: float) -> Iterator[bytes]:
+    """Yield the ``VCALENDAR`` chunks for *entries*, recording stage metrics if enabled.
+
+    Time spent reading and validating rows is reported as the ``read``
+    stage; the remainder, building and serialising events (including
+    coordinate lookups), as the ``serialize`` stage.
+    """
+    if not settings.metrics_enabled:
+        yield from _render_entries(entries, calendar_name, last_modified)
+        return
+
+    reader = _TimedIterator(entries)
+    chunks = _render_entries(reader, calendar_name, last_modified)
+    total = 0.0
+    while True:
+        start = time.perf_counter()
+        chunk = next(chunks, None)
+        total += time.perf_counter() - start
+        if chunk is None:
+            break
+        yield chunk
+    RENDER_STAGE_SECONDS.observe(reader.elapsed, stage="read")
+    RENDER_STAGE_SECONDS.observe(total - reader.elapsed, stage="serialize")
+    RENDER_ROWS.inc(reader.count, calendar=calendar_name)
+
+
+def _render_entries(entries: Iterable[CSVEntry], calendar_name: str, last_modified: float) -> Iterator[bytes]:
+    """Yield the ``VCALENDAR`` chunks for *entries* with the configured serializer.
+
+    Every event's ``DTSTAMP`` is derived from *last_modified*, the
+    modification time of the source CSV.  With
+    ``settings.recurrence_enabled``, repeated rows are first collapsed
+    into recurring events (see :mod:`src.utils.recurrence`).
+
+    When ``settings.vtimezone_enabled`` is set, the ``VTIMEZONE``
+    components of the zones used by timed events follow the last event
+    as one extra chunk.
+    """
+    tracker = TimezoneTracker() if settings.vtimezone_enabled else None
+    if tracker is not None:
+        entries = tracker.track(entries)
+
+    if settings.recurrence_enabled:
+        events = collapse_series(entries)
+    else:
+        events = ((entry, None) for entry in entries)
+
+    yield _calendar_header(calendar_name)
+    yield from _iter_events(events, calendar_name, _dtstamp(last_modified))
+
+    if tracker is not None and (components := tracker.components()):
+        yield components
+    yield _TRAILER
+
+
+def entries_to_ical(entries: Iterable[CSVEntry], calendar_name: str, last_modified: float) -> bytes:
+    """Render a ``VCALENDAR`` containing exactly *entries*.
+
+    Used for filtered views of a calendar; the output for all entries of
+    a CSV file is identical to :func:`csv_to_ical`.
+
+    Args:
+        entries: Validated rows to render, in output order.
+        calendar_name: Display name embedded in the ``X-WR-CALNAME``
+            property and incorporated into event UIDs.
+        last_modified: Modification time of the source CSV as POSIX
+            seconds, used as every event's ``DTSTAMP``.
+
+    Returns:
+        The iCal payload as ``bytes``.
+    """
+    return b"".join(_iter_entries(entries, calendar_name, last_modified))
+
+
 def csv_to_ical(csv_path: Path, calendar_name: str) -> bytes:
     """Convert a CSV calendar file into an iCal-formatted byte string.
 
@@ -138,7 +413,13 @@ def csv_to_ical(csv_path: Path, calendar_name: str) -> bytes:
     Stable ``UID`` values are generated deterministically from the event
     name, date, time, and calendar name so that re-generating the same
     calendar produces the same UIDs.  This allows calendar clients to
-    update existing events rather than creating duplicates.
+    update existing events rather than creating duplicates.  ``DTSTAMP``
+    is the modification time of ``csv_path``, so an unchanged file (with
+    unchanged coordinates) always yields the same bytes.
+
+    When ``settings.ical_serializer`` is ``"fast"`` the payload is written
+    directly by :class:`~src.utils.serializer.ICalWriter` instead of
+    through ``icalendar`` components; both produce identical output.
 
     Args:
         csv_path: Path to the ``.csv`` file to read.  The file must be
@@ -163,15 +444,4 @@ def csv_to_ical(csv_path: Path, calendar_name: str) -> bytes:
         Exception: Any other error from CSV parsing, timezone lookup, or
             iCal serialisation is propagated to the caller.
     """
-    cal = Calendar()
-    cal.add("prodid", f"-//{settings.project_name}//mxm.dk//")
-    cal.add("version", "2.0")
-    cal.add("x-wr-calname", calendar_name)
-
-    with open(csv_path, mode="r", encoding="utf-8") as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            entry = CSVEntry(**row)
-            cal.add_component(_build_event(entry, calendar_name))
-
-    return cal.to_ical()
+    return b"".join(iter_ical(csv_path, calendar_name))
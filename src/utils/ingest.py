@@ -0,0 +1,256 @@
+"""Batch ingestion of calendar CSV files.
+
+Instead of validating one :class:`~src.models.CSVEntry` per row and
+converting every row's date, time, timezone and duration on its own,
+a batch of rows is validated column by column, with one
+:class:`pydantic.TypeAdapter` call per field, and the entries are then
+constructed without further validation.  The conversion columns are
+computed once per *distinct* value: calendars repeat the same handful
+of times, durations and zones on thousands of rows, so each string is
+parsed only once.
+
+Every problem found in a batch is reported together: :func:`read_columns`
+validates the whole file as one batch, while :func:`iter_csv_entries`
+stops at the first batch of ``BATCH_SIZE`` rows that has errors.  Errors
+are raised as one :class:`pydantic.ValidationError` whose locations are
+``(line, field)`` pairs, where ``line`` is the 1-based line number in the
+CSV file (the header is line 1).
+"""
+
+import csv
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+
+import pytz
+from pydantic import TypeAdapter, ValidationError
+from pydantic_core import InitErrorDetails, PydanticCustomError
+
+from src.models import CSVEntry
+from src.utils.time import parse_duration
+
+BATCH_SIZE = 1024
+
+_COLUMN = TypeAdapter(list[str])
+
+# The header occupies line 1; data row i (0-based) is on line i + 2.
+_FIRST_DATA_LINE = 2
+
+
+def _shift_errors(exc: ValidationError, first_line: int, field: str) -> list[InitErrorDetails]:
+    """Re-anchor the errors of one validated column on ``(line, field)`` locations."""
+    details = []
+    for error in exc.errors():
+        index, *rest = error["loc"]
+        detail: InitErrorDetails = {
+            "type": error["type"],
+            "loc": (first_line + index, field, *rest),
+            "input": error["input"],
+        }
+        if "ctx" in error:
+            detail["ctx"] = error["ctx"]
+        details.append(detail)
+    return details
+
+
+def _conversion_error(line: int, field: str, value: str, message: str) -> InitErrorDetails:
+    return {
+        "type": PydanticCustomError("invalid_value", "{message}", {"message": message}),
+        "loc": (line, field),
+        "input": value,
+    }
+
+
+def _parse_or_none(value: str, fmt: str) -> datetime | None:
+    try:
+        return datetime.strptime(value, fmt)
+    except ValueError:
+        return None
+
+
+def validate_columns(
+    rows: list[dict[str, str]], title: str, first_line: int = _FIRST_DATA_LINE
+) -> dict[str, list[str]]:
+    """Validate a batch of CSV rows one column at a time.
+
+    Each field is validated once for the whole batch instead of once per
+    row.  Aliased fields are read from the alias column, or from the
+    field name column when the alias is absent (e.g. ``date_str``);
+    rows missing an optional field get the model default.
+
+    Args:
+        rows: Rows as produced by :class:`csv.DictReader`.
+        title: Name used in error messages, usually the CSV file name.
+        first_line: CSV line number of ``rows[0]``.
+
+    Returns:
+        The values of every :class:`CSVEntry` field, keyed by field name,
+        in row order.
+
+    Raises:
+        pydantic.ValidationError: Listing every invalid field of every
+            row in the batch.
+    """
+    columns: dict[str, list[str]] = {}
+    errors: list[InitErrorDetails] = []
+    for name, field in CSVEntry.model_fields.items():
+        header = field.alias or name
+        values = [row.get(header) for row in rows]
+        if field.alias is not None and None in values:
+            # ``populate_by_name`` also accepts the field name as header.
+            values = [row.get(name) if value is None else value for row, value in zip(rows, values)]
+        if None in values:
+            missing = [i for i, value in enumerate(values) if value is None]
+            if field.is_required():
+                errors.extend({"type": "missing", "loc": (first_line + i, header), "input": rows[i]} for i in missing)
+            else:
+                default = field.get_default(call_default_factory=True)
+                for i in missing:
+                    values[i] = default
+        try:
+            columns[name] = _COLUMN.validate_python(values)
+        except ValidationError as e:
+            # Missing values were already reported above.
+            errors.extend(error for error in _shift_errors(e, first_line, header) if error["input"] is not None)
+    if errors:
+        errors.sort(key=lambda error: error["loc"][0])
+        raise ValidationError.from_exception_data(title, errors)
+    return columns
+
+
+def validate_rows(rows: list[dict[str, str]], title: str, first_line: int = _FIRST_DATA_LINE) -> list[CSVEntry]:
+    """Validate a batch of CSV rows and return them as entries.
+
+    The rows are validated by :func:`validate_columns`; the entries are
+    then built without validating each row again.
+
+    Args:
+        rows: Rows as produced by :class:`csv.DictReader`.
+        title: Name used in error messages, usually the CSV file name.
+        first_line: CSV line number of ``rows[0]``.
+
+    Returns:
+        One :class:`CSVEntry` per row.
+
+    Raises:
+        pydantic.ValidationError: Listing every invalid field of every
+            row in the batch.
+    """
+    columns = validate_columns(rows, title, first_line)
+    names = list(columns)
+    return [CSVEntry.model_construct(**dict(zip(names, values))) for values in zip(*columns.values())]
+
+
+def iter_csv_entries(csv_path: Path, batch_size: int = BATCH_SIZE) -> Iterator[CSVEntry]:
+    """Yield the validated rows of *csv_path*, validating *batch_size* rows at a time.
+
+    Memory use stays proportional to one batch, so this suits streamed
+    renders; errors are reported for the whole batch they occur in.
+
+    Raises:
+        FileNotFoundError: If *csv_path* does not exist.
+        pydantic.ValidationError: If a row fails schema validation.
+    """
+    with open(csv_path, mode="r", encoding="utf-8") as csvfile:
+        reader = csv.DictReader(csvfile)
+        line = _FIRST_DATA_LINE
+        while batch := list(islice(reader, batch_size)):
+            yield from validate_rows(batch, csv_path.name, line)
+            line += len(batch)
+
+
+@dataclass
+class CalendarColumns:
+    """A validated calendar with its time columns precomputed.
+
+    Attributes:
+        fields: The validated values of every :class:`CSVEntry` field,
+            keyed by field name, in file order.
+        start: Event start times as POSIX seconds.
+        duration: Event durations in seconds.
+        all_day: ``True`` for all-day events.
+    """
+
+    fields: dict[str, list[str]]
+    start: list[int]
+    duration: list[int]
+    all_day: list[bool]
+
+    def entry(self, index: int) -> CSVEntry:
+        """Build the :class:`CSVEntry` for row *index* without re-validating it."""
+        return CSVEntry.model_construct(**{name: values[index] for name, values in self.fields.items()})
+
+    def entries(self) -> Iterator[CSVEntry]:
+        """Yield every row as a :class:`CSVEntry`, in file order."""
+        names = list(self.fields)
+        for values in zip(*self.fields.values()):
+            yield CSVEntry.model_construct(**dict(zip(names, values)))
+
+
+def read_columns(csv_path: Path) -> CalendarColumns:
+    """Parse, validate and convert a whole CSV calendar at once.
+
+    Schema validation runs once per column over all rows; dates, times,
+    timezones and durations are then each parsed once per distinct
+    value.  No per-row :class:`CSVEntry` is built.  Schema and
+    conversion errors of all rows are collected and raised together.
+
+    Raises:
+        FileNotFoundError: If *csv_path* does not exist.
+        pydantic.ValidationError: If any row is invalid.
+    """
+    with open(csv_path, mode="r", encoding="utf-8") as csvfile:
+        rows = list(csv.DictReader(csvfile))
+    fields = validate_columns(rows, csv_path.name)
+
+    zones: dict[str, pytz.BaseTzInfo | None] = {}
+    dates: dict[str, datetime | None] = {}
+    times: dict[str, datetime | None] = {}
+    starts: dict[tuple[str, str, str], int | None] = {}
+    durations: dict[str, int | None] = {}
+    errors: list[InitErrorDetails] = []
+    start_column, duration_column, all_day_column = [], [], []
+
+    rows_by_column = zip(fields["date_str"], fields["time_str"], fields["duration"], fields["timezone"])
+    for line, (date_str, time_str, duration, timezone) in enumerate(rows_by_column, _FIRST_DATA_LINE):
+        if timezone not in zones:
+            try:
+                zones[timezone] = pytz.timezone(timezone)
+            except pytz.UnknownTimeZoneError:
+                zones[timezone] = None
+        zone = zones[timezone]
+        if zone is None:
+            errors.append(_conversion_error(line, "timezone", timezone, "Unknown timezone"))
+
+        if date_str not in dates:
+            dates[date_str] = _parse_or_none(date_str, "%d.%m.%Y")
+        if time_str not in times:
+            times[time_str] = _parse_or_none(time_str, "%H:%M")
+        key = (date_str, time_str, timezone)
+        if key not in starts:
+            day, clock = dates[date_str], times[time_str]
+            if day is None or clock is None:
+                starts[key] = None
+            else:
+                naive = datetime.combine(day.date(), clock.time())
+                starts[key] = int(zone.localize(naive).timestamp()) if zone is not None else 0
+        if starts[key] is None:
+            errors.append(_conversion_error(line, "date", f"{date_str} {time_str}", "Expected DD.MM.YYYY and HH:MM"))
+
+        if duration not in durations:
+            try:
+                durations[duration] = int(parse_duration(duration).total_seconds())
+            except ValueError:
+                durations[duration] = None
+        if durations[duration] is None:
+            errors.append(_conversion_error(line, "duration", duration, "Expected <N>min, <N>h or <N>d"))
+
+        start_column.append(starts[key] or 0)
+        duration_column.append(durations[duration] or 0)
+        all_day_column.append(duration.endswith("d"))
+
+    if errors:
+        raise ValidationError.from_exception_data(csv_path.name, errors)
+    return CalendarColumns(fields=fields, start=start_column, duration=duration_column, all_day=all_day_column)
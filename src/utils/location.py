@@ -1,61 +1,14 @@
-"""Utilities for address formatting and geocoding via the Nominatim service.
-
-Geocoding results are cached in-process using :func:`functools.lru_cache`
-so that repeated lookups for the same address (common when many events
-share a venue) do not generate redundant HTTP requests to Nominatim.
-
-Note:
-    Nominatim's usage policy requires a meaningful ``User-Agent`` string
-    and prohibits more than one request per second.  The ``user_agent``
-    value is taken from :data:`src.settings.settings` so it can be
-    configured via the ``USER_AGENT`` environment variable.
-
-    **Known limitation**: no rate-limiting is implemented.  When many
-    distinct addresses are geocoded in a single request (e.g. a large CSV
-    being served for the first time), requests may arrive at Nominatim
-    faster than one per second.  The LRU cache mitigates this for repeated
-    addresses but does not throttle the initial burst.
+"""Address formatting for display and geocoding.
+
+Coordinates are never resolved here: renders read them from the
+persistent :class:`~src.utils.geostore.GeocodeStore` through
+:func:`~src.utils.geoqueue.lookup_coordinates`, which hands unknown
+addresses to the throttled background queue in :mod:`src.utils.geoqueue`.
+That queue resolves them through the pooled asynchronous client in
+:mod:`src.utils.geocoder`.
 """
 
 import re
-from functools import lru_cache
-
-from geopy.geocoders import Nominatim
-
-from src.settings import settings
-
-
-@lru_cache(maxsize=128)
-def get_coordinates(address: str) -> tuple[float, float] | None:
-    """Return the latitude and longitude for an address string.
-
-    Results are memoised with an LRU cache keyed on the exact address
-    string, so identical addresses are only geocoded once per process
-    lifetime.  Geocoding can be disabled globally by setting
-    ``GEOCODE_ENABLED=false`` in the environment.
-
-    Args:
-        address: A full address string to geocode, e.g.
-            ``"Musterstraße 1, 12345 Berlin, Germany"``.
-
-    Returns:
-        A ``(latitude, longitude)`` tuple of floats when the address is
-        successfully resolved, or ``None`` if geocoding is disabled, the
-        address could not be found, or any network/API error occurs.
-    """
-    if not settings.geocode_enabled:
-        return None
-
-    geocoder = Nominatim(user_agent=settings.user_agent)
-    try:
-        location = geocoder.geocode(address)
-        if location:
-            return (location.latitude, location.longitude)
-    except Exception:
-        # Silently swallow geocoding errors so a single bad address does
-        # not abort the entire calendar generation.
-        pass
-    return None
 
 
 def format_address(address: str, place: str = "") -> str:
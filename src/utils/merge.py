@@ -0,0 +1,107 @@
+"""Combining rendered calendars into a single feed.
+
+:func:`merge_calendars` splices the ``VEVENT`` and ``VTIMEZONE``
+components out of already rendered calendars (normally straight from
+:data:`~src.utils.cache.render_cache`) instead of rendering the merged
+feed from the CSV files again.  Events are de-duplicated by ``UID``,
+keeping the first occurrence, and the ``VTIMEZONE`` components of each
+``TZID`` are collapsed into one that carries the union of their
+observances, since members may cover different spans of years.
+
+:func:`iter_merged` does the same incrementally for feeds too large to
+hold in memory: members are consumed as chunk streams, such as those of
+:func:`~src.utils.ical.iter_ical`, and events are passed through as they
+arrive.
+"""
+
+import re
+from collections.abc import Iterable, Iterator
+
+from src.utils.ical import _TRAILER, _calendar_header
+
+_COMPONENT = re.compile(rb"^BEGIN:(VEVENT|VTIMEZONE)\r\n.*?^END:\1\r\n", re.MULTILINE | re.DOTALL)
+_OBSERVANCE = re.compile(rb"^BEGIN:(STANDARD|DAYLIGHT)\r\n.*?^END:\1\r\n", re.MULTILINE | re.DOTALL)
+# A property value may be folded onto continuation lines starting with a space.
+_UID = re.compile(rb"^UID:(.*?)\r\n(?! )", re.MULTILINE | re.DOTALL)
+_TZID = re.compile(rb"^TZID:(.*?)\r\n(?! )", re.MULTILINE | re.DOTALL)
+
+
+def _property(pattern: re.Pattern[bytes], component: bytes) -> bytes | None:
+    match = pattern.search(component)
+    return match.group(1).replace(b"\r\n ", b"") if match else None
+
+
+class _MergedTimezone:
+    """Observances collected for one ``TZID``, in first-seen order."""
+
+    def __init__(self, component: bytes) -> None:
+        first = _OBSERVANCE.search(component)
+        end = first.start() if first else len(component) - len(b"END:VTIMEZONE\r\n")
+        self.head = component[:end]
+        self.observances: dict[bytes, None] = {}
+        self.add(component)
+
+    def add(self, component: bytes) -> None:
+        for match in _OBSERVANCE.finditer(component):
+            self.observances.setdefault(match.group(0))
+
+    def to_ical(self) -> bytes:
+        return self.head + b"".join(self.observances) + b"END:VTIMEZONE\r\n"
+
+
+def iter_merged(members: Iterable[Iterable[bytes]], calendar_name: str) -> Iterator[bytes]:
+    """Merge rendered ``VCALENDAR`` payloads into one, chunk by chunk.
+
+    Args:
+        members: One chunk stream per calendar, in the order their
+            events should appear.  Every ``VEVENT`` and ``VTIMEZONE``
+            must lie entirely within one chunk, as with
+            :func:`~src.utils.ical.iter_ical` or a whole payload.
+        calendar_name: ``X-WR-CALNAME`` of the merged calendar.
+
+    Yields:
+        The calendar header, each distinct event as it is read, then one
+        ``VTIMEZONE`` per ``TZID`` and ``END:VCALENDAR``.
+    """
+    yield _calendar_header(calendar_name)
+    uids: set[bytes] = set()
+    timezones: dict[bytes, _MergedTimezone] = {}
+
+    for chunks in members:
+        for chunk in chunks:
+            events = []
+            for match in _COMPONENT.finditer(chunk):
+                component = match.group(0)
+                if match.group(1) == b"VEVENT":
+                    uid = _property(_UID, component)
+                    if uid is not None:
+                        if uid in uids:
+                            continue
+                        uids.add(uid)
+                    events.append(component)
+                else:
+                    tzid = _property(_TZID, component)
+                    if tzid in timezones:
+                        timezones[tzid].add(component)
+                    else:
+                        timezones[tzid] = _MergedTimezone(component)
+            if events:
+                yield b"".join(events)
+
+    yield from (timezone.to_ical() for timezone in timezones.values())
+    yield _TRAILER
+
+
+def merge_calendars(contents: Iterable[bytes], calendar_name: str) -> bytes:
+    """Merge rendered ``VCALENDAR`` payloads into one.
+
+    Args:
+        contents: Rendered calendars, in the order their events should
+            appear.
+        calendar_name: ``X-WR-CALNAME`` of the merged calendar.
+
+    Returns:
+        A ``VCALENDAR`` with every distinct event of *contents* followed
+        by one ``VTIMEZONE`` per ``TZID``.
+    """
+    return b"".join(iter_merged(([content] for content in contents), calendar_name))
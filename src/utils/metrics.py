@@ -0,0 +1,241 @@
+"""Minimal Prometheus-style metrics for the render pipeline.
+
+Provides labelled :class:`Counter`, :class:`Gauge` and :class:`Histogram`
+types, a :class:`Registry` that renders them in the Prometheus text
+exposition format (version 0.0.4), and the metric instances used across
+the application.  It avoids a dependency on ``prometheus_client`` and
+covers only what ``GET /metrics`` needs.
+
+Recording is switched off with ``METRICS_ENABLED=false``: every update
+method returns immediately after a single settings lookup, and
+:func:`timer` does not even read the clock.
+
+Metrics live in the process that records them.  With
+``RENDER_EXECUTOR=process`` the per-stage timings and row counts of
+:mod:`src.utils.ical` are recorded in the worker processes and do not
+appear in ``/metrics``; render latency and cache metrics, which are
+recorded by the serving process, are unaffected.
+"""
+
+import abc
+import math
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+from src.settings import settings
+
+LabelValues = tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric(abc.ABC):
+    """Shared bookkeeping for labelled metrics."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def _label_values(self, labels: dict[str, str]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @abc.abstractmethod
+    def samples(self) -> Iterator[str]:
+        """Yield the exposition lines of every labelled value."""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """A monotonically increasing value per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """Add *amount* to the counter for *labels*."""
+        if not settings.metrics_enabled:
+            return
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        """Return the current value for *labels* (``0`` if never incremented)."""
+        return self._values.get(self._label_values(labels), 0)
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    """A value sampled from a callback whenever metrics are collected.
+
+    Args:
+        name: Metric name.
+        documentation: ``HELP`` text.
+        collect: Returns the current value.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, collect: Callable[[], float]) -> None:
+        super().__init__(name, documentation)
+        self._collect = collect
+
+    def samples(self) -> Iterator[str]:
+        yield f"{self.name} {_format_value(self._collect())}"
+
+
+class Histogram(_Metric):
+    """Cumulative histogram of observed values per label set."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._values: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record one observation of *value* for *labels*."""
+        if not settings.metrics_enabled:
+            return
+        key = self._label_values(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = ([0] * len(self.buckets), [0.0])
+            counts, total = state
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            total[0] += value
+
+    def count(self, **labels: str) -> int:
+        """Return the number of observations recorded for *labels*."""
+        state = self._values.get(self._label_values(labels))
+        return sum(state[0]) if state else 0
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            items = sorted((key, (list(counts), total[0])) for key, (counts, total) in self._values.items())
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}"
+
+
+class Registry:
+    """Collection of metrics rendered together by ``GET /metrics``."""
+
+    def __init__(self) -> None:
+        self._metrics: list[_Metric] = []
+
+    def register[M: _Metric](self, metric: M) -> M:
+        """Add *metric* to the registry and return it."""
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Return every registered metric in the Prometheus text format."""
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+@contextmanager
+def timer(histogram: Histogram, **labels: str) -> Iterator[None]:
+    """Observe the wall-clock duration of the ``with`` block in *histogram*."""
+    if not settings.metrics_enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - start, **labels)
+
+
+REGISTRY = Registry()
+
+RENDER_SECONDS = REGISTRY.register(
+    Histogram("ical_render_seconds", "Time to render a calendar in the worker pool.", ("calendar",))
+)
+RENDER_STAGE_SECONDS = REGISTRY.register(
+    Histogram(
+        "ical_render_stage_seconds",
+        "Time spent per render stage: reading and validating rows, building events, serialising.",
+        ("stage",),
+    )
+)
+RENDER_ROWS = REGISTRY.register(Counter("ical_rows_total", "CSV rows converted to events.", ("calendar",)))
+RENDER_ERRORS = REGISTRY.register(Counter("ical_render_errors_total", "Failed calendar renders.", ("calendar",)))
+CACHE_REQUESTS = REGISTRY.register(
+    Counter("ical_render_cache_requests_total", "Rendered-calendar cache lookups.", ("result",))
+)
+FRAGMENT_CACHE_REQUESTS = REGISTRY.register(
+    Counter("ical_fragment_cache_requests_total", "VEVENT fragment cache lookups.", ("result",))
+)
+ADMISSION_REQUESTS = REGISTRY.register(
+    Counter(
+        "ical_admission_requests_total",
+        "Calendar requests by admission decision: admitted, queued, rejected (queue full), evicted, timeout.",
+        ("outcome",),
+    )
+)
+ADMISSION_WAIT_SECONDS = REGISTRY.register(
+    Histogram("ical_admission_wait_seconds", "Time calendar requests spent waiting for an admission slot.")
+)
+GEOCODE_LOOKUPS = REGISTRY.register(
+    Counter("geocode_lookups_total", "Coordinate lookups during rendering, by geocode store result.", ("result",))
+)
+GEOCODE_REQUESTS = REGISTRY.register(
+    Counter("geocode_requests_total", "Geocoding requests sent to Nominatim, by outcome.", ("outcome",))
+)
+GEOCODE_REQUEST_SECONDS = REGISTRY.register(
+    Histogram("geocode_request_seconds", "Latency of geocoding requests sent to Nominatim.")
+)
@@ -0,0 +1,142 @@
+"""Collapsing repeated CSV rows into recurring events.
+
+Calendars often spell out a weekly event as one row per occurrence,
+which renders to dozens of ``VEVENT`` blocks that differ only in their
+dates.  With ``settings.recurrence_enabled``, :func:`collapse_series`
+finds such series and the renderer emits a single ``VEVENT`` per series,
+carrying an ``RRULE`` and ``EXDATE`` for skipped occurrences.
+
+A series is a group of at least :data:`MIN_OCCURRENCES` rows that agree
+in every field except ``date`` and fall on distinct days spaced by a
+whole multiple of the smallest gap (the rule's interval).  Missing
+occurrences become ``EXDATE`` values, as long as no more than half of
+the rule's occurrences are missing.  Intervals that are a multiple of
+seven days become ``FREQ=WEEKLY``, others ``FREQ=DAILY``.  The collapsed
+event is the series' first occurrence, so it keeps that row's ``UID``,
+and its times are expanded in the event's own timezone, matching the
+wall-clock semantics of the CSV rows across DST changes.
+
+Detection needs every row of the calendar, so calendars rendered with
+the option enabled are no longer processed strictly one row at a time.
+"""
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import date, datetime
+from itertools import pairwise
+
+from src.models import CSVEntry
+from src.utils.serializer import ICalWriter, format_date, format_datetime
+from src.utils.time import localized_start
+from src.utils.timezones import tzid_for
+
+MIN_OCCURRENCES = 3
+
+
+@dataclass(frozen=True)
+class Recurrence:
+    """An ``RRULE`` with the dates it skips.
+
+    Attributes:
+        freq: ``"DAILY"`` or ``"WEEKLY"``.
+        interval: Number of ``freq`` periods between occurrences.
+        count: Number of occurrences generated by the rule, including
+            excluded ones.
+        exdates: Days of the generated occurrences that do not take place.
+    """
+
+    freq: str
+    interval: int
+    count: int
+    exdates: tuple[date, ...] = ()
+
+    def to_ical(self, entry: CSVEntry) -> bytes:
+        """Return the ``RRULE`` and ``EXDATE`` content lines for the series starting with *entry*."""
+        writer = ICalWriter()
+        rule = f"FREQ={self.freq}"
+        if self.interval > 1:
+            rule += f";INTERVAL={self.interval}"
+        writer.line("RRULE", f"{rule};COUNT={self.count}")
+        if self.exdates:
+            if entry.duration.endswith("d"):
+                writer.line("EXDATE", ",".join(format_date(day) for day in self.exdates), {"VALUE": "DATE"})
+            else:
+                tzid = tzid_for(entry.timezone)
+                starts = (
+                    localized_start(entry.model_copy(update={"date_str": day.strftime("%d.%m.%Y")}))
+                    for day in self.exdates
+                )
+                value = ",".join(format_datetime(start, tzid) for start in starts)
+                writer.line("EXDATE", value, {"TZID": tzid} if tzid else None)
+        return writer.getvalue()
+
+    def apply(self, event: bytes, entry: CSVEntry) -> bytes:
+        """Insert the rule into the serialised ``VEVENT`` *event* of the series' first occurrence."""
+        end = event.rindex(b"END:VEVENT\r\n")
+        return event[:end] + self.to_ical(entry) + event[end:]
+
+
+def _series_key(entry: CSVEntry) -> tuple:
+    fields = entry.__dict__
+    return tuple(value for name, value in fields.items() if name != "date_str")
+
+
+def _parse_date(value: str) -> date | None:
+    try:
+        return datetime.strptime(value, "%d.%m.%Y").date()
+    except ValueError:
+        return None
+
+
+def _recurrence(days: list[date]) -> Recurrence | None:
+    """Return the rule generating the sorted, distinct *days*, or ``None`` if they are irregular."""
+    gaps = [(b - a).days for a, b in pairwise(days)]
+    step = min(gaps)
+    if any(gap % step for gap in gaps):
+        return None
+    count = (days[-1] - days[0]).days // step + 1
+    if count - len(days) > count // 2:
+        return None
+    present = set(days)
+    exdates = tuple(
+        day for day in (date.fromordinal(days[0].toordinal() + i * step) for i in range(count)) if day not in present
+    )
+    if step % 7 == 0:
+        return Recurrence("WEEKLY", step // 7, count, exdates)
+    return Recurrence("DAILY", step, count, exdates)
+
+
+def collapse_series(entries: Iterable[CSVEntry]) -> list[tuple[CSVEntry, Recurrence | None]]:
+    """Group the rows of a calendar into recurring series and single events.
+
+    Args:
+        entries: The calendar's validated rows.
+
+    Returns:
+        One ``(entry, recurrence)`` pair per event to emit, in row order.
+        A series takes the place of the row of its first occurrence,
+        which is the ``entry`` paired with its rule; single rows have
+        ``recurrence`` set to ``None``.
+    """
+    entries = list(entries)
+    groups: dict[tuple, list[int]] = {}
+    for index, entry in enumerate(entries):
+        groups.setdefault(_series_key(entry), []).append(index)
+
+    series: dict[int, Recurrence] = {}
+    absorbed: set[int] = set()
+    for indices in groups.values():
+        if len(indices) < MIN_OCCURRENCES:
+            continue
+        days = [_parse_date(entries[index].date_str) for index in indices]
+        if None in days or len(set(days)) != len(days):
+            continue
+        ordered = sorted(zip(days, indices))
+        recurrence = _recurrence([day for day, _ in ordered])
+        if recurrence is None:
+            continue
+        first = ordered[0][1]
+        series[first] = recurrence
+        absorbed.update(index for _, index in ordered[1:])
+
+    return [(entry, series.get(index)) for index, entry in enumerate(entries) if index not in absorbed]
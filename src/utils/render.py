@@ -0,0 +1,249 @@
+"""Glue between the iCal converter, the render cache and the background geocoder.
+
+Rendering is CPU- and I/O-bound and fully synchronous, so it never runs
+on the event loop.  :data:`render_pool` dispatches renders to a thread or
+process pool (``settings.render_executor``), coalesces concurrent
+requests for the same calendar version into a single render, bounds the
+number of renders in flight, and lets callers give up after
+``settings.render_timeout`` seconds.
+
+With ``settings.shared_cache_dir`` set, rendered calendars live only in
+the host-wide :class:`~src.utils.sharedcache.SharedRenderStore`: hits
+are served from its memory maps without entering the pool, and renders
+are not copied into the per-process
+:data:`~src.utils.cache.render_cache`.
+"""
+
+import asyncio
+import dataclasses
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+from src.settings import settings
+from src.utils.cache import CacheKey, RenderedCalendar, render_cache
+from src.utils.compression import compress_variants
+from src.utils.geoqueue import collect_unresolved, geocode_queue
+from src.utils.geostore import get_geocode_store
+from src.utils.ical import csv_to_ical
+from src.utils.metrics import CACHE_REQUESTS, REGISTRY, RENDER_ERRORS, RENDER_SECONDS, Gauge
+from src.utils.sharedcache import get_shared_store
+from src.utils.snapshot import ensure_snapshot
+
+
+class RenderQueueFullError(RuntimeError):
+    """Raised when ``settings.render_queue_size`` renders are already in flight."""
+
+
+def render_calendar(
+    csv_path: Path, calendar_name: str, last_modified: float, key: CacheKey | None = None
+) -> RenderedCalendar:
+    """Render a calendar and record which addresses still lack coordinates.
+
+    When snapshots are enabled, a missing or stale snapshot of the CSV is
+    compiled first so that this and later renders read the binary form.
+    Compressed variants of the payload are produced here as well, so the
+    cost is paid once per calendar version and off the event loop.
+
+    When ``settings.shared_cache_dir`` is set and *key* is given, the
+    host-wide :class:`~src.utils.sharedcache.SharedRenderStore` is
+    consulted first, so a version already rendered by another worker
+    process is reused instead of rendered again.
+
+    Args:
+        csv_path: Path to the calendar's CSV file.
+        calendar_name: Calendar name passed through to
+            :func:`~src.utils.ical.csv_to_ical`.
+        last_modified: Modification time of *csv_path* (POSIX timestamp).
+        key: Cache key of the calendar version, used to look it up in
+            the shared store.
+
+    Returns:
+        The rendered payload.  Its ``unresolved`` set lists addresses the
+        caller should hand to :data:`~src.utils.geoqueue.geocode_queue`.
+    """
+    shared = get_shared_store() if key is not None else None
+    if shared is None:
+        return _render(csv_path, calendar_name, last_modified)
+    return shared.get_or_render(
+        key, lambda: _render(csv_path, calendar_name, last_modified), is_stale=_has_new_coordinates
+    )
+
+
+def _render(csv_path: Path, calendar_name: str, last_modified: float) -> RenderedCalendar:
+    generation = geocode_queue.generation
+    if settings.snapshot_enabled:
+        ensure_snapshot(csv_path)
+    with collect_unresolved() as unresolved:
+        content = csv_to_ical(csv_path, calendar_name)
+    return RenderedCalendar.from_content(
+        content,
+        last_modified,
+        unresolved=frozenset(unresolved),
+        geocode_generation=generation,
+        encodings=compress_variants(content),
+    )
+
+
+def _has_new_coordinates(rendered: RenderedCalendar) -> bool:
+    """Return ``True`` if an address *rendered* lacked has been geocoded since.
+
+    Generation counters are per process, so renders shared between
+    processes are checked against the host-wide geocode store instead.
+    """
+    store = get_geocode_store()
+    return any(store.get(address)[0] for address in rendered.unresolved)
+
+
+async def _current_shared(rendered: RenderedCalendar | None) -> RenderedCalendar | None:
+    """Return *rendered* unless it is ``None`` or :func:`_has_new_coordinates` rejects it.
+
+    The geocode store is queried in a worker thread, and only for
+    renders that lacked coordinates, to keep SQLite off the event loop.
+    """
+    if rendered is not None and rendered.unresolved and await asyncio.to_thread(_has_new_coordinates, rendered):
+        return None
+    return rendered
+
+
+async def current_render(key: CacheKey) -> RenderedCalendar | None:
+    """Return the cached render of *key*, or ``None`` if it is missing or stale.
+
+    Consults the shared store when it is enabled, otherwise the
+    in-process render cache; either way the lookup is counted as a
+    render cache hit or miss.
+    """
+    shared = get_shared_store()
+    if shared is None:
+        rendered = render_cache.get(key)
+        return rendered if rendered is not None and not needs_refresh(rendered) else None
+    rendered = shared.get(key)
+    CACHE_REQUESTS.inc(result="miss" if rendered is None else "hit")
+    return await _current_shared(rendered)
+
+
+def cached_render(key: CacheKey) -> RenderedCalendar | None:
+    """Return the render of *key* if one is cached, without rendering or counting a lookup.
+
+    Consults the shared store when it is enabled, otherwise the
+    in-process render cache.
+    """
+    shared = get_shared_store()
+    if shared is not None:
+        return shared.get(key)
+    return render_cache.peek(key)
+
+
+def needs_refresh(rendered: RenderedCalendar) -> bool:
+    """Return ``True`` if background geocoding has progressed since *rendered* was produced.
+
+    Only renders that were missing coordinates are ever considered
+    stale; complete renders stay valid until their CSV changes.
+    """
+    return bool(rendered.unresolved) and rendered.geocode_generation != geocode_queue.generation
+
+
+class RenderPool:
+    """Runs :func:`render_calendar` off the event loop with request coalescing.
+
+    Completed renders are stored in :data:`~src.utils.cache.render_cache`
+    (unless the shared store holds them) and their unresolved addresses
+    are enqueued for geocoding, even when the request that triggered the
+    render has already timed out.
+    """
+
+    def __init__(self) -> None:
+        self._executor: Executor | None = None
+        self._inflight: dict[CacheKey, asyncio.Future[RenderedCalendar]] = {}
+
+    @property
+    def inflight(self) -> int:
+        """Number of distinct renders currently queued or running."""
+        return len(self._inflight)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if settings.render_executor == "process":
+                self._executor = ProcessPoolExecutor(max_workers=settings.render_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=settings.render_workers, thread_name_prefix="render")
+        return self._executor
+
+    async def render(self, key: CacheKey, csv_path: Path, calendar_name: str, last_modified: float) -> RenderedCalendar:
+        """Render the calendar version identified by *key* in the worker pool.
+
+        If a render for *key* is already in flight, its result is shared
+        instead of starting a new one.  A current entry in the shared
+        store is returned directly, without using the pool.
+
+        Args:
+            key: Cache key of the calendar version, from
+                :func:`~src.utils.cache.cache_key`.
+            csv_path: Path to the calendar's CSV file.
+            calendar_name: Calendar name passed to the converter.
+            last_modified: Modification time of *csv_path*.
+
+        Returns:
+            The rendered calendar.
+
+        Raises:
+            RenderQueueFullError: When a new render would exceed
+                ``settings.render_queue_size``.
+            TimeoutError: When the render does not finish within
+                ``settings.render_timeout`` seconds.  The render itself
+                keeps running and still populates the cache.
+            Exception: Any error raised by the converter.
+        """
+        shared = get_shared_store()
+        if shared is not None:
+            rendered = await _current_shared(shared.get(key))
+            if rendered is not None:
+                return rendered
+
+        future = self._inflight.get(key)
+        if future is None:
+            if len(self._inflight) >= settings.render_queue_size:
+                raise RenderQueueFullError("Too many calendar renders in progress")
+            future = self._submit(key, csv_path, calendar_name, last_modified)
+        return await asyncio.wait_for(asyncio.shield(future), timeout=settings.render_timeout)
+
+    def _submit(
+        self, key: CacheKey, csv_path: Path, calendar_name: str, last_modified: float
+    ) -> asyncio.Future[RenderedCalendar]:
+        loop = asyncio.get_running_loop()
+        generation = geocode_queue.generation
+        started = time.perf_counter()
+        future = loop.run_in_executor(
+            self._get_executor(), render_calendar, csv_path, calendar_name, last_modified, key
+        )
+        self._inflight[key] = future
+
+        def _done(f: asyncio.Future[RenderedCalendar]) -> None:
+            self._inflight.pop(key, None)
+            if f.cancelled() or f.exception() is not None:
+                RENDER_ERRORS.inc(calendar=calendar_name)
+                return
+            RENDER_SECONDS.observe(time.perf_counter() - started, calendar=calendar_name)
+            # A process-pool worker reports its own (unused) generation
+            # counter; record the parent's value from submission time.
+            rendered = dataclasses.replace(f.result(), geocode_generation=generation)
+            # The shared store already holds the render for every worker.
+            if get_shared_store() is None:
+                render_cache.put(key, rendered)
+            geocode_queue.enqueue_many(rendered.unresolved)
+
+        future.add_done_callback(_done)
+        return future
+
+    def shutdown(self) -> None:
+        """Shut down the worker pool without waiting for running renders."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+render_pool = RenderPool()
+
+REGISTRY.register(
+    Gauge("ical_renders_in_flight", "Distinct calendar renders queued or running.", lambda: render_pool.inflight)
+)
@@ -0,0 +1,102 @@
+"""Direct RFC 5545 content-line writer.
+
+Building an :class:`icalendar.Event` per row and then walking the
+component tree in :meth:`icalendar.Calendar.to_ical` dominates render
+time for large calendars.  :class:`ICalWriter` produces the same bytes
+by formatting content lines straight from Python values: TEXT escaping,
+parameter quoting (including :rfc:`6868` caret escaping), property
+ordering and 75-octet line folding all mirror the ``icalendar`` library
+so that both paths are interchangeable.  Select it with
+``ICAL_SERIALIZER=fast``.
+"""
+
+from datetime import date, datetime
+
+# Parameters that icalendar always wraps in double quotes.
+_ALWAYS_QUOTED = frozenset(
+    ("ALTREP", "DELEGATED-FROM", "DELEGATED-TO", "DIR", "MEMBER", "SENT-BY", "X-ADDRESS", "X-TITLE")
+)
+_QUOTABLE = frozenset(",;:’")
+_FOLD_LIMIT = 75
+
+
+def escape_text(value: str) -> str:
+    """Apply RFC 5545 TEXT escaping to *value*."""
+    # Order matters, and matches icalendar.parser.escape_char.
+    return (
+        value.replace("\\N", "\n")
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def _param_value(name: str, value: str) -> str:
+    """Escape and, where required, quote a parameter value."""
+    value = value.replace("^", "^^").replace("\r\n", "^n").replace("\r", "^n").replace("\n", "^n").replace('"', "^'")
+    if name in _ALWAYS_QUOTED or not _QUOTABLE.isdisjoint(value):
+        return f'"{value}"'
+    return value
+
+
+def fold_line(line: str) -> str:
+    """Fold a content line so no physical line exceeds 75 octets."""
+    if line.isascii():
+        if len(line) < _FOLD_LIMIT:
+            return line
+        step = _FOLD_LIMIT - 1
+        return "\r\n ".join(line[i : i + step] for i in range(0, len(line), step))
+
+    chunks = []
+    byte_count = 0
+    for char in line:
+        char_len = len(char.encode("utf-8"))
+        byte_count += char_len
+        if byte_count >= _FOLD_LIMIT:
+            chunks.append("\r\n ")
+            byte_count = char_len
+        chunks.append(char)
+    return "".join(chunks)
+
+
+def format_datetime(value: datetime, tzid: str | None) -> str:
+    """Format a ``DATE-TIME`` value; UTC values (``tzid is None``) get a ``Z`` suffix."""
+    s = f"{value.year:04}{value.month:02}{value.day:02}T{value.hour:02}{value.minute:02}{value.second:02}"
+    return s if tzid else s + "Z"
+
+
+def format_date(value: date) -> str:
+    """Format a ``DATE`` value."""
+    return f"{value.year:04}{value.month:02}{value.day:02}"
+
+
+class ICalWriter:
+    """Accumulates folded content lines and encodes them to bytes.
+
+    Property values are written verbatim; callers escape TEXT values with
+    :func:`escape_text` (or use :meth:`text`).  Parameters are emitted in
+    sorted order, as ``icalendar`` does.
+    """
+
+    def __init__(self) -> None:
+        self._lines: list[str] = []
+
+    def line(self, name: str, value: str, params: dict[str, str] | None = None) -> None:
+        """Append a property whose *value* is already in iCalendar format."""
+        if params:
+            rendered = ";".join(f"{key}={_param_value(key, params[key])}" for key in sorted(params))
+            self._lines.append(fold_line(f"{name};{rendered}:{value}"))
+        else:
+            self._lines.append(fold_line(f"{name}:{value}"))
+
+    def text(self, name: str, value: str, params: dict[str, str] | None = None) -> None:
+        """Append a TEXT property, escaping *value*."""
+        self.line(name, escape_text(value), params)
+
+    def getvalue(self) -> bytes:
+        """Return the accumulated content lines as CRLF-terminated UTF-8 bytes."""
+        if not self._lines:
+            return b""
+        return ("\r\n".join(self._lines) + "\r\n").encode("utf-8")
@@ -0,0 +1,245 @@
+"""Host-wide store of rendered calendars shared by all worker processes.
+
+:data:`~src.utils.cache.render_cache` lives inside one process, so under
+``uvicorn --workers N`` every worker would render and hold its own copy
+of each calendar.  :class:`SharedRenderStore` keeps the rendered bytes,
+including compressed variants, in one file per calendar inside
+``settings.shared_cache_dir``, so a calendar is rendered once per change
+per host and every worker serves the same payload.
+
+Each file is stamped with a digest of the calendar's
+:data:`~src.utils.cache.CacheKey` (CSV path, ``mtime_ns``, size and the
+output-relevant settings); an entry whose stamp does not match the
+requested key is ignored as stale.
+
+Reads are lock-free: files are written to a temporary name and
+atomically renamed into place, and readers simply memory-map whatever
+file is current.  A hit is served straight from the mapping (its
+payloads are :class:`memoryview` slices of it), and each process keeps
+the mapping of the current file of every calendar open, so all workers
+share the operating system's single page-cache copy of the bytes.
+Only a render takes a per-calendar ``flock`` so that concurrent workers
+missing the same version wait for one render instead of repeating it.
+
+File layout::
+
+    magic (8 bytes) | metadata length (uint32, little-endian) |
+    metadata (JSON) | content | compressed variants ...
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from src.settings import settings
+from src.utils.cache import CacheKey, RenderedCalendar
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"ICSSHRD1"
+_PREFIX = struct.Struct("<8sI")
+
+
+def version_stamp(key: CacheKey) -> str:
+    """Return the digest identifying the calendar version *key* across processes."""
+    return hashlib.sha256(repr(key).encode()).hexdigest()
+
+
+class SharedRenderStore:
+    """Directory of rendered calendars, one memory-mapped file per calendar.
+
+    Args:
+        directory: Where cache files are kept.  Created on first write.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        # Calendar path -> ((st_ino, st_mtime_ns) of the mapped file, stamp, render).
+        self._mapped: dict[str, tuple[tuple[int, int], str, RenderedCalendar]] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, calendar_path: str, suffix: str) -> Path:
+        return self.directory / f"{hashlib.sha256(calendar_path.encode()).hexdigest()[:32]}{suffix}"
+
+    def get(self, key: CacheKey) -> RenderedCalendar | None:
+        """Return the stored render for *key*, or ``None`` if absent, stale or unreadable.
+
+        The returned payloads are read-only views of the memory-mapped
+        file, not copies.
+        """
+        path = self._path(key[0], ".ics")
+        stamp = version_stamp(key)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        identity = (stat.st_ino, stat.st_mtime_ns)
+        with self._lock:
+            mapped = self._mapped.get(key[0])
+        if mapped is not None and mapped[0] == identity:
+            return mapped[2] if mapped[1] == stamp else None
+
+        try:
+            with open(path, "rb") as f:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        view = memoryview(buf)
+        try:
+            magic, meta_len = _PREFIX.unpack_from(view)
+            if magic != MAGIC:
+                return None
+            meta = json.loads(bytes(view[_PREFIX.size : _PREFIX.size + meta_len]))
+            offset = _PREFIX.size + meta_len
+            blobs = {}
+            for name, length in meta["sections"]:
+                blobs[name] = view[offset : offset + length]
+                offset += length
+            if offset > len(view):
+                raise ValueError("truncated file")
+            entry_stamp = meta["stamp"]
+            rendered = RenderedCalendar(
+                content=blobs.pop("identity"),
+                etag=meta["etag"],
+                last_modified=meta["last_modified"],
+                unresolved=frozenset(meta["unresolved"]),
+                encodings=blobs,
+            )
+        except (struct.error, ValueError, KeyError, TypeError) as e:
+            logger.warning("Ignoring corrupt shared cache entry for %s: %s", key[0], e)
+            return None
+
+        # The mapping stays open for as long as views of it are referenced.
+        with self._lock:
+            self._mapped[key[0]] = (identity, entry_stamp, rendered)
+        return rendered if entry_stamp == stamp else None
+
+    def put(self, key: CacheKey, rendered: RenderedCalendar) -> None:
+        """Atomically store *rendered* as the current version of its calendar.
+
+        Write failures are logged and otherwise ignored.
+        """
+        sections = [("identity", rendered.content), *rendered.encodings.items()]
+        meta = json.dumps(
+            {
+                "stamp": version_stamp(key),
+                "etag": rendered.etag,
+                "last_modified": rendered.last_modified,
+                "unresolved": sorted(rendered.unresolved),
+                "sections": [(name, len(blob)) for name, blob in sections],
+            }
+        ).encode()
+        target = self._path(key[0], ".ics")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=self.directory, prefix=target.name, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(_PREFIX.pack(MAGIC, len(meta)))
+                    f.write(meta)
+                    for _, blob in sections:
+                        f.write(blob)
+                os.replace(tmp_name, target)
+            except BaseException:
+                os.unlink(tmp_name)
+                raise
+        except OSError as e:
+            logger.warning("Could not write shared cache entry for %s: %s", key[0], e)
+
+    def discard(self, calendar_path: str) -> None:
+        """Remove whatever is stored for the calendar at *calendar_path*."""
+        with self._lock:
+            self._mapped.pop(calendar_path, None)
+        for suffix in (".ics", ".lock"):
+            try:
+                os.unlink(self._path(calendar_path, suffix))
+            except OSError:
+                pass
+
+    @contextmanager
+    def lock(self, calendar_path: str) -> Iterator[None]:
+        """Hold an exclusive, host-wide lock for rendering *calendar_path*.
+
+        Degrades to no locking where ``flock`` is unavailable or the lock
+        file cannot be created.
+        """
+        fd = None
+        if fcntl is not None:
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                fd = os.open(self._path(calendar_path, ".lock"), os.O_RDWR | os.O_CREAT, 0o644)
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            except OSError as e:
+                logger.warning("Could not lock shared cache entry for %s: %s", calendar_path, e)
+                if fd is not None:
+                    os.close(fd)
+                fd = None
+        try:
+            yield
+        finally:
+            if fd is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+                os.close(fd)
+
+    def get_or_render(
+        self,
+        key: CacheKey,
+        render: Callable[[], RenderedCalendar],
+        is_stale: Callable[[RenderedCalendar], bool] = lambda rendered: False,
+    ) -> RenderedCalendar:
+        """Return the stored render for *key*, rendering and storing it on a miss.
+
+        Args:
+            key: Cache key of the calendar version.
+            render: Produces the calendar when no usable entry exists.
+            is_stale: Rejects stored entries that must be re-rendered
+                even though their version stamp matches.
+
+        Returns:
+            The stored or freshly rendered calendar.
+        """
+        rendered = self.get(key)
+        if rendered is not None and not is_stale(rendered):
+            return rendered
+        with self.lock(key[0]):
+            # Another worker may have rendered it while we waited.
+            rendered = self.get(key)
+            if rendered is not None and not is_stale(rendered):
+                return rendered
+            rendered = render()
+            self.put(key, rendered)
+            return rendered
+
+
+_store: SharedRenderStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_shared_store() -> SharedRenderStore | None:
+    """Return the :class:`SharedRenderStore` for ``settings.shared_cache_dir``.
+
+    Returns ``None`` when no directory is configured.  The store is
+    recreated if the configured directory changes at runtime.
+    """
+    global _store
+    directory = settings.shared_cache_dir
+    if directory is None:
+        return None
+    with _store_lock:
+        if _store is None or _store.directory != directory:
+            _store = SharedRenderStore(directory)
+        return _store
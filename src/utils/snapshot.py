@@ -0,0 +1,215 @@
+"""Precompiled binary snapshots of calendar CSV files.
+
+Parsing a CSV with :class:`csv.DictReader` and validating every row
+through :class:`~src.models.CSVEntry` is repeated on every render.  A
+snapshot does that work once per CSV version: :func:`compile_snapshot`
+parses and validates the file and writes a compact, column-oriented
+binary file to the ``snapshots`` directory of the configured cache
+directory (see :attr:`~src.settings.Settings.cache_path`), never into
+the data directory itself.
+:func:`load_snapshot` maps that file into memory with :mod:`mmap` and
+exposes the columns as typed :class:`memoryview` objects, so loading a
+snapshot costs little more than decoding its table of distinct strings.
+
+File layout (little-endian, every section 8-byte aligned)::
+
+    header        magic, version, source mtime_ns, source size,
+                  row count, string count, settings digest
+    start         int64[rows]   event start, POSIX seconds
+    duration      int64[rows]   event duration, seconds
+    all_day       uint8[rows]   1 for all-day events
+    fields        uint32[rows * len(FIELDS)]  string-table indices
+    offsets       uint32[strings + 1]         string-table offsets
+    blob          UTF-8 bytes of all distinct strings
+
+A snapshot records the ``mtime_ns`` and size of the CSV it was built
+from, plus a digest of the settings whose defaults are baked into the
+rows; it is ignored as stale as soon as either changes.
+"""
+
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+from src.models import CSVEntry
+from src.settings import settings
+from src.utils.ingest import read_columns
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"ICSNAP\x00\x00"
+VERSION = 1
+FIELDS = ("date_str", "time_str", "duration", "location_name", "location", "place", "name", "description", "timezone")
+
+_HEADER = struct.Struct("<8sIqqII16s")
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _settings_digest() -> bytes:
+    """Digest of the settings that supply ``CSVEntry`` defaults."""
+    return hashlib.sha256(f"{settings.tz}\0{settings.default_place}".encode()).digest()[:16]
+
+
+def snapshot_path(csv_path: Path) -> Path:
+    """Return the snapshot file location for *csv_path*.
+
+    The name carries a digest of the absolute CSV path, so calendars of
+    the same name in different data directories do not collide.
+    """
+    digest = hashlib.sha256(os.path.abspath(csv_path).encode()).hexdigest()[:16]
+    return settings.cache_path / "snapshots" / f"{csv_path.stem}-{digest}.snapshot"
+
+
+@dataclass
+class Snapshot:
+    """A memory-mapped, validated calendar.
+
+    Attributes:
+        rows: Number of events.
+        start: Event start times as POSIX seconds (``int64`` view).
+        duration: Event durations in seconds (``int64`` view).
+        all_day: ``1`` for all-day events, ``0`` otherwise (``uint8`` view).
+        fields: String-table indices, ``len(FIELDS)`` per row (``uint32`` view).
+        strings: The decoded table of distinct strings.
+    """
+
+    rows: int
+    start: memoryview
+    duration: memoryview
+    all_day: memoryview
+    fields: memoryview
+    strings: list[str]
+
+    def entry(self, index: int) -> CSVEntry:
+        """Rebuild the :class:`CSVEntry` for row *index* without re-validating it."""
+        base = index * len(FIELDS)
+        values = {name: self.strings[self.fields[base + i]] for i, name in enumerate(FIELDS)}
+        return CSVEntry.model_construct(**values)
+
+    def entries(self) -> Iterator[CSVEntry]:
+        """Yield every row as a :class:`CSVEntry`, in file order."""
+        for index in range(self.rows):
+            yield self.entry(index)
+
+
+def compile_snapshot(csv_path: Path) -> Path:
+    """Parse and validate *csv_path* and write its binary snapshot.
+
+    The snapshot is written to a temporary file and atomically renamed
+    into place, so concurrent readers never observe a partial file.
+
+    Args:
+        csv_path: The calendar CSV file.
+
+    Returns:
+        The path of the written snapshot.
+
+    Raises:
+        pydantic.ValidationError: If any row is invalid; all problems
+            in the file are reported together.
+        OSError: If the CSV cannot be read or the snapshot written.
+    """
+    stat = os.stat(csv_path)
+    columns = read_columns(csv_path)
+    start, duration, all_day = array("q", columns.start), array("q", columns.duration), array("B", columns.all_day)
+    fields = array("I")
+    interned: dict[str, int] = {}
+    for values in zip(*(columns.fields[name] for name in FIELDS)):
+        for value in values:
+            fields.append(interned.setdefault(value, len(interned)))
+
+    blob = bytearray()
+    offsets = array("I", [0])
+    for value in interned:
+        blob += value.encode("utf-8")
+        offsets.append(len(blob))
+
+    header = _HEADER.pack(MAGIC, VERSION, stat.st_mtime_ns, stat.st_size, len(start), len(interned), _settings_digest())
+    target = snapshot_path(csv_path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=target.parent, prefix=target.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for section in (header, start, duration, all_day, fields, offsets, blob):
+                f.write(section)
+                f.write(b"\0" * (_align(f.tell()) - f.tell()))
+        os.replace(tmp_name, target)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+    return target
+
+
+def load_snapshot(csv_path: Path, stat: os.stat_result | None = None) -> Snapshot | None:
+    """Memory-map the snapshot for *csv_path* if it is current.
+
+    Args:
+        csv_path: The calendar CSV file.
+        stat: ``os.stat`` result for *csv_path*, if the caller has one.
+
+    Returns:
+        The :class:`Snapshot`, or ``None`` when no snapshot exists, it is
+        stale (CSV or settings changed since it was built), or it is
+        unreadable or corrupt.
+    """
+    try:
+        stat = stat or os.stat(csv_path)
+        with open(snapshot_path(csv_path), "rb") as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        magic, version, mtime_ns, size, rows, nstrings, digest = _HEADER.unpack_from(buf)
+        if (magic, version, mtime_ns, size, digest) != (
+            MAGIC,
+            VERSION,
+            stat.st_mtime_ns,
+            stat.st_size,
+            _settings_digest(),
+        ):
+            return None
+
+        view = memoryview(buf)
+        offset = _align(_HEADER.size)
+        sections = []
+        for fmt, count in (("q", rows), ("q", rows), ("B", rows), ("I", rows * len(FIELDS)), ("I", nstrings + 1)):
+            end = offset + count * struct.calcsize(fmt)
+            sections.append(view[offset:end].cast(fmt))
+            offset = _align(end)
+        start, duration, all_day, fields, offsets = sections
+        blob = view[offset : offset + offsets[nstrings]]
+        strings = [str(blob[offsets[i] : offsets[i + 1]], "utf-8") for i in range(nstrings)]
+    except (struct.error, ValueError, IndexError, TypeError) as e:
+        logger.warning("Ignoring corrupt snapshot for %s: %s", csv_path, e)
+        return None
+
+    return Snapshot(rows=rows, start=start, duration=duration, all_day=all_day, fields=fields, strings=strings)
+
+
+def ensure_snapshot(csv_path: Path, stat: os.stat_result | None = None) -> Snapshot | None:
+    """Return a current snapshot for *csv_path*, compiling it first if needed.
+
+    Failures to write the snapshot (e.g. a read-only cache directory) are
+    logged and yield ``None`` so callers fall back to parsing the CSV.
+    Validation errors in the CSV propagate.
+    """
+    snapshot = load_snapshot(csv_path, stat)
+    if snapshot is not None:
+        return snapshot
+    try:
+        compile_snapshot(csv_path)
+    except OSError as e:
+        logger.warning("Could not write snapshot for %s: %s", csv_path, e)
+        return None
+    return load_snapshot(csv_path)
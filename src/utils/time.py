@@ -1,4 +1,4 @@
-"""Utilities for parsing human-readable duration strings into ``timedelta`` objects.
+"""Utilities for parsing human-readable duration strings and event times.
 
 Supported duration formats
 --------------------------
@@ -7,7 +7,11 @@ Supported duration formats
 - ``<N>d``    — N days     (e.g. ``"3d"``, also signals an all-day event)
 """
 
-from datetime import timedelta
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+from src.models import CSVEntry
+from src.utils.timezones import get_zone
 
 
 def parse_duration(duration_str: str) -> timedelta:
@@ -48,3 +52,46 @@ def parse_duration(duration_str: str) -> timedelta:
         ) from None
     # Unknown format — return zero duration as a safe fallback
     return timedelta(minutes=0)
+
+
+@lru_cache(maxsize=1024)
+def _cached_duration(duration_str: str) -> timedelta:
+    return parse_duration(duration_str)
+
+
+def localized_start(entry: CSVEntry) -> datetime:
+    """Return the timezone-aware start of *entry*, localised to its ``timezone``.
+
+    For all-day events this is local midnight of the (first) day.  Results
+    are memoised per distinct date, time and zone, which calendars repeat
+    across many rows.
+    """
+    return _localize(entry.date_str, entry.time_str, entry.timezone)
+
+
+@lru_cache(maxsize=65536)
+def _localize(date_str: str, time_str: str, zone: str) -> datetime:
+    return get_zone(zone).localize(datetime.strptime(f"{date_str} {time_str}", "%d.%m.%Y %H:%M"))
+
+
+def event_times(entry: CSVEntry) -> tuple[date, date] | tuple[datetime, datetime]:
+    """Compute the start and end of the event described by *entry*.
+
+    Timed events yield timezone-aware ``datetime`` values; all-day
+    events, detected by a duration string ending in ``"d"``, yield plain
+    ``date`` values.
+
+    Args:
+        entry: The parsed CSV row providing date, time, duration, and
+            timezone data.
+
+    Returns:
+        A ``(start, end)`` tuple.
+    """
+    is_all_day = entry.duration.endswith("d")
+    duration = _cached_duration(entry.duration)
+    start_dt = localized_start(entry)
+
+    if is_all_day:
+        return start_dt.date(), (start_dt + duration).date()
+    return start_dt, start_dt + duration
@@ -0,0 +1,92 @@
+"""Per-process timezone registry and ``VTIMEZONE`` generation.
+
+Every IANA zone is resolved once (:func:`get_zone`, :func:`tzid_for`),
+and the ``VTIMEZONE`` component describing it is generated once per
+zone and span of years (:func:`vtimezone`), so the cost of timezone
+handling depends on the number of distinct zones in a calendar rather
+than on its number of events.
+
+:class:`TimezoneTracker` records which zones the timed events of a
+calendar use, and over which years, while the events are rendered.  The
+matching ``VTIMEZONE`` components are then emitted once per calendar,
+after the last event; :rfc:`5545` does not constrain the order of
+calendar components, and placing them last keeps rendering single-pass
+so calendars can still be streamed.
+"""
+
+from collections.abc import Iterable, Iterator
+from datetime import date
+from functools import cache, lru_cache
+
+import pytz
+from icalendar import Timezone
+from icalendar.timezone.tzid import tzid_from_tzinfo
+
+from src.models import CSVEntry
+
+
+@cache
+def get_zone(name: str) -> pytz.BaseTzInfo:
+    """Return the ``pytz`` timezone for the IANA zone *name*.
+
+    Raises:
+        pytz.UnknownTimeZoneError: If *name* is not a known zone.
+    """
+    return pytz.timezone(name)
+
+
+@cache
+def tzid_for(name: str) -> str | None:
+    """Return the ``TZID`` parameter for an IANA zone, or ``None`` for UTC-equivalent zones."""
+    tzid = tzid_from_tzinfo(get_zone(name))
+    return None if tzid == "UTC" else tzid
+
+
+@lru_cache(maxsize=256)
+def vtimezone(name: str, first_year: int, last_year: int) -> bytes:
+    """Return the serialised ``VTIMEZONE`` for *name* covering *first_year* to *last_year*.
+
+    Only the transitions within those years are included.  The span is
+    kept to whole years so that calendars with similar date ranges share
+    cached components.
+    """
+    component = Timezone.from_tzinfo(
+        get_zone(name), tzid=tzid_for(name), first_date=date(first_year, 1, 1), last_date=date(last_year + 1, 1, 1)
+    )
+    return component.to_ical()
+
+
+class TimezoneTracker:
+    """Collects the zones and years used by the timed events of one calendar."""
+
+    def __init__(self) -> None:
+        self._years: dict[str, tuple[int, int]] = {}
+
+    def track(self, entries: Iterable[CSVEntry]) -> Iterator[CSVEntry]:
+        """Pass *entries* through unchanged, recording the zone and year of each timed event."""
+        years = self._years
+        for entry in entries:
+            if not entry.duration.endswith("d"):
+                # date_str is DD.MM.YYYY; events may run into the next year.
+                try:
+                    year = int(entry.date_str[-4:])
+                except ValueError:
+                    # Malformed dates are reported when the event is rendered.
+                    yield entry
+                    continue
+                span = years.get(entry.timezone)
+                if span is None:
+                    years[entry.timezone] = (year, year + 1)
+                elif not span[0] <= year < span[1]:
+                    years[entry.timezone] = (min(span[0], year), max(span[1], year + 1))
+            yield entry
+
+    def components(self) -> bytes:
+        """Return the ``VTIMEZONE`` components for every tracked zone that needs one."""
+        components, seen = [], set()
+        for name, (first, last) in sorted(self._years.items()):
+            tzid = tzid_for(name)
+            if tzid is not None and tzid not in seen:
+                seen.add(tzid)
+                components.append(vtimezone(name, first, last))
+        return b"".join(components)
@@ -0,0 +1,204 @@
+"""Watches ``settings.data_dir`` and keeps rendered calendars warm.
+
+:class:`DataDirWatcher` maintains an in-memory index of the calendars in
+the data directory and, whenever a CSV file is created or modified,
+re-renders that calendar in the background so the next client request
+is served straight from :data:`~src.utils.cache.render_cache`.  Deleted
+calendars are dropped from the index and the caches.  After each change
+the calendar catalog (:mod:`src.utils.catalog`) is refreshed as well.
+
+On Linux, changes are detected through ``inotify`` (via :mod:`ctypes`,
+no extra dependency).  Elsewhere, or when ``inotify`` is unavailable,
+the directory is re-scanned every ``settings.watch_poll_interval``
+seconds.  In both cases a change triggers a cheap ``stat`` scan of the
+directory that is diffed against the index, so the two modes behave
+identically.
+
+The watcher is started and stopped by the FastAPI lifespan in
+:mod:`src.main`.
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import logging
+import os
+from pathlib import Path
+
+from src.settings import settings
+from src.utils.cache import cache_key, render_cache
+from src.utils.catalog import catalog
+from src.utils.render import cached_render, render_pool
+from src.utils.sharedcache import get_shared_store
+
+logger = logging.getLogger(__name__)
+
+# inotify(7) constants.
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+
+# Delay before rescanning after an inotify event, so that a burst of
+# events from a single save collapses into one scan.
+_DEBOUNCE = 0.2
+
+FileState = tuple[int, int]
+
+
+def _open_inotify(directory: Path) -> int | None:
+    """Return a non-blocking inotify file descriptor watching *directory*, or ``None``."""
+    libc_name = ctypes.util.find_library("c")
+    if libc_name is None:
+        return None
+    try:
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+    if libc.inotify_add_watch(fd, os.fsencode(directory), _WATCH_MASK) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+
+def scan_directory(directory: Path) -> dict[str, FileState]:
+    """Return ``{calendar_name: (mtime_ns, size)}`` for every CSV in *directory*."""
+    state = {}
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(".csv") and entry.is_file():
+                    stat = entry.stat()
+                    state[entry.name.removesuffix(".csv")] = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        pass
+    return state
+
+
+class DataDirWatcher:
+    """Keeps an index of available calendars and pre-renders changed ones.
+
+    Args:
+        directory: The directory to watch; defaults to
+            ``settings.data_dir`` at :meth:`start` time.
+    """
+
+    def __init__(self, directory: Path | None = None) -> None:
+        self._configured_directory = directory
+        self.directory: Path | None = None
+        self._index: dict[str, FileState] = {}
+        self._task: asyncio.Task | None = None
+        self._wake = asyncio.Event()
+        self._inotify_fd: int | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    @property
+    def calendars(self) -> list[str]:
+        """Names of the calendars currently present, sorted."""
+        return sorted(self._index)
+
+    @property
+    def states(self) -> dict[str, FileState]:
+        """``{calendar_name: (mtime_ns, size)}`` of the indexed CSV files."""
+        return self._index
+
+    def serves(self, directory: Path) -> bool:
+        """Return ``True`` if the watcher is running and indexing *directory*."""
+        return self.running and self.directory == directory
+
+    def start(self) -> None:
+        """Index the directory and start watching it on the running event loop."""
+        if self._task is not None:
+            return
+        self.directory = self._configured_directory or settings.data_dir
+        self._wake = asyncio.Event()
+        self._inotify_fd = _open_inotify(self.directory)
+        if self._inotify_fd is not None:
+            asyncio.get_running_loop().add_reader(self._inotify_fd, self._on_inotify)
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop watching and wait for background work to finish."""
+        if self._task is None:
+            return
+        if self._inotify_fd is not None:
+            asyncio.get_running_loop().remove_reader(self._inotify_fd)
+            os.close(self._inotify_fd)
+            self._inotify_fd = None
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def _on_inotify(self) -> None:
+        try:
+            events = os.read(self._inotify_fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        if b".csv" in events:
+            self._wake.set()
+
+    async def _run(self) -> None:
+        while True:
+            await self.refresh()
+            timeout = None if self._inotify_fd is not None else settings.watch_poll_interval
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+                await asyncio.sleep(_DEBOUNCE)
+            except TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def refresh(self) -> set[str]:
+        """Rescan the directory, update the index and pre-render changed calendars.
+
+        Returns:
+            Names of calendars that were added, modified or removed.
+        """
+        current = await asyncio.to_thread(scan_directory, self.directory)
+        changed = {name for name, state in current.items() if self._index.get(name) != state}
+        removed = self._index.keys() - current.keys()
+        self._index = current
+
+        shared = get_shared_store()
+        for name in removed:
+            path = str((self.directory / f"{name}.csv").resolve())
+            render_cache.discard(path)
+            if shared is not None:
+                shared.discard(path)
+        for name in sorted(changed):
+            await self._prerender(name)
+        if changed or removed:
+            try:
+                await asyncio.to_thread(catalog.update, self.directory, current)
+            except Exception:
+                logger.exception("Refreshing the calendar catalog failed")
+        return changed | removed
+
+    async def _prerender(self, name: str) -> None:
+        csv_path = self.directory / f"{name}.csv"
+        try:
+            stat = csv_path.stat()
+            if settings.stream_threshold_bytes and stat.st_size >= settings.stream_threshold_bytes:
+                return
+            key = cache_key(csv_path.resolve(), stat)
+            if cached_render(key) is None:
+                await render_pool.render(key, csv_path, name, stat.st_mtime)
+        except Exception:
+            logger.exception("Pre-rendering calendar %r failed", name)
+
+
+data_dir_watcher = DataDirWatcher()
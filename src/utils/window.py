@@ -0,0 +1,179 @@
+"""Time-window queries over a calendar's events.
+
+Most subscribers only care about upcoming events, yet a CSV calendar
+usually accumulates years of past rows.  :class:`CalendarIndex` orders
+the events of one calendar version by start time so that the events
+overlapping a ``[start, end)`` window are located by bisection instead
+of converting every row.  Indexes are built once per CSV version and
+kept in a small per-calendar cache (:func:`get_index`).
+
+When snapshots are enabled the index is built straight from the
+snapshot's start and duration columns, and only the rows inside the
+requested window are ever materialised as :class:`~src.models.CSVEntry`.
+"""
+
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from datetime import date, datetime, time
+from pathlib import Path
+
+import pytz
+
+from src.models import CSVEntry
+from src.settings import settings
+from src.utils.cache import CacheKey
+from src.utils.ingest import read_columns
+from src.utils.snapshot import ensure_snapshot
+
+# Number of calendar versions whose index is kept in memory.
+_MAX_INDEXES = 32
+
+
+class CalendarIndex:
+    """Events of one calendar version ordered by start time.
+
+    Args:
+        starts: Event start times as POSIX seconds, in row order.
+        durations: Event durations in seconds, in row order.
+        entry_at: Returns the :class:`CSVEntry` for a row number.
+    """
+
+    def __init__(self, starts: list[int], durations: list[int], entry_at: Callable[[int], CSVEntry]) -> None:
+        self._order = sorted(range(len(starts)), key=starts.__getitem__)
+        self._starts = [starts[i] for i in self._order]
+        self._ends = [starts[i] + durations[i] for i in self._order]
+        self._max_duration = max(durations, default=0)
+        self._entry_at = entry_at
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def span(self) -> tuple[int, int] | None:
+        """Return the earliest start and latest end as POSIX seconds, or ``None`` if there are no events."""
+        if not self._starts:
+            return None
+        return self._starts[0], max(self._ends)
+
+    def window(self, start: float | None = None, end: float | None = None) -> list[CSVEntry]:
+        """Return the events overlapping ``[start, end)``, ordered by start time.
+
+        An event overlaps the window when it ends after *start* and
+        starts before *end*.  Either bound may be ``None`` for an
+        open-ended window.
+
+        Args:
+            start: Window start as a POSIX timestamp.
+            end: Window end as a POSIX timestamp.
+
+        Returns:
+            The matching entries.
+        """
+        return [entry for _, _, entry in self.scan(start, end)]
+
+    def scan(
+        self, start: float | None = None, end: float | None = None, from_start: float | None = None
+    ) -> Iterator[tuple[int, int, CSVEntry]]:
+        """Lazily yield ``(event_start, row, entry)`` for the events overlapping ``[start, end)``.
+
+        ``row`` is the 0-based position of the event in the calendar file.
+
+        Events are ordered by start time; ties keep row order.  Entries
+        are only materialised as they are consumed.
+
+        Args:
+            start: Window start as a POSIX timestamp.
+            end: Window end as a POSIX timestamp.
+            from_start: Skip events starting before this POSIX
+                timestamp, e.g. to resume a paginated listing.
+        """
+        # No event is longer than _max_duration, so any event that still
+        # runs at `start` began at most that long before it.
+        lo = 0 if start is None else bisect_left(self._starts, start - self._max_duration)
+        if from_start is not None:
+            lo = max(lo, bisect_left(self._starts, from_start))
+        hi = len(self._starts) if end is None else bisect_left(self._starts, end)
+        for i in range(lo, hi):
+            if start is None or self._ends[i] > start:
+                yield self._starts[i], self._order[i], self._entry_at(self._order[i])
+
+
+def build_index(csv_path: Path) -> CalendarIndex:
+    """Build the :class:`CalendarIndex` for the current version of *csv_path*.
+
+    Raises:
+        FileNotFoundError: If *csv_path* does not exist.
+        pydantic.ValidationError: If any CSV row is invalid.
+    """
+    if settings.snapshot_enabled:
+        snapshot = ensure_snapshot(csv_path)
+        if snapshot is not None:
+            return CalendarIndex(snapshot.start.tolist(), snapshot.duration.tolist(), snapshot.entry)
+
+    columns = read_columns(csv_path)
+    return CalendarIndex(columns.start, columns.duration, columns.entry)
+
+
+_indexes: OrderedDict[str, tuple[CacheKey, CalendarIndex]] = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_index(key: CacheKey, csv_path: Path) -> CalendarIndex:
+    """Return the index for the calendar version identified by *key*, building it if needed.
+
+    Args:
+        key: Cache key of the calendar version (see
+            :func:`~src.utils.cache.cache_key`).
+        csv_path: Path to the calendar's CSV file.
+    """
+    with _lock:
+        item = _indexes.get(key[0])
+        if item is not None and item[0] == key:
+            _indexes.move_to_end(key[0])
+            return item[1]
+
+    index = build_index(csv_path)
+    with _lock:
+        _indexes[key[0]] = (key, index)
+        _indexes.move_to_end(key[0])
+        while len(_indexes) > _MAX_INDEXES:
+            _indexes.popitem(last=False)
+    return index
+
+
+def clear_indexes() -> None:
+    """Drop every cached index."""
+    with _lock:
+        _indexes.clear()
+
+
+def parse_timestamp(value: str) -> float:
+    """Parse a query-string date or date-time into a POSIX timestamp.
+
+    Accepts ISO 8601 dates (``2025-06-01``) and date-times
+    (``2025-06-01T18:00``, ``2025-06-01T18:00:00+02:00``) as well as the
+    iCalendar forms used by ``DTSTAMP`` (``20250601``,
+    ``20250601T160000Z``).  Values without a UTC offset are interpreted
+    in ``settings.tz``; a bare date means local midnight.
+
+    Raises:
+        ValueError: If *value* is not in a recognised format or lies
+            outside the range of representable date-times once its
+            timezone is applied.
+    """
+    value = value.strip()
+    if value.endswith("Z") and "T" in value and "-" not in value:
+        parsed = datetime.strptime(value, "%Y%m%dT%H%M%SZ").replace(tzinfo=pytz.utc)
+    elif len(value) == 8 and value.isdigit():
+        parsed = datetime.combine(datetime.strptime(value, "%Y%m%d").date(), time())
+    elif "T" not in value and " " not in value:
+        parsed = datetime.combine(date.fromisoformat(value), time())
+    else:
+        parsed = datetime.fromisoformat(value)
+    try:
+        if parsed.tzinfo is None:
+            parsed = pytz.timezone(settings.tz).localize(parsed)
+        return parsed.timestamp()
+    except (OverflowError, OSError) as e:
+        raise ValueError(f"Date out of range: {value}") from e
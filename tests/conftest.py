@@ -0,0 +1,27 @@
+import pytest
+
+from src.settings import settings
+from src.utils.cache import merged_cache, render_cache
+from src.utils.catalog import catalog
+from src.utils.fragments import fragment_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_render_cache():
+    """Start every test with empty rendered-calendar, merged-feed, event fragment and catalog caches."""
+    render_cache.clear()
+    merged_cache.clear()
+    fragment_cache.clear()
+    catalog.clear()
+    yield
+    render_cache.clear()
+    merged_cache.clear()
+    fragment_cache.clear()
+    catalog.clear()
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(monkeypatch, tmp_path):
+    """Keep snapshots and the geocode store in a per-test cache directory."""
+    monkeypatch.setattr(settings, "cache_dir", tmp_path / "cache")
+    monkeypatch.setattr(settings, "geocode_cache_path", None)
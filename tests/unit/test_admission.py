@@ -0,0 +1,127 @@
+import asyncio
+import math
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.main import app
+from src.settings import settings
+from src.utils.admission import AdmissionController, AdmissionRejectedError, _calendar_of, request_cost
+from src.utils.metrics import ADMISSION_REQUESTS
+
+CSV = "date,time,duration,location,name,description\n01.01.2025,10:00,1h,,Event,Desc\n"
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setattr(settings, "admission_max_concurrent", 1)
+    monkeypatch.setattr(settings, "admission_max_per_calendar", 1)
+    monkeypatch.setattr(settings, "admission_queue_size", 2)
+    monkeypatch.setattr(settings, "admission_queue_timeout", 1.0)
+
+
+def test_cheapest_waiter_is_admitted_first(limits):
+    controller = AdmissionController()
+    order = []
+
+    async def request(calendar, cost):
+        await controller.acquire(calendar, lambda: cost)
+        order.append(calendar)
+        await asyncio.sleep(0)
+        controller.release(calendar)
+
+    async def scenario():
+        await controller.acquire("busy", lambda: 0)
+        tasks = [asyncio.create_task(request("big", 1000)), asyncio.create_task(request("small", 10))]
+        await asyncio.sleep(0.01)
+        assert controller.waiting == 2
+        controller.release("busy")
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+    assert order == ["small", "big"]
+    assert controller.active == 0
+
+
+def test_per_calendar_limit_lets_other_calendars_through(limits, monkeypatch):
+    monkeypatch.setattr(settings, "admission_max_concurrent", 2)
+    controller = AdmissionController()
+
+    async def scenario():
+        await controller.acquire("hot", lambda: 0)
+        waiting = asyncio.create_task(controller.acquire("hot", lambda: 0))
+        await asyncio.sleep(0.01)
+        await controller.acquire("other", lambda: 0)
+        assert controller.active == 2 and not waiting.done()
+        controller.release("hot")
+        await waiting
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_sheds_most_expensive_request(limits):
+    controller = AdmissionController()
+
+    async def scenario():
+        await controller.acquire("busy", lambda: 0)
+        expensive = asyncio.create_task(controller.acquire("merged", lambda: math.inf))
+        medium = asyncio.create_task(controller.acquire("medium", lambda: 500))
+        await asyncio.sleep(0.01)
+
+        cheap = asyncio.create_task(controller.acquire("cheap", lambda: 0))
+        with pytest.raises(AdmissionRejectedError):
+            await expensive
+        with pytest.raises(AdmissionRejectedError):
+            await controller.acquire("costly", lambda: 1000)
+
+        controller.release("busy")
+        await cheap
+        controller.release("cheap")
+        await medium
+        controller.release("medium")
+
+    before = ADMISSION_REQUESTS.value(outcome="evicted")
+    asyncio.run(scenario())
+    assert ADMISSION_REQUESTS.value(outcome="evicted") == before + 1
+    assert controller.active == 0 and controller.waiting == 0
+
+
+def test_wait_times_out(limits, monkeypatch):
+    monkeypatch.setattr(settings, "admission_queue_timeout", 0.01)
+    controller = AdmissionController()
+
+    async def scenario():
+        await controller.acquire("busy", lambda: 0)
+        with pytest.raises(AdmissionRejectedError):
+            await controller.acquire("late", lambda: 0)
+
+    asyncio.run(scenario())
+    assert controller.waiting == 0 and controller.active == 1
+
+
+def test_request_cost(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "data_dir", tmp_path)
+    monkeypatch.setattr(settings, "admission_enabled", False)
+    (tmp_path / "cal.csv").write_text(CSV)
+
+    assert request_cost("cal") == len(CSV)
+    TestClient(app).get("/cal.ics")
+    assert request_cost("cal") == 0
+    assert request_cost("missing") == 0
+    assert request_cost("calendars/merged") == math.inf
+    assert [_calendar_of(p) for p in ("/cal.ics", "/cal/events", "/", "/metrics")] == ["cal", "cal", None, None]
+
+
+def test_saturated_server_answers_503(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "data_dir", tmp_path)
+    monkeypatch.setattr(settings, "admission_max_concurrent", 0)
+    monkeypatch.setattr(settings, "admission_queue_size", 0)
+    (tmp_path / "cal.csv").write_text(CSV)
+    client = TestClient(app)
+
+    response = client.get("/cal.ics")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == str(settings.admission_retry_after)
+    assert client.get("/healthz").status_code == 200
+    assert client.head("/cal.ics").status_code == 200
+    assert 'ical_admission_requests_total{outcome="rejected"}' in client.get("/metrics").text
@@ -0,0 +1,27 @@
+from benchmarks.generate import CalendarSpec, generate_rows, write_calendar
+from benchmarks.run import compare
+from src.settings import settings
+from src.utils.ical import csv_to_ical
+
+
+def test_generated_rows_are_deterministic_and_follow_spec():
+    spec = CalendarSpec(rows=200, timezones=("UTC", "Asia/Tokyo"), all_day_ratio=0.5, addresses=3, seed=7)
+    rows = generate_rows(spec)
+    assert rows == generate_rows(spec)
+    assert len(rows) == 200
+    assert {row["timezone"] for row in rows} == {"UTC", "Asia/Tokyo"}
+    assert len({row["location"] for row in rows}) == 3
+    all_day = sum(row["duration"].endswith("d") for row in rows)
+    assert 60 < all_day < 140
+
+
+def test_generated_calendar_renders(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "geocode_enabled", False)
+    csv_path = write_calendar(tmp_path / "bench.csv", CalendarSpec(rows=20))
+    assert csv_to_ical(csv_path, "bench").count(b"BEGIN:VEVENT") == 20
+
+
+def test_compare_matches_benchmarks_by_name():
+    baseline = {"results": [{"name": "a", "median": 2.0}, {"name": "gone", "median": 1.0}]}
+    current = {"results": [{"name": "a", "median": 1.0}, {"name": "new", "median": 1.0}]}
+    assert compare(current, baseline) == [("a", 2.0, 1.0, 0.5)]
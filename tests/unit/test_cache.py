@@ -0,0 +1,145 @@
+import os
+from unittest.mock import patch
+
+from starlette.datastructures import Headers
+
+from src.settings import settings
+from src.utils.cache import RenderCache, RenderedCalendar, cache_key
+from src.utils.http import http_date, is_not_modified
+
+
+def _key(path: str, mtime_ns: int = 1, size: int = 1) -> tuple:
+    return (path, mtime_ns, size, ())
+
+
+def test_rendered_calendar_etag_is_strong_and_stable():
+    a = RenderedCalendar.from_content(b"BEGIN:VCALENDAR", 0.0)
+    b = RenderedCalendar.from_content(b"BEGIN:VCALENDAR", 0.0)
+    assert a.etag == b.etag
+    assert a.etag.startswith('"') and a.etag.endswith('"')
+    assert RenderedCalendar.from_content(b"other", 0.0).etag != a.etag
+
+
+def test_cache_hit_and_version_miss():
+    cache = RenderCache(max_bytes=1024)
+    rendered = RenderedCalendar.from_content(b"payload", 0.0)
+    cache.put(_key("a"), rendered)
+    assert cache.get(_key("a")) is rendered
+    assert cache.get(_key("a", mtime_ns=2)) is None
+
+
+def test_cache_replaces_older_version_of_same_path():
+    cache = RenderCache(max_bytes=1024)
+    cache.put(_key("a"), RenderedCalendar.from_content(b"old", 0.0))
+    cache.put(_key("a", mtime_ns=2), RenderedCalendar.from_content(b"newer", 0.0))
+    assert len(cache) == 1
+    assert cache.size_bytes == len(b"newer")
+
+
+def test_cache_evicts_least_recently_used():
+    cache = RenderCache(max_bytes=10)
+    cache.put(_key("a"), RenderedCalendar.from_content(b"aaaa", 0.0))
+    cache.put(_key("b"), RenderedCalendar.from_content(b"bbbb", 0.0))
+    cache.get(_key("a"))
+    cache.put(_key("c"), RenderedCalendar.from_content(b"cccc", 0.0))
+    assert cache.get(_key("a")) is not None
+    assert cache.get(_key("b")) is None
+    assert cache.get(_key("c")) is not None
+    assert cache.size_bytes <= 10
+
+
+def test_cache_skips_oversized_payload():
+    cache = RenderCache(max_bytes=4)
+    cache.put(_key("a"), RenderedCalendar.from_content(b"too large", 0.0))
+    assert len(cache) == 0
+
+
+def test_cache_key_tracks_settings(monkeypatch, tmp_path):
+    csv_file = tmp_path / "cal.csv"
+    csv_file.write_text("date\n")
+    stat = os.stat(csv_file)
+    key = cache_key(csv_file, stat)
+    monkeypatch.setattr(settings, "tz", "Asia/Tokyo")
+    assert cache_key(csv_file, stat) != key
+
+
+# --- conditional request helpers ---
+
+
+def test_is_not_modified_if_none_match():
+    assert is_not_modified(Headers({"if-none-match": '"abc"'}), '"abc"', 0.0)
+    assert is_not_modified(Headers({"if-none-match": 'W/"abc", "def"'}), '"abc"', 0.0)
+    assert is_not_modified(Headers({"if-none-match": "*"}), '"abc"', 0.0)
+    assert not is_not_modified(Headers({"if-none-match": '"xyz"'}), '"abc"', 0.0)
+
+
+def test_is_not_modified_if_none_match_takes_precedence():
+    headers = Headers({"if-none-match": '"xyz"', "if-modified-since": http_date(2_000_000_000)})
+    assert not is_not_modified(headers, '"abc"', 1_000_000_000)
+
+
+def test_is_not_modified_if_modified_since():
+    assert is_not_modified(Headers({"if-modified-since": http_date(1_000_000_000)}), '"a"', 1_000_000_000.5)
+    assert not is_not_modified(Headers({"if-modified-since": http_date(999_999_999)}), '"a"', 1_000_000_000)
+    assert not is_not_modified(Headers({"if-modified-since": "garbage"}), '"a"', 0.0)
+    assert not is_not_modified(Headers({}), '"a"', 0.0)
+
+
+# --- route integration ---
+
+
+def test_unchanged_calendar_is_served_from_cache(monkeypatch, tmp_path):
+    from fastapi.testclient import TestClient
+
+    from src.main import app
+
+    monkeypatch.setattr(settings, "data_dir", tmp_path)
+    (tmp_path / "cal.csv").write_text("date,time,duration,location,name,description\n01.01.2025,10:00,1h,,Event,Desc\n")
+    client = TestClient(app)
+
+    with patch("src.utils.render.csv_to_ical", return_value=b"BEGIN:VCALENDAR\r\nEND:VCALENDAR\r\n") as mock_render:
+        first = client.get("/cal.ics")
+        second = client.get("/cal.ics")
+        conditional = client.get("/cal.ics", headers={"If-None-Match": first.headers["etag"]})
+        since = client.get("/cal.ics", headers={"If-Modified-Since": first.headers["last-modified"]})
+
+    assert mock_render.call_count == 1
+    assert first.status_code == second.status_code == 200
+    assert first.headers["etag"] == second.headers["etag"]
+    assert conditional.status_code == 304
+    assert conditional.content == b""
+    assert since.status_code == 304
+
+
+def test_modified_calendar_is_rerendered(monkeypatch, tmp_path):
+    from fastapi.testclient import TestClient
+
+    from src.main import app
+
+    monkeypatch.setattr(settings, "data_dir", tmp_path)
+    csv_file = tmp_path / "cal.csv"
+    csv_file.write_text("date,time,duration,location,name,description\n01.01.2025,10:00,1h,,Before,Desc\n")
+    client = TestClient(app)
+
+    first = client.get("/cal.ics")
+    csv_file.write_text("date,time,duration,location,name,description\n01.01.2025,10:00,1h,,After Edit,Desc\n")
+    os.utime(csv_file, ns=(0, os.stat(csv_file).st_mtime_ns + 1_000_000_000))
+    second = client.get("/cal.ics", headers={"If-None-Match": first.headers["etag"]})
+
+    assert second.status_code == 200
+    assert "After Edit" in second.text
+
+
+def test_dtstamp_follows_csv_mtime_and_renders_are_identical(tmp_path):
+    from src.utils.ical import csv_to_ical
+
+    csv_path = tmp_path / "cal.csv"
+    csv_path.write_text("date,time,duration,location,name,description\n01.01.2025,10:00,1h,,Event,Desc\n")
+    os.utime(csv_path, (1735725600.5, 1735725600.5))
+
+    first = csv_to_ical(csv_path, "cal")
+    assert b"DTSTAMP:20250101T100000Z\r\n" in first
+    assert csv_to_ical(csv_path, "cal") == first
+
+    os.utime(csv_path, (1735729200, 1735729200))
+    assert b"DTSTAMP:20250101T110000Z\r\n" in csv_to_ical(csv_path, "cal")
@@ -0,0 +1,99 @@
+import os
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.main import app
+from src.settings import settings
+from src.utils.ingest import read_columns
+from src.utils.snapshot import compile_snapshot
+
+HEADER = "date,time,duration,location,name,description,timezone\n"
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def data_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "data_dir", tmp_path)
+    monkeypatch.setattr(settings, "geocode_enabled", False)
+    monkeypatch.setattr(settings, "compression_min_bytes", 0)
+    (tmp_path / "a.csv").write_text(
+        HEADER + "02.01.2025,10:00,1h,,Later,x,UTC\n" + "01.01.2025,09:00,2h,,First,x,UTC\n"
+    )
+    (tmp_path / "broken.csv").write_text(HEADER + "01.01.2025\n")
+    return tmp_path
+
+
+def test_listing_describes_calendars(data_dir):
+    listing = client.get("/").json()
+
+    assert listing["calendars"] == ["a", "broken"]
+    a = listing["catalog"]["a"]
+    assert a["events"] == 2
+    assert a["first_start"] == "2025-01-01T09:00:00+00:00"
+    assert a["last_end"] == "2025-01-02T11:00:00+00:00"
+    assert a["size"] == (data_dir / "a.csv").stat().st_size
+    assert a["etag"] is None
+    assert listing["catalog"]["broken"]["events"] is None
+
+    etag = client.get("/a.ics", headers={"Accept-Encoding": "identity"}).headers["etag"]
+    assert client.get("/").json()["catalog"]["a"]["etag"] == etag
+
+
+def test_listing_reindexes_only_changed_calendars(data_dir):
+    client.get("/")
+    (data_dir / "b.csv").write_text(HEADER + "05.01.2025,10:00,1h,,B,x,UTC\n")
+    os.utime(data_dir, ns=(0, os.stat(data_dir).st_mtime_ns + 1_000_000))
+
+    with patch("src.utils.catalog.read_columns", wraps=read_columns) as parse:
+        listing = client.get("/").json()
+    assert listing["calendars"] == ["a", "b", "broken"]
+    assert [call.args[0].name for call in parse.call_args_list] == ["b.csv"]
+
+    (data_dir / "b.csv").unlink()
+    os.utime(data_dir, ns=(0, os.stat(data_dir).st_mtime_ns + 1_000_000))
+    assert client.get("/").json()["calendars"] == ["a", "broken"]
+
+
+def test_head_answered_without_rendering(data_dir):
+    with (
+        patch("src.routes.render_pool.render") as render,
+        patch("src.utils.catalog.read_columns") as parse,
+    ):
+        response = client.head("/a.ics")
+    render.assert_not_called()
+    parse.assert_not_called()
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+    assert "last-modified" in response.headers
+
+    full = client.get("/a.ics", headers={"Accept-Encoding": "gzip"})
+    head = client.head("/a.ics", headers={"Accept-Encoding": "gzip"})
+    assert head.headers["etag"] == full.headers["etag"]
+    assert head.headers["content-encoding"] == "gzip"
+    assert head.content == b""
+
+    cached = client.head("/a.ics", headers={"Accept-Encoding": "gzip", "If-None-Match": full.headers["etag"]})
+    assert cached.status_code == 304
+    assert client.head("/missing.ics").status_code == 404
+
+
+def test_streamed_calendars_report_stat_only(monkeypatch, data_dir):
+    monkeypatch.setattr(settings, "stream_threshold_bytes", 1)
+    with patch("src.utils.catalog.read_columns") as parse:
+        a = client.get("/").json()["catalog"]["a"]
+    parse.assert_not_called()
+    assert (a["events"], a["first_start"], a["last_end"]) == (None, None, None)
+    assert a["size"] == (data_dir / "a.csv").stat().st_size
+    assert a["last_modified"] is not None
+
+
+def test_summary_read_from_existing_snapshot(data_dir):
+    compile_snapshot(data_dir / "a.csv")
+    with patch("src.utils.catalog.read_columns", wraps=read_columns) as parse:
+        a = client.get("/").json()["catalog"]["a"]
+    assert [call.args[0].name for call in parse.call_args_list] == ["broken.csv"]
+    assert a["events"] == 2
+    assert a["last_end"] == "2025-01-02T11:00:00+00:00"
@@ -0,0 +1,82 @@
+import asyncio
+
+import httpx
+
+from src.cli import collect_addresses, main, warm_geocode_store
+from src.settings import settings
+from src.utils.geocoder import AsyncGeocoder
+from src.utils.geostore import get_geocode_store
+
+HEADER = "date,time,duration,location,name,description\n"
+
+
+def _write_calendars(tmp_path):
+    (tmp_path / "a.csv").write_text(
+        HEADER + "01.01.2025,10:00,1h,Hauptstraße 1 12345 Berlin,A,x\n"
+        "02.01.2025,10:00,1h,Hauptstraße 1 12345 Berlin,A,x\n"
+        "03.01.2025,10:00,1h,,No address,x\n"
+    )
+    (tmp_path / "b.csv").write_text(HEADER + "01.01.2025,10:00,1h,Unknown Road 9,B,x\n")
+    (tmp_path / "broken.csv").write_text(HEADER + "01.01.2025,10:00,1h\n")
+
+
+def _nominatim(request):
+    if "Unknown" in request.url.params["q"]:
+        return httpx.Response(200, json=[])
+    if "Fail" in request.url.params["q"]:
+        return httpx.Response(503)
+    return httpx.Response(200, json=[{"lat": "52.5", "lon": "13.4"}])
+
+
+def test_collect_addresses(tmp_path):
+    _write_calendars(tmp_path)
+    addresses, errors = collect_addresses(tmp_path)
+    assert addresses == {"Hauptstraße 1, 12345 Berlin, Germany", "Unknown Road 9, Germany"}
+    assert list(errors) == ["broken.csv"]
+
+
+def test_warm_geocode_store(monkeypatch):
+    monkeypatch.setattr(settings, "geocode_rate_limit", 1000.0)
+    monkeypatch.setattr(settings, "geocode_retries", 0)
+    get_geocode_store().put("Known", (1.0, 2.0))
+    progress = []
+
+    report = asyncio.run(
+        warm_geocode_store(
+            ["Known", "Somewhere", "Unknown", "Fail"],
+            AsyncGeocoder(transport=httpx.MockTransport(_nominatim)),
+            lambda done, total, address, outcome: progress.append((done, total, address, outcome)),
+        )
+    )
+
+    assert (report.known, report.found, report.not_found) == (1, 1, 1)
+    assert list(report.failed) == ["Fail"]
+    assert len(progress) == 3 and progress[-1][:2] == (3, 3)
+    store = get_geocode_store()
+    assert store.get("Somewhere") == (True, (52.5, 13.4))
+    assert store.get("Unknown") == (True, None)
+    assert store.get("Fail") == (False, None)
+
+
+def test_geocode_dry_run(tmp_path, capsys):
+    _write_calendars(tmp_path)
+    get_geocode_store().put("Unknown Road 9, Germany", None)
+
+    assert main(["geocode", "--data-dir", str(tmp_path), "--dry-run"]) == 1
+    captured = capsys.readouterr()
+    assert captured.out == "Hauptstraße 1, 12345 Berlin, Germany\n"
+    assert "Skipping broken.csv" in captured.err
+    assert "2 addresses, 1 not yet geocoded." in captured.err
+
+
+def test_geocode_uses_store_in_data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "data_dir", settings.data_dir)
+    monkeypatch.setattr(settings, "cache_dir", None)
+    data_dir = tmp_path / "cals"
+    data_dir.mkdir()
+    _write_calendars(data_dir)
+
+    main(["geocode", "--data-dir", str(data_dir), "--dry-run"])
+
+    assert get_geocode_store().path == data_dir / ".cache" / "geocode.sqlite3"
+    assert (data_dir / ".cache" / "geocode.sqlite3").exists()
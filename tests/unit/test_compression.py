@@ -0,0 +1,100 @@
+import gzip
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.main import app
+from src.settings import settings
+from src.utils.cache import RenderCache, RenderedCalendar
+from src.utils.compression import COMPRESSORS, compress_variants, negotiate
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def serve_test_data(monkeypatch):
+    monkeypatch.setattr(settings, "data_dir", DATA_DIR)
+    monkeypatch.setattr(settings, "geocode_enabled", False)
+    monkeypatch.setattr(settings, "snapshot_enabled", False)
+    monkeypatch.setattr(settings, "compression_min_bytes", 0)
+
+
+def test_negotiate_prefers_server_order_on_ties():
+    assert negotiate("gzip, br", ["br", "gzip"]) == "br"
+    assert negotiate("gzip", ["br", "gzip"]) == "gzip"
+
+
+def test_negotiate_honours_qvalues():
+    assert negotiate("br;q=0.5, gzip", ["br", "gzip"]) == "gzip"
+    assert negotiate("br;q=0, *", ["br", "gzip"]) == "gzip"
+    assert negotiate("gzip;q=0", ["gzip"]) is None
+    assert negotiate("gzip;q=0.5, identity", ["gzip"]) is None
+
+
+def test_negotiate_without_header_or_variants():
+    assert negotiate(None, ["gzip"]) is None
+    assert negotiate("", ["gzip"]) is None
+    assert negotiate("gzip", []) is None
+    assert negotiate("deflate", ["gzip"]) is None
+
+
+def test_compress_variants_round_trip(monkeypatch):
+    monkeypatch.setattr(settings, "compression_encodings", ["gzip"])
+    monkeypatch.setattr(settings, "compression_min_bytes", 16)
+    content = b"BEGIN:VEVENT\r\nEND:VEVENT\r\n" * 100
+    variants = compress_variants(content)
+    assert list(variants) == ["gzip"]
+    assert gzip.decompress(variants["gzip"]) == content
+    assert compress_variants(content) == variants
+
+
+def test_compress_variants_skips_small_and_unknown(monkeypatch):
+    monkeypatch.setattr(settings, "compression_encodings", ["gzip", "unknown"])
+    monkeypatch.setattr(settings, "compression_min_bytes", 1024)
+    assert compress_variants(b"tiny") == {}
+    monkeypatch.setattr(settings, "compression_min_bytes", 0)
+    assert "unknown" not in compress_variants(b"x" * 2048)
+
+
+def test_cache_accounts_for_variants():
+    cache = RenderCache(max_bytes=1024)
+    rendered = RenderedCalendar.from_content(b"payload", 0.0, encodings={"gzip": b"zip"})
+    cache.put(("a", 1, 1, ()), rendered)
+    assert cache.size_bytes == len(b"payload") + len(b"zip")
+
+
+def test_etag_differs_per_encoding():
+    rendered = RenderedCalendar.from_content(b"payload", 0.0)
+    assert rendered.etag_for(None) == rendered.etag
+    assert rendered.etag_for("gzip") != rendered.etag
+    assert rendered.etag_for("gzip").startswith('"') and rendered.etag_for("gzip").endswith('"')
+
+
+def test_calendar_served_compressed(monkeypatch, serve_test_data):
+    monkeypatch.setattr(settings, "compression_encodings", ["gzip"])
+    plain = client.get("/birthdays.ics", headers={"Accept-Encoding": "identity"})
+    compressed = client.get("/birthdays.ics", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in plain.headers
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["vary"] == "Accept-Encoding"
+    assert plain.headers["vary"] == "Accept-Encoding"
+    assert compressed.content == plain.content
+    assert compressed.headers["etag"] != plain.headers["etag"]
+
+    revalidated = client.get(
+        "/birthdays.ics", headers={"Accept-Encoding": "gzip", "If-None-Match": compressed.headers["etag"]}
+    )
+    assert revalidated.status_code == 304
+    stale = client.get("/birthdays.ics", headers={"Accept-Encoding": "gzip", "If-None-Match": plain.headers["etag"]})
+    assert stale.status_code == 200
+
+
+@pytest.mark.skipif("br" not in COMPRESSORS, reason="brotli is not installed")
+def test_brotli_variant_when_available(monkeypatch, serve_test_data):
+    monkeypatch.setattr(settings, "compression_encodings", ["br", "gzip"])
+    response = client.get("/birthdays.ics", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["content-encoding"] == "br"
@@ -0,0 +1,99 @@
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.main import app
+from src.settings import settings
+
+HEADER = "date,time,duration,location,name,description\n"
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def data_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "data_dir", tmp_path)
+    rows = [f"{day:02d}.01.2025,10:00,1h,,Event {day},x\n" for day in range(1, 8)]
+    # Two events starting at the same time are ordered by UID.
+    rows.append("03.01.2025,10:00,30min,,Also 3,y\n")
+    (tmp_path / "cal.csv").write_text(HEADER + "".join(rows))
+    return tmp_path
+
+
+def _pages(limit: int) -> list[list[dict]]:
+    pages, cursor = [], None
+    while True:
+        response = client.get("/cal/events", params={"limit": limit, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        body = response.json()
+        pages.append(body["events"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def test_pagination_covers_every_event_once(data_dir):
+    pages = _pages(3)
+    events = [event for page in pages for event in page]
+
+    assert [len(page) for page in pages] == [3, 3, 2]
+    assert len({event["uid"] for event in events}) == 8
+    starts = [event["start"] for event in events]
+    assert starts == sorted(starts)
+    assert events[0] == {
+        "uid": events[0]["uid"],
+        "name": "Event 1",
+        "description": "x",
+        "start": "2025-01-01T10:00:00+01:00",
+        "end": "2025-01-01T11:00:00+01:00",
+        "all_day": False,
+        "timezone": "Europe/Berlin",
+        "location_name": "Event 1",
+        "address": "",
+        "geo": None,
+    }
+
+
+def test_identical_rows_are_paged_without_loss(data_dir):
+    # Identical rows share a UID; the second one starts the next page.
+    (data_dir / "cal.csv").write_text(HEADER + "01.01.2025,10:00,1h,,Same,x\n" * 2 + "02.01.2025,10:00,1h,,Next,x\n")
+    pages = _pages(1)
+    assert [[event["name"] for event in page] for page in pages] == [["Same"], ["Same"], ["Next"]]
+    assert pages[0][0]["uid"] == pages[1][0]["uid"]
+
+
+def test_cursor_stays_valid_after_csv_change(data_dir):
+    first = client.get("/cal/events?limit=4").json()
+    csv_path = data_dir / "cal.csv"
+    with csv_path.open("a") as f:
+        f.write("01.01.2025,08:00,1h,,Earlier,x\n")
+    os.utime(csv_path, (0, 1e9))
+
+    rest = client.get("/cal/events", params={"limit": 100, "cursor": first["next_cursor"]}).json()
+    names = [e["name"] for e in first["events"]] + [e["name"] for e in rest["events"]]
+    assert sorted(names) == sorted({f"Event {day}" for day in range(1, 8)} | {"Also 3"})
+    assert rest["next_cursor"] is None
+
+
+def test_fields_and_window(data_dir):
+    response = client.get("/cal/events", params={"fields": "name,start", "from": "2025-01-05", "to": "2025-01-07"})
+    assert response.json()["events"] == [
+        {"name": "Event 5", "start": "2025-01-05T10:00:00+01:00"},
+        {"name": "Event 6", "start": "2025-01-06T10:00:00+01:00"},
+    ]
+    assert client.get("/cal/events", headers={"If-None-Match": response.headers["etag"]}).status_code == 200
+    again = client.get(response.url, headers={"If-None-Match": response.headers["etag"]})
+    assert again.status_code == 304
+
+
+@pytest.mark.parametrize(
+    "params",
+    [{"fields": "name,bogus"}, {"cursor": "not-a-cursor"}, {"from": "yesterday"}],
+)
+def test_invalid_parameters(data_dir, params):
+    assert client.get("/cal/events", params=params).status_code == 400
+
+
+def test_unknown_calendar(data_dir):
+    assert client.get("/missing/events").status_code == 404
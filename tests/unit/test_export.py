@@ -0,0 +1,80 @@
+import gzip
+import hashlib
+import json
+
+import pytest
+
+from src.cli import main
+from src.settings import settings
+from src.utils.export import export_calendars
+from src.utils.geostore import get_geocode_store
+
+HEADER = "date,time,duration,location,name,description\n"
+
+
+@pytest.fixture
+def data_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "compression_min_bytes", 0)
+    monkeypatch.setattr(settings, "snapshot_enabled", False)
+    directory = tmp_path / "data"
+    directory.mkdir()
+    (directory / "a.csv").write_text(HEADER + "01.01.2025,10:00,1h,Hauptstraße 1 12345 Berlin,A,x\n")
+    (directory / "b.csv").write_text(HEADER + "02.01.2025,10:00,1h,,B,x\n")
+    return directory
+
+
+def test_export_writes_files_and_manifest(data_dir, tmp_path):
+    out = tmp_path / "out"
+    report = export_calendars(data_dir, out, workers=1)
+    assert report.exported == ["a", "b"]
+
+    manifest = json.loads((out / "manifest.json").read_text())
+    entry = manifest["calendars"]["a"]
+    content = (out / "a.ics").read_bytes()
+    assert content.startswith(b"BEGIN:VCALENDAR")
+    assert entry["sha256"] == hashlib.sha256(content).hexdigest()
+    assert entry["csv_sha256"] == hashlib.sha256((data_dir / "a.csv").read_bytes()).hexdigest()
+    assert entry["encodings"]["gzip"]["file"] == "a.ics.gz"
+    assert gzip.decompress((out / "a.ics.gz").read_bytes()) == content
+    assert not list(out.glob("*.tmp"))
+
+
+def test_export_skips_unchanged_and_removes_deleted(data_dir, tmp_path):
+    out = tmp_path / "out"
+    export_calendars(data_dir, out, workers=1)
+
+    (data_dir / "b.csv").write_text(HEADER + "03.01.2025,10:00,1h,,B2,x\n")
+    (data_dir / "c.csv").write_text(HEADER + "04.01.2025,10:00,1h,,C,x\n")
+    report = export_calendars(data_dir, out, workers=1)
+    assert report.skipped == ["a"]
+    assert report.exported == ["b", "c"]
+    assert b"SUMMARY:B2" in (out / "b.ics").read_bytes()
+
+    (data_dir / "c.csv").unlink()
+    report = export_calendars(data_dir, out, workers=1)
+    assert report.removed == ["c"]
+    assert not (out / "c.ics").exists() and not (out / "c.ics.gz").exists()
+    assert sorted(json.loads((out / "manifest.json").read_text())["calendars"]) == ["a", "b"]
+
+
+def test_export_refreshes_calendars_with_new_coordinates(data_dir, tmp_path):
+    out = tmp_path / "out"
+    export_calendars(data_dir, out, workers=1)
+    get_geocode_store().put("Hauptstraße 1, 12345 Berlin, Germany", (52.5, 13.4))
+
+    report = export_calendars(data_dir, out, workers=1)
+    assert report.exported == ["a"]
+    assert b"GEO:52.5;13.4" in (out / "a.ics").read_bytes()
+
+
+def test_export_in_worker_processes(data_dir, tmp_path):
+    report = export_calendars(data_dir, tmp_path / "out", workers=2)
+    assert report.exported == ["a", "b"]
+
+
+def test_export_command_reports_failures(data_dir, tmp_path, capsys):
+    (data_dir / "broken.csv").write_text(HEADER + "01.01.2025,10:00\n")
+    out = tmp_path / "out"
+    assert main(["export", str(out), "--data-dir", str(data_dir), "--workers", "1"]) == 1
+    assert "2 exported, 0 unchanged, 0 removed, 1 failed." in capsys.readouterr().err
+    assert not (out / "broken.ics").exists()
@@ -0,0 +1,72 @@
+import re
+from unittest.mock import patch
+
+import pytest
+
+from src.settings import settings
+from src.utils import ical
+from src.utils.fragments import Fragment, FragmentCache, fragment_cache
+from src.utils.ical import csv_to_ical
+
+HEADER = "date,time,duration,location,name,description\n"
+ROWS = [f"{day:02d}.01.2025,10:00,1h,Hauptstraße {day} 12345 Berlin,Event {day},Desc\n" for day in range(1, 11)]
+DTSTAMP = re.compile(rb"DTSTAMP:\d{8}T\d{6}Z\r\n")
+
+
+def test_fragment_split_and_join():
+    event = b"BEGIN:VEVENT\r\nSUMMARY:x\r\nDTSTAMP:20250101T000000Z\r\nUID:1\r\nEND:VEVENT\r\n"
+    fragment = Fragment.split(event)
+    assert b"DTSTAMP" not in fragment.head + fragment.tail
+    assert fragment.join(b"DTSTAMP:20250101T000000Z\r\n") == event
+
+
+def test_fragment_cache_evicts_least_recently_used():
+    fragment = Fragment(b"x" * 100, b"")
+    cache = FragmentCache(max_bytes=2 * fragment.size)
+    cache.put(b"a", fragment)
+    cache.put(b"b", fragment)
+    assert cache.get(b"a") is fragment
+    cache.put(b"c", fragment)
+    assert cache.get(b"b") is None
+    assert cache.get(b"a") is fragment and cache.get(b"c") is fragment
+    assert cache.size_bytes == 2 * fragment.size
+
+
+@pytest.mark.parametrize("serializer", ["icalendar", "fast"])
+def test_rebuild_only_serializes_changed_rows(monkeypatch, tmp_path, serializer):
+    monkeypatch.setattr(settings, "ical_serializer", serializer)
+    csv_path = tmp_path / "cal.csv"
+    csv_path.write_text(HEADER + "".join(ROWS))
+    first = csv_to_ical(csv_path, "cal")
+
+    edited = ROWS.copy()
+    edited[3] = edited[3].replace("Event 4", "Edited")
+    csv_path.write_text(HEADER + "".join(edited))
+    with patch.object(ical, "_serialize_event", wraps=ical._serialize_event) as serialize:
+        second = csv_to_ical(csv_path, "cal")
+    assert serialize.call_count == 1
+    assert serialize.call_args.args[0].name == "Edited"
+
+    monkeypatch.setattr(settings, "fragment_cache_max_bytes", 0)
+    uncached = csv_to_ical(csv_path, "cal")
+    assert DTSTAMP.sub(b"", second) == DTSTAMP.sub(b"", uncached)
+    assert DTSTAMP.sub(b"", second) != DTSTAMP.sub(b"", first)
+
+
+def test_new_coordinates_replace_cached_fragment(tmp_path):
+    csv_path = tmp_path / "cal.csv"
+    csv_path.write_text(HEADER + ROWS[0])
+    with patch("src.utils.ical.lookup_coordinates", return_value=None):
+        assert b"GEO:" not in csv_to_ical(csv_path, "cal")
+    with patch("src.utils.ical.lookup_coordinates", return_value=(52.5, 13.4)):
+        assert b"GEO:52.5;13.4" in csv_to_ical(csv_path, "cal")
+    assert len(fragment_cache) == 2
+
+
+def test_fragments_are_keyed_on_calendar_name(tmp_path):
+    csv_path = tmp_path / "cal.csv"
+    csv_path.write_text(HEADER + ROWS[0])
+    uid = re.compile(rb"UID:(\S+)")
+    a = uid.search(csv_to_ical(csv_path, "a")).group(1)
+    b = uid.search(csv_to_ical(csv_path, "b")).group(1)
+    assert a != b
@@ -0,0 +1,138 @@
+import asyncio
+
+import httpx
+
+from src.settings import settings
+from src.utils.geocoder import AsyncGeocoder, GeocodingError, NominatimProvider
+from src.utils.geoqueue import GeocodeQueue
+from src.utils.geostore import get_geocode_store
+
+ADDRESS = "Hauptstraße 1, 12345 Berlin, Germany"
+
+
+def _nominatim(responses):
+    """Stand-in Nominatim server answering with *responses* in turn."""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        status, body = responses[min(len(requests), len(responses)) - 1]
+        return httpx.Response(status, json=body)
+
+    return httpx.MockTransport(handler), requests
+
+
+def _resolve(geocoder, address=ADDRESS):
+    async def scenario():
+        await geocoder.start()
+        try:
+            return await geocoder.resolve(address)
+        finally:
+            await geocoder.aclose()
+
+    return asyncio.run(scenario())
+
+
+def test_resolve_queries_provider_and_persists_result(monkeypatch):
+    monkeypatch.setattr(settings, "geocode_url", "http://geocoder.test/")
+    transport, requests = _nominatim([(200, [{"lat": "52.5", "lon": "13.4"}])])
+
+    assert _resolve(AsyncGeocoder(transport=transport)) == (52.5, 13.4)
+    assert get_geocode_store().get(ADDRESS) == (True, (52.5, 13.4))
+    assert str(requests[0].url).startswith("http://geocoder.test/search?")
+    assert requests[0].url.params["q"] == ADDRESS
+    assert requests[0].headers["user-agent"] == settings.user_agent
+
+    # Answered from the store on the next lookup.
+    assert _resolve(AsyncGeocoder(transport=transport)) == (52.5, 13.4)
+    assert len(requests) == 1
+
+
+def test_resolve_persists_not_found():
+    transport, _ = _nominatim([(200, [])])
+    assert _resolve(AsyncGeocoder(transport=transport)) is None
+    assert get_geocode_store().get(ADDRESS) == (True, None)
+
+
+def test_resolve_retries_transient_errors(monkeypatch):
+    monkeypatch.setattr(settings, "geocode_backoff", 0.0)
+    transport, requests = _nominatim([(503, {}), (429, {}), (200, [{"lat": "1", "lon": "2"}])])
+
+    assert _resolve(AsyncGeocoder(transport=transport)) == (1.0, 2.0)
+    assert len(requests) == 3
+
+
+def test_resolve_gives_up_without_persisting(monkeypatch):
+    monkeypatch.setattr(settings, "geocode_backoff", 0.0)
+    monkeypatch.setattr(settings, "geocode_retries", 1)
+    transport, requests = _nominatim([(500, {})])
+
+    assert _resolve(AsyncGeocoder(transport=transport)) is None
+    assert len(requests) == 2
+    assert get_geocode_store().get(ADDRESS) == (False, None)
+
+
+def test_resolve_disabled(monkeypatch):
+    monkeypatch.setattr(settings, "geocode_enabled", False)
+    transport, requests = _nominatim([(200, [{"lat": "1", "lon": "2"}])])
+    assert _resolve(AsyncGeocoder(transport=transport)) is None
+    assert requests == []
+
+
+def test_custom_provider():
+    class FixedProvider:
+        def __init__(self):
+            self.calls = 0
+
+        async def geocode(self, client, address):
+            self.calls += 1
+            if self.calls == 1:
+                raise GeocodingError("timeout", retry_after=0)
+            return (3.0, 4.0)
+
+    provider = FixedProvider()
+    assert _resolve(AsyncGeocoder(provider=provider)) == (3.0, 4.0)
+    assert provider.calls == 2
+
+
+def test_nominatim_provider_maps_transport_errors():
+    def handler(request):
+        raise httpx.ConnectTimeout("timed out", request=request)
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            try:
+                await NominatimProvider("http://geocoder.test").geocode(client, ADDRESS)
+            except GeocodingError as e:
+                return e
+
+    assert "ConnectTimeout" in str(asyncio.run(scenario()))
+
+
+def test_queue_overlaps_slow_lookups(monkeypatch):
+    monkeypatch.setattr(settings, "geocode_rate_limit", 1000.0)
+    monkeypatch.setattr(settings, "geocode_max_connections", 4)
+    in_flight = peak = 0
+
+    async def resolve(address):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+        get_geocode_store().put(address, (1.0, 2.0))
+
+    async def scenario():
+        queue = GeocodeQueue(resolve=resolve)
+        queue.enqueue_many(["A", "B", "C", "D", "E"])
+        queue.start()
+        for _ in range(100):
+            if not queue.pending:
+                break
+            await asyncio.sleep(0.01)
+        await queue.stop()
+        return queue
+
+    queue = asyncio.run(scenario())
+    assert queue.generation == 5
+    assert 1 < peak <= 4
@@ -0,0 +1,129 @@
+import asyncio
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from src.settings import settings
+from src.utils.geocoder import geocoder
+from src.utils.geoqueue import GeocodeQueue, TokenBucket, collect_unresolved, geocode_queue, lookup_coordinates
+from src.utils.geostore import get_geocode_store
+
+CSV = "date,time,duration,location,name,description\n01.01.2025,10:00,1h,Hauptstraße 1 12345 Berlin,Event,Desc\n"
+ADDRESS = "Hauptstraße 1, 12345 Berlin, Germany"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_limits_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1.0, capacity=2, clock=clock)
+    assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() == 1.0
+    clock.now = 0.5
+    assert bucket.try_acquire() == 0.5
+    clock.now = 1.0
+    assert bucket.try_acquire() == 0.0
+
+
+def test_lookup_coordinates_returns_known_coordinates():
+    get_geocode_store().put(ADDRESS, (1.0, 2.0))
+    with collect_unresolved() as unresolved:
+        assert lookup_coordinates(ADDRESS) == (1.0, 2.0)
+    assert unresolved == set()
+
+
+def test_lookup_coordinates_collects_unknown_addresses():
+    with collect_unresolved() as unresolved:
+        assert lookup_coordinates(ADDRESS) is None
+    assert unresolved == {ADDRESS}
+
+
+def test_lookup_coordinates_disabled(monkeypatch):
+    monkeypatch.setattr(settings, "geocode_enabled", False)
+    with collect_unresolved() as unresolved:
+        assert lookup_coordinates(ADDRESS) is None
+    assert unresolved == set()
+
+
+def test_queue_deduplicates_pending_addresses():
+    queue = GeocodeQueue(resolve=lambda address: None)
+    queue.enqueue("A")
+    queue.enqueue("A")
+    queue.enqueue_many(["A", "B"])
+    assert queue.pending == {"A", "B"}
+
+
+def test_queue_worker_resolves_and_advances_generation(monkeypatch):
+    monkeypatch.setattr(settings, "geocode_rate_limit", 1000.0)
+    resolved = []
+
+    def resolve(address):
+        resolved.append(address)
+        get_geocode_store().put(address, (1.0, 2.0))
+
+    async def scenario():
+        queue = GeocodeQueue(resolve=resolve)
+        queue.enqueue("Before Start")
+        queue.start()
+        queue.enqueue("After Start")
+        queue.enqueue("After Start")
+        for _ in range(100):
+            if not queue.pending:
+                break
+            await asyncio.sleep(0.01)
+        await queue.stop()
+        return queue
+
+    queue = asyncio.run(scenario())
+    assert sorted(resolved) == ["After Start", "Before Start"]
+    assert queue.generation == 2
+    assert queue.pending == frozenset()
+
+
+def test_queue_skips_network_for_stored_addresses(monkeypatch):
+    monkeypatch.setattr(settings, "geocode_rate_limit", 1000.0)
+    get_geocode_store().put("Known", (1.0, 2.0))
+    calls = []
+
+    async def scenario():
+        queue = GeocodeQueue(resolve=calls.append)
+        queue.start()
+        queue.enqueue("Known")
+        for _ in range(100):
+            if not queue.pending:
+                break
+            await asyncio.sleep(0.01)
+        await queue.stop()
+
+    asyncio.run(scenario())
+    assert calls == []
+
+
+def test_calendar_renders_without_blocking_and_picks_up_results(monkeypatch, tmp_path):
+    from src.main import app
+
+    monkeypatch.setattr(settings, "data_dir", tmp_path)
+    (tmp_path / "cal.csv").write_text(CSV)
+    client = TestClient(app)
+
+    with patch.object(geocoder, "lookup") as lookup:
+        first = client.get("/cal.ics")
+        lookup.assert_not_called()
+    assert first.status_code == 200
+    assert "GEO:" not in first.text
+    assert ADDRESS in geocode_queue.pending
+
+    # Simulate the background worker finishing the lookup.
+    get_geocode_store().put(ADDRESS, (52.5, 13.4))
+    monkeypatch.setattr(geocode_queue, "generation", geocode_queue.generation + 1)
+
+    second = client.get("/cal.ics")
+    assert "GEO:52.5;13.4" in second.text
+    assert second.headers["etag"] != first.headers["etag"]
@@ -0,0 +1,99 @@
+import asyncio
+import sqlite3
+from unittest.mock import patch
+
+import httpx
+
+from src.settings import settings
+from src.utils.geocoder import AsyncGeocoder
+from src.utils.geoqueue import collect_unresolved, lookup_coordinates
+from src.utils.geostore import GeocodeStore, get_geocode_store
+
+
+def test_store_roundtrip(tmp_path):
+    store = GeocodeStore(tmp_path / "geo.sqlite3")
+    assert store.get("Somewhere") == (False, None)
+    store.put("Somewhere", (1.5, 2.5))
+    assert store.get("Somewhere") == (True, (1.5, 2.5))
+
+
+def test_store_negative_result(tmp_path):
+    store = GeocodeStore(tmp_path / "geo.sqlite3")
+    store.put("Nowhere", None)
+    assert store.get("Nowhere") == (True, None)
+
+
+def test_store_entries_expire(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "geocode_cache_ttl", -1)
+    store = GeocodeStore(tmp_path / "geo.sqlite3")
+    store.put("Somewhere", (1.0, 2.0))
+    assert store.get("Somewhere") == (False, None)
+    assert store.purge_expired() == 1
+
+
+def test_store_is_shared_between_instances(tmp_path):
+    path = tmp_path / "geo.sqlite3"
+    GeocodeStore(path).put("Somewhere", (1.0, 2.0))
+    assert GeocodeStore(path).get("Somewhere") == (True, (1.0, 2.0))
+
+
+def test_store_errors_degrade_to_miss(tmp_path):
+    store = GeocodeStore(tmp_path / "geo.sqlite3")
+    with patch.object(store, "_connect", side_effect=sqlite3.OperationalError("locked")):
+        store.put("Somewhere", (1.0, 2.0))
+        assert store.get("Somewhere") == (False, None)
+
+
+def test_get_geocode_store_follows_settings(monkeypatch, tmp_path):
+    assert get_geocode_store().path == settings.cache_dir / "geocode.sqlite3"
+    monkeypatch.setattr(settings, "cache_dir", None)
+    monkeypatch.setattr(settings, "data_dir", tmp_path / "calendars")
+    assert get_geocode_store().path == tmp_path / "calendars" / ".cache" / "geocode.sqlite3"
+    monkeypatch.setattr(settings, "geocode_cache_path", tmp_path / "other.sqlite3")
+    assert get_geocode_store().path == tmp_path / "other.sqlite3"
+
+
+def _resolve(address, responses):
+    """Resolve *address* with a fresh :class:`AsyncGeocoder` against a stand-in service."""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        status, body = responses[min(len(requests), len(responses)) - 1]
+        return httpx.Response(status, json=body)
+
+    async def scenario():
+        geocoder = AsyncGeocoder(transport=httpx.MockTransport(handler))
+        await geocoder.start()
+        try:
+            return await geocoder.resolve(address)
+        finally:
+            await geocoder.aclose()
+
+    return asyncio.run(scenario()), requests
+
+
+def test_geocoder_uses_persistent_store_before_network():
+    get_geocode_store().put("Known Address", (3.0, 4.0))
+    coords, requests = _resolve("Known Address", [(200, [{"lat": "1", "lon": "2"}])])
+    assert coords == (3.0, 4.0)
+    assert requests == []
+
+
+def test_geocoded_results_persist_across_processes(monkeypatch, tmp_path):
+    _resolve("Fresh Address", [(200, [{"lat": "1", "lon": "2"}])])
+
+    # Simulate a restart: a new store instance on the same database.
+    assert GeocodeStore(get_geocode_store().path).get("Fresh Address") == (True, (1.0, 2.0))
+    with collect_unresolved() as unresolved:
+        assert lookup_coordinates("Fresh Address") == (1.0, 2.0)
+    assert unresolved == set()
+
+
+def test_geocoder_caches_not_found_but_not_errors(monkeypatch):
+    monkeypatch.setattr(settings, "geocode_retries", 0)
+    _resolve("Unknown Place", [(200, [])])
+    _resolve("Flaky Place", [(503, {})])
+
+    assert get_geocode_store().get("Unknown Place") == (True, None)
+    assert get_geocode_store().get("Flaky Place") == (False, None)
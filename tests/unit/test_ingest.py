@@ -0,0 +1,90 @@
+import pytest
+from pydantic import ValidationError
+
+from src.models import CSVEntry
+from src.utils.ingest import iter_csv_entries, read_columns, validate_rows
+from src.utils.time import event_times
+
+HEADER = "date,time,duration,location,name,description,timezone\n"
+
+
+def _write(tmp_path, body: str):
+    path = tmp_path / "cal.csv"
+    path.write_text(HEADER + body, encoding="utf-8")
+    return path
+
+
+def test_read_columns_matches_per_row_conversion(tmp_path):
+    path = _write(
+        tmp_path,
+        "01.03.2025,09:00,90min,,A,x,Europe/Berlin\n"
+        "30.03.2025,02:30,1h,,B,x,Europe/Berlin\n"
+        "01.03.2025,09:00,2d,,C,x,Asia/Tokyo\n",
+    )
+    columns = read_columns(path)
+    assert [entry.name for entry in columns.entries()] == ["A", "B", "C"]
+    assert columns.all_day == [False, False, True]
+    assert columns.duration == [5400, 3600, 2 * 86400]
+    for entry, start in zip(columns.entries(), columns.start):
+        begin, _ = event_times(entry)
+        if entry.duration.endswith("d"):
+            continue
+        assert int(begin.timestamp()) == start
+
+
+def test_read_columns_reports_all_errors_with_line_numbers(tmp_path):
+    path = _write(
+        tmp_path,
+        "01.03.2025,09:00,1h,,ok,x,UTC\n"
+        "2025-03-01,09:00,1h,,bad date,x,UTC\n"
+        "01.03.2025,09:00,1h,,bad zone,x,Mars/Olympus\n"
+        "01.03.2025,09:00,xh,,bad duration,x,UTC\n",
+    )
+    with pytest.raises(ValidationError) as excinfo:
+        read_columns(path)
+    assert [error["loc"] for error in excinfo.value.errors()] == [(3, "date"), (4, "timezone"), (5, "duration")]
+    assert excinfo.value.title == "cal.csv"
+
+
+def test_schema_errors_are_reported_together(tmp_path):
+    path = _write(tmp_path, "01.03.2025,09:00\n01.03.2025\n")
+    with pytest.raises(ValidationError) as excinfo:
+        read_columns(path)
+    lines = {error["loc"][0] for error in excinfo.value.errors()}
+    assert lines == {2, 3}
+
+
+def test_iter_csv_entries_batches_keep_line_numbers(tmp_path):
+    rows = "".join(f"01.03.2025,09:00,1h,,event {i},x,UTC\n" for i in range(5))
+    path = _write(tmp_path, rows + "01.03.2025,09:00\n")
+    entries = iter_csv_entries(path, batch_size=2)
+    assert [next(entries).name for _ in range(4)] == [f"event {i}" for i in range(4)]
+    with pytest.raises(ValidationError) as excinfo:
+        list(entries)
+    assert {error["loc"][0] for error in excinfo.value.errors()} == {7}
+
+
+def test_validate_rows_returns_entries():
+    (entry,) = validate_rows(
+        [{"date": "01.03.2025", "time": "09:00", "duration": "1h", "location": "", "name": "n", "description": "d"}],
+        "inline",
+    )
+    assert entry.name == "n"
+
+
+def test_validate_rows_matches_per_row_models():
+    rows = [
+        {"date": "01.03.2025", "time": "09:00", "duration": "1h", "location": "", "name": "a", "description": "d"},
+        {"date": "02.03.2025", "time": "10:00", "duration": "2d", "location": "x", "name": "b", "description": "",
+         "place": "France", "timezone": "UTC"},
+    ]  # fmt: skip
+    entries = validate_rows(rows, "inline")
+    assert entries == [CSVEntry(**row) for row in rows]
+
+
+def test_field_names_are_accepted_as_headers(tmp_path):
+    path = tmp_path / "cal.csv"
+    path.write_text("date_str,time_str,duration,location,name,description\n01.03.2025,09:00,1h,,n,d\n")
+    (entry,) = iter_csv_entries(path)
+    assert (entry.date_str, entry.time_str) == ("01.03.2025", "09:00")
+    assert read_columns(path).fields["date_str"] == ["01.03.2025"]
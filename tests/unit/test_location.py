@@ -1,12 +1,15 @@
 import re
 from datetime import timedelta
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 
 import pytest
 from icalendar import Calendar
 
+from src.utils.geoqueue import collect_unresolved, geocode_queue, lookup_coordinates
+from src.utils.geostore import get_geocode_store
 from src.utils.ical import csv_to_ical
-from src.utils.location import format_address, get_coordinates
+from src.utils.location import format_address
+from src.utils.metrics import GEOCODE_LOOKUPS
 from src.utils.time import parse_duration
 
 
@@ -18,7 +21,7 @@ def test_zip_comma_insertion():
     assert location == "Musterstraße 123, 12345 Musterstadt"
 
 
-@patch("src.utils.ical.get_coordinates")
+@patch("src.utils.ical.lookup_coordinates")
 def test_location_formatting_in_ical(mock_coords, tmp_path):
     mock_coords.return_value = (52.520, 13.405)
 
@@ -49,7 +52,7 @@ def test_location_formatting_in_ical(mock_coords, tmp_path):
     assert apple_loc.params.get("X-APPLE-RADIUS") == "70"
 
 
-@patch("src.utils.ical.get_coordinates")
+@patch("src.utils.ical.lookup_coordinates")
 def test_location_formatting_fallback_to_name(mock_coords, tmp_path):
     mock_coords.return_value = (52.520, 13.405)
 
@@ -84,40 +87,26 @@ def test_empty_location_handling(tmp_path):
     assert event.get("X-APPLE-STRUCTURED-LOCATION") is None
 
 
-def test_geocode_cache_behavior():
-    with patch("src.utils.location.Nominatim") as mock_nom:
-        instance = mock_nom.return_value
-        instance.geocode.return_value = MagicMock(latitude=1.0, longitude=2.0)
+def test_known_coordinates_are_read_from_store_without_queueing():
+    get_geocode_store().put("Target Address", (1.0, 2.0))
 
-        # Reset lru_cache for test
-        get_coordinates.cache_clear()
+    with collect_unresolved() as unresolved:
+        assert lookup_coordinates("Target Address") == (1.0, 2.0)
+        assert lookup_coordinates("Target Address") == (1.0, 2.0)
+    assert unresolved == set()
 
-        coords1 = get_coordinates("Target Address")
-        coords2 = get_coordinates("Target Address")
 
-        assert coords1 == (1.0, 2.0)
-        assert coords2 == (1.0, 2.0)
-        assert instance.geocode.call_count == 1
+def test_lookup_counts_store_hits_and_misses():
+    get_geocode_store().put("Address A", (1.0, 2.0))
+    hits, misses = GEOCODE_LOOKUPS.value(result="hit"), GEOCODE_LOOKUPS.value(result="miss")
 
+    with collect_unresolved():
+        lookup_coordinates("Address A")
+        lookup_coordinates("Address A")
+        lookup_coordinates("Address B")
 
-def test_lru_cache_efficiency():
-    with patch("src.utils.location.Nominatim") as mock_nom:
-        instance = mock_nom.return_value
-        instance.geocode.return_value = MagicMock(latitude=1.0, longitude=2.0)
-
-        get_coordinates.cache_clear()
-
-        # 1st call: Miss
-        get_coordinates("Address A")
-        # 2nd call: Hit
-        get_coordinates("Address A")
-        # 3rd call: Miss
-        get_coordinates("Address B")
-
-        info = get_coordinates.cache_info()
-        assert info.hits == 1
-        assert info.misses == 2
-        assert info.currsize == 2
+    assert GEOCODE_LOOKUPS.value(result="hit") == hits + 2
+    assert GEOCODE_LOOKUPS.value(result="miss") == misses + 1
 
 
 # --- format_address tests ---
@@ -155,36 +144,30 @@ def test_format_address_no_zip_code():
     assert result == "Bahnhofstraße 1 Berlin, Germany"
 
 
-# --- get_coordinates tests ---
+# --- lookup_coordinates tests ---
 
 
-def test_get_coordinates_disabled(monkeypatch):
+def test_lookup_coordinates_disabled(monkeypatch):
     from src.settings import settings
 
     monkeypatch.setattr(settings, "geocode_enabled", False)
-    get_coordinates.cache_clear()
-    result = get_coordinates("Anywhere")
-    assert result is None
-
-
-def test_get_coordinates_geocoder_returns_none():
-    with patch("src.utils.location.Nominatim") as mock_nom:
-        instance = mock_nom.return_value
-        instance.geocode.return_value = None
+    with collect_unresolved() as unresolved:
+        assert lookup_coordinates("Anywhere") is None
+    assert unresolved == set()
 
-        get_coordinates.cache_clear()
-        result = get_coordinates("Unknown Place")
-        assert result is None
 
+def test_lookup_coordinates_known_not_found():
+    get_geocode_store().put("Unknown Place", None)
+    with collect_unresolved() as unresolved:
+        assert lookup_coordinates("Unknown Place") is None
+    assert unresolved == set()
 
-def test_get_coordinates_geocoder_raises_exception():
-    with patch("src.utils.location.Nominatim") as mock_nom:
-        instance = mock_nom.return_value
-        instance.geocode.side_effect = Exception("network error")
 
-        get_coordinates.cache_clear()
-        result = get_coordinates("Broken Address")
-        assert result is None
+def test_lookup_coordinates_enqueues_misses(monkeypatch):
+    enqueued = []
+    monkeypatch.setattr(geocode_queue, "enqueue", enqueued.append)
+    assert lookup_coordinates("Broken Address") is None
+    assert enqueued == ["Broken Address"]
 
 
 # --- parse_duration tests ---
@@ -229,7 +212,7 @@ def test_parse_duration_large_value():
 # --- csv_to_ical edge cases ---
 
 
-@patch("src.utils.ical.get_coordinates")
+@patch("src.utils.ical.lookup_coordinates")
 def test_uid_uniqueness_across_events(mock_coords, tmp_path):
     mock_coords.return_value = None
 
@@ -248,7 +231,7 @@ def test_uid_uniqueness_across_events(mock_coords, tmp_path):
     assert uids[0] != uids[1]
 
 
-@patch("src.utils.ical.get_coordinates")
+@patch("src.utils.ical.lookup_coordinates")
 def test_uid_deterministic_for_same_event(mock_coords, tmp_path):
     mock_coords.return_value = None
 
@@ -268,9 +251,9 @@ def test_uid_deterministic_for_same_event(mock_coords, tmp_path):
     assert uid1 == uid2
 
 
-@patch("src.utils.ical.get_coordinates")
+@patch("src.utils.ical.lookup_coordinates")
 def test_geocoding_disabled_no_geo_field(mock_coords, tmp_path):
-    """When get_coordinates returns None (e.g. geocoding disabled), GEO and
+    """When lookup_coordinates returns None (e.g. geocoding disabled), GEO and
     X-APPLE-STRUCTURED-LOCATION fields must not appear on the event."""
     mock_coords.return_value = None
 
@@ -287,7 +270,7 @@ def test_geocoding_disabled_no_geo_field(mock_coords, tmp_path):
     assert event.get("X-APPLE-STRUCTURED-LOCATION") is None
 
 
-@patch("src.utils.ical.get_coordinates")
+@patch("src.utils.ical.lookup_coordinates")
 def test_timed_event_has_datetime_dtstart(mock_coords, tmp_path):
     from datetime import datetime
 
@@ -307,7 +290,7 @@ def test_timed_event_has_datetime_dtstart(mock_coords, tmp_path):
     assert isinstance(dtstart, datetime)
 
 
-@patch("src.utils.ical.get_coordinates")
+@patch("src.utils.ical.lookup_coordinates")
 def test_allday_event_has_date_dtstart(mock_coords, tmp_path):
     from datetime import date, datetime
 
@@ -325,7 +308,7 @@ def test_allday_event_has_date_dtstart(mock_coords, tmp_path):
     assert not isinstance(dtstart, datetime)
 
 
-@patch("src.utils.ical.get_coordinates")
+@patch("src.utils.ical.lookup_coordinates")
 def test_custom_timezone_respected(mock_coords, tmp_path):
     mock_coords.return_value = None
 
@@ -343,7 +326,7 @@ def test_custom_timezone_respected(mock_coords, tmp_path):
     assert "Asia/Tokyo" in str(dtstart.tzinfo)
 
 
-@patch("src.utils.ical.get_coordinates")
+@patch("src.utils.ical.lookup_coordinates")
 def test_event_summary_and_description(mock_coords, tmp_path):
     mock_coords.return_value = None
 
@@ -361,7 +344,7 @@ def test_event_summary_and_description(mock_coords, tmp_path):
     assert str(event.get("DESCRIPTION")) == "This is the description"
 
 
-@patch("src.utils.ical.get_coordinates")
+@patch("src.utils.ical.lookup_coordinates")
 def test_empty_csv_produces_no_events(mock_coords, tmp_path):
     mock_coords.return_value = None
 
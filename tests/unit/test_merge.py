@@ -0,0 +1,121 @@
+from fastapi.testclient import TestClient
+from icalendar import Calendar
+
+from src.main import app
+from src.settings import settings
+from src.utils.cache import merged_cache, render_cache
+from src.utils.ical import csv_to_ical, iter_ical
+from src.utils.merge import iter_merged, merge_calendars
+
+HEADER = "date,time,duration,location,name,description,timezone\n"
+
+client = TestClient(app)
+
+
+def _write(tmp_path, name, rows):
+    path = tmp_path / f"{name}.csv"
+    path.write_text(HEADER + "".join(rows))
+    return path
+
+
+def test_merge_deduplicates_uids_and_timezones(tmp_path):
+    a = _write(
+        tmp_path,
+        "a",
+        ["01.01.2020,10:00,1h,,A1,x,Europe/Berlin\n", "01.06.2020,10:00,1h,,A2,x,America/New_York\n"],
+    )
+    b = _write(tmp_path, "b", ["01.01.2026,10:00,1h,,B1,x,Europe/Berlin\n"])
+    content_a, content_b = csv_to_ical(a, "a"), csv_to_ical(b, "b")
+
+    merged = merge_calendars([content_a, content_b, content_a], "both")
+    cal = Calendar.from_ical(merged)
+
+    assert cal["X-WR-CALNAME"] == "both"
+    assert sorted(str(e["SUMMARY"]) for e in cal.walk("VEVENT")) == ["A1", "A2", "B1"]
+    timezones = {str(tz["TZID"]): tz for tz in cal.walk("VTIMEZONE")}
+    assert sorted(timezones) == ["America/New_York", "Europe/Berlin"]
+    berlin_years = {sub["DTSTART"].dt.year for sub in timezones["Europe/Berlin"].subcomponents}
+    assert {2020, 2026} <= berlin_years
+    assert merged.endswith(b"END:VCALENDAR\r\n")
+
+
+def test_merged_endpoint(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "data_dir", tmp_path)
+    _write(tmp_path, "team-a", ["01.01.2025,10:00,1h,,A,x,Europe/Berlin\n"])
+    _write(tmp_path, "team-b", ["02.01.2025,10:00,1h,,B,x,Europe/Berlin\n"])
+    _write(tmp_path, "other", ["03.01.2025,10:00,1h,,O,x,Europe/Berlin\n"])
+
+    response = client.get("/calendars/merged.ics", params={"calendars": "other", "glob": "team-*"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/calendar")
+    cal = Calendar.from_ical(response.content)
+    assert [str(e["SUMMARY"]) for e in cal.walk("VEVENT")] == ["O", "A", "B"]
+
+    cached = client.get(
+        "/calendars/merged.ics",
+        params={"calendars": "other", "glob": "team-*"},
+        headers={"If-None-Match": response.headers["etag"]},
+    )
+    assert cached.status_code == 304
+
+    _write(tmp_path, "team-b", ["02.01.2025,10:00,1h,,B2,x,Europe/Berlin\n"])
+    changed = client.get("/calendars/merged.ics", params={"calendars": "other", "glob": "team-*"})
+    assert changed.headers["etag"] != response.headers["etag"]
+    assert b"SUMMARY:B2" in changed.content
+
+
+def test_merged_endpoint_errors(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "data_dir", tmp_path)
+    _write(tmp_path, "a", ["01.01.2025,10:00,1h,,A,x,Europe/Berlin\n"])
+
+    assert client.get("/calendars/merged.ics").status_code == 400
+    assert client.get("/calendars/merged.ics", params={"glob": "nothing-*"}).status_code == 400
+    assert client.get("/calendars/merged.ics", params={"calendars": "a,missing"}).status_code == 404
+    assert client.get("/calendars/merged.ics", params={"calendars": "a,../a"}).status_code == 400
+
+    monkeypatch.setattr(settings, "merge_max_calendars", 1)
+    assert client.get("/calendars/merged.ics", params={"calendars": "a,b"}).status_code == 400
+
+
+def test_iter_merged_matches_merge_calendars(tmp_path):
+    a = _write(tmp_path, "a", ["01.01.2020,10:00,1h,,A1,x,Europe/Berlin\n", "02.01.2020,10:00,1h,,A2,x,UTC\n"])
+    b = _write(tmp_path, "b", ["01.01.2026,10:00,1h,,B1,x,Europe/Berlin\n"])
+    whole = merge_calendars([csv_to_ical(a, "a"), csv_to_ical(b, "b")], "both")
+    streamed = b"".join(iter_merged([iter_ical(a, "a"), [csv_to_ical(b, "b")]], "both"))
+    assert streamed == whole
+
+
+def test_merged_key_is_the_member_set(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "data_dir", tmp_path)
+    _write(tmp_path, "a", ["01.01.2025,10:00,1h,,A,x,Europe/Berlin\n"])
+    _write(tmp_path, "b", ["02.01.2025,10:00,1h,,B,x,Europe/Berlin\n"])
+
+    responses = [
+        client.get("/calendars/merged.ics", params={"calendars": calendars}, headers={"Accept-Encoding": "identity"})
+        for calendars in ("b,a", "a,b", "a,b,a", "b,a,b,a")
+    ]
+    assert len({response.headers["etag"] for response in responses}) == 1
+    assert [str(e["SUMMARY"]) for e in Calendar.from_ical(responses[0].content).walk("VEVENT")] == ["A", "B"]
+    # Merged feeds live in their own cache, next to the member calendars.
+    assert len(merged_cache) == 1
+    assert len(render_cache) == 2
+
+
+def test_merged_feed_with_large_member_is_streamed(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "data_dir", tmp_path)
+    small = _write(tmp_path, "small", ["01.01.2025,10:00,1h,,S,x,Europe/Berlin\n"])
+    _write(tmp_path, "large", [f"{day:02d}.02.2025,10:00,1h,,L{day},x,UTC\n" for day in range(1, 21)])
+    monkeypatch.setattr(settings, "stream_threshold_bytes", small.stat().st_size + 1)
+
+    response = client.get("/calendars/merged.ics", params={"calendars": "small,large"})
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+    summaries = [str(e["SUMMARY"]) for e in Calendar.from_ical(response.content).walk("VEVENT")]
+    assert summaries == [f"L{day}" for day in range(1, 21)] + ["S"]
+    assert len(merged_cache) == 0
+
+    last_modified = response.headers["last-modified"]
+    cached = client.get(
+        "/calendars/merged.ics", params={"calendars": "small,large"}, headers={"If-Modified-Since": last_modified}
+    )
+    assert cached.status_code == 304
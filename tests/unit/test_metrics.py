@@ -0,0 +1,79 @@
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from src.main import app
+from src.settings import settings
+from src.utils.metrics import (
+    CACHE_REQUESTS,
+    RENDER_ROWS,
+    RENDER_SECONDS,
+    Counter,
+    Histogram,
+    Registry,
+    timer,
+)
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+client = TestClient(app)
+
+
+def test_counter_and_histogram_exposition():
+    registry = Registry()
+    counter = registry.register(Counter("things_total", "Things.", ("kind",)))
+    histogram = registry.register(Histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0)))
+    counter.inc(kind="a")
+    counter.inc(2, kind='b"c')
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(5)
+
+    text = registry.render()
+    assert "# TYPE things_total counter" in text
+    assert 'things_total{kind="a"} 1' in text
+    assert 'things_total{kind="b\\"c"} 2' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "latency_seconds_sum 5.55" in text
+    assert "latency_seconds_count 3" in text
+
+
+def test_disabled_metrics_record_nothing(monkeypatch):
+    monkeypatch.setattr(settings, "metrics_enabled", False)
+    counter = Counter("c_total", "C.")
+    histogram = Histogram("h_seconds", "H.")
+    counter.inc()
+    histogram.observe(1.0)
+    with timer(histogram):
+        pass
+    assert counter.value() == 0
+    assert histogram.count() == 0
+
+
+def test_metrics_endpoint_reports_renders(monkeypatch):
+    monkeypatch.setattr(settings, "data_dir", DATA_DIR)
+    monkeypatch.setattr(settings, "geocode_enabled", False)
+    renders = RENDER_SECONDS.count(calendar="birthdays")
+    rows = RENDER_ROWS.value(calendar="birthdays")
+    hits = CACHE_REQUESTS.value(result="hit")
+
+    client.get("/birthdays.ics")
+    client.get("/birthdays.ics")
+
+    assert RENDER_SECONDS.count(calendar="birthdays") == renders + 1
+    assert RENDER_ROWS.value(calendar="birthdays") > rows
+    assert CACHE_REQUESTS.value(result="hit") == hits + 1
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'ical_render_seconds_count{calendar="birthdays"}' in response.text
+    assert 'ical_render_stage_seconds_count{stage="read"}' in response.text
+    assert "ical_renders_in_flight 0" in response.text
+
+
+def test_metrics_endpoint_disabled(monkeypatch):
+    monkeypatch.setattr(settings, "metrics_enabled", False)
+    assert client.get("/metrics").status_code == 404
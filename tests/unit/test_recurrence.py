@@ -0,0 +1,90 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from icalendar import Calendar
+
+from src.models import CSVEntry
+from src.settings import settings
+from src.utils.ical import csv_to_ical
+from src.utils.recurrence import collapse_series
+
+HEADER = "date,time,duration,location,name,description,timezone\n"
+
+
+def _entry(day: date, name: str = "Weekly", time: str = "18:00", duration: str = "1h") -> CSVEntry:
+    return CSVEntry(
+        date=day.strftime("%d.%m.%Y"), time=time, duration=duration, location="", name=name, description="x"
+    )
+
+
+def _weekly(start: date, weeks: int, skip: tuple[int, ...] = ()) -> list[CSVEntry]:
+    return [_entry(start + timedelta(weeks=i)) for i in range(weeks) if i not in skip]
+
+
+def test_collapse_weekly_series_with_gaps():
+    entries = [_entry(date(2025, 1, 1), name="Single")] + _weekly(date(2025, 1, 6), 10, skip=(3, 7))
+    events = collapse_series(entries)
+
+    assert [(e.name, r is not None) for e, r in events] == [("Single", False), ("Weekly", True)]
+    series, rule = events[1]
+    assert series.date_str == "06.01.2025"
+    assert (rule.freq, rule.interval, rule.count) == ("WEEKLY", 1, 10)
+    assert rule.exdates == (date(2025, 1, 27), date(2025, 2, 24))
+
+
+@pytest.mark.parametrize(
+    "days",
+    [
+        [date(2025, 1, 1), date(2025, 1, 2)],  # too few
+        [date(2025, 1, 1), date(2025, 1, 3), date(2025, 1, 6)],  # irregular
+        [date(2025, 1, 1), date(2025, 1, 2), date(2025, 1, 20)],  # mostly gaps
+        [date(2025, 1, 1), date(2025, 1, 1), date(2025, 1, 2)],  # duplicate day
+    ],
+)
+def test_irregular_rows_stay_single(days):
+    events = collapse_series([_entry(day) for day in days])
+    assert len(events) == len(days)
+    assert all(rule is None for _, rule in events)
+
+
+def test_daily_interval():
+    (_, rule), *_ = collapse_series([_entry(date(2025, 1, 1) + timedelta(days=3 * i)) for i in range(4)])
+    assert (rule.freq, rule.interval, rule.count) == ("DAILY", 3, 4)
+
+
+@pytest.mark.parametrize("serializer", ["icalendar", "fast"])
+def test_rendered_series_expands_to_original_occurrences(monkeypatch, tmp_path, serializer):
+    monkeypatch.setattr(settings, "recurrence_enabled", True)
+    monkeypatch.setattr(settings, "ical_serializer", serializer)
+    start = date(2025, 3, 3)  # spans the switch to summer time
+    rows = [
+        f"{(start + timedelta(weeks=i)).strftime('%d.%m.%Y')},18:00,1h,,Weekly,x,Europe/Berlin\n"
+        for i in range(8)
+        if i != 2
+    ]
+    csv_path = tmp_path / "cal.csv"
+    csv_path.write_text(HEADER + "".join(rows))
+
+    content = csv_to_ical(csv_path, "cal")
+    cal = Calendar.from_ical(content)
+    (event,) = cal.walk("VEVENT")
+
+    assert b"RRULE:FREQ=WEEKLY;COUNT=8\r\n" in content
+    assert b"EXDATE;TZID=Europe/Berlin:20250317T180000\r\n" in content
+    assert event["DTSTART"].dt == datetime(2025, 3, 3, 18, 0, tzinfo=event["DTSTART"].dt.tzinfo)
+
+    monkeypatch.setattr(settings, "recurrence_enabled", False)
+    expanded = Calendar.from_ical(csv_to_ical(csv_path, "cal")).walk("VEVENT")
+    assert event["UID"] == expanded[0]["UID"]
+    assert len(expanded) == 7
+
+
+def test_all_day_series_uses_date_exdates(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "recurrence_enabled", True)
+    rows = [f"0{day}.01.2025,00:00,1d,,Daily,x,Europe/Berlin\n" for day in (1, 2, 4, 5)]
+    csv_path = tmp_path / "cal.csv"
+    csv_path.write_text(HEADER + "".join(rows))
+
+    content = csv_to_ical(csv_path, "cal")
+    assert b"RRULE:FREQ=DAILY;COUNT=5\r\n" in content
+    assert b"EXDATE;VALUE=DATE:20250103\r\n" in content
@@ -0,0 +1,108 @@
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.settings import settings
+from src.utils.cache import RenderedCalendar, render_cache
+from src.utils.render import RenderPool, RenderQueueFullError
+
+CSV = "date,time,duration,location,name,description\n01.01.2025,10:00,1h,,Event,Desc\n"
+
+
+def _key(name: str) -> tuple:
+    return (name, 1, 1, ())
+
+
+def _slow_render(delay: float, calls: list):
+    def render(csv_path, calendar_name, last_modified, key=None):
+        calls.append(calendar_name)
+        time.sleep(delay)
+        return RenderedCalendar.from_content(calendar_name.encode(), last_modified)
+
+    return render
+
+
+def test_pool_coalesces_concurrent_renders(tmp_path):
+    calls = []
+    pool = RenderPool()
+
+    async def scenario():
+        return await asyncio.gather(*(pool.render(_key("a"), tmp_path / "a.csv", "a", 0.0) for _ in range(5)))
+
+    with patch("src.utils.render.render_calendar", _slow_render(0.05, calls)):
+        results = asyncio.run(scenario())
+    pool.shutdown()
+
+    assert calls == ["a"]
+    assert all(r is results[0] for r in results)
+    assert render_cache.get(_key("a")) is not None
+    assert pool.inflight == 0
+
+
+def test_pool_runs_off_the_event_loop(tmp_path):
+    threads = []
+    pool = RenderPool()
+
+    def render(csv_path, calendar_name, last_modified, key=None):
+        threads.append(threading.current_thread())
+        return RenderedCalendar.from_content(b"", last_modified)
+
+    async def scenario():
+        await pool.render(_key("a"), tmp_path / "a.csv", "a", 0.0)
+
+    with patch("src.utils.render.render_calendar", render):
+        asyncio.run(scenario())
+    pool.shutdown()
+
+    assert threads[0] is not threading.main_thread()
+
+
+def test_pool_rejects_when_queue_full(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "render_queue_size", 1)
+    pool = RenderPool()
+
+    async def scenario():
+        first = asyncio.ensure_future(pool.render(_key("a"), tmp_path / "a.csv", "a", 0.0))
+        await asyncio.sleep(0)
+        with pytest.raises(RenderQueueFullError):
+            await pool.render(_key("b"), tmp_path / "b.csv", "b", 0.0)
+        await first
+
+    with patch("src.utils.render.render_calendar", _slow_render(0.05, [])):
+        asyncio.run(scenario())
+    pool.shutdown()
+
+
+def test_pool_timeout_still_populates_cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "render_timeout", 0.01)
+    pool = RenderPool()
+
+    async def scenario():
+        with pytest.raises(TimeoutError):
+            await pool.render(_key("a"), tmp_path / "a.csv", "a", 0.0)
+        await asyncio.sleep(0.2)
+
+    with patch("src.utils.render.render_calendar", _slow_render(0.05, [])):
+        asyncio.run(scenario())
+    pool.shutdown()
+
+    assert render_cache.get(_key("a")) is not None
+
+
+def test_get_calendar_returns_503_on_timeout(monkeypatch, tmp_path):
+    from src.main import app
+
+    monkeypatch.setattr(settings, "data_dir", tmp_path)
+    monkeypatch.setattr(settings, "render_timeout", 0.01)
+    monkeypatch.setattr(settings, "admission_retry_after", 17)
+    (tmp_path / "cal.csv").write_text(CSV)
+
+    with patch("src.utils.render.render_calendar", _slow_render(0.1, [])):
+        response = TestClient(app).get("/cal.ics")
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "17"
@@ -0,0 +1,119 @@
+"""Conformance tests: the fast serializer must match the icalendar-based path."""
+
+import csv
+import re
+from unittest.mock import patch
+
+from hypothesis import given
+from hypothesis import settings as hyp_settings
+from hypothesis import strategies as st
+from icalendar import Calendar
+
+from src.settings import settings
+from src.utils.ical import csv_to_ical
+from src.utils.serializer import ICalWriter, escape_text, fold_line
+
+FIELDS = ["date", "time", "duration", "location_name", "location", "place", "name", "description", "timezone"]
+TIMEZONES = ["Europe/Berlin", "America/New_York", "Asia/Kolkata", "Australia/Lord_Howe", "UTC", "Etc/UTC", "GMT"]
+DTSTAMP = re.compile(rb"DTSTAMP:\d{8}T\d{6}Z\r\n")
+
+text = st.text(st.characters(exclude_categories=("Cs",), exclude_characters="\x00"), max_size=120)
+rows = st.lists(
+    st.fixed_dictionaries(
+        {
+            "date": st.dates().map(lambda d: d.strftime("%d.%m.%Y")).filter(lambda s: len(s) == 10),
+            "time": st.times().map(lambda t: t.strftime("%H:%M")),
+            "duration": st.sampled_from(["30min", "90min", "1h", "24h", "1d", "3d"]),
+            "location_name": text,
+            "location": text,
+            "place": text,
+            "name": text,
+            "description": text,
+            "timezone": st.sampled_from(TIMEZONES),
+        }
+    ),
+    max_size=5,
+)
+
+
+def _coords(address):
+    return None if len(address) % 3 == 0 else (len(address) / 7, -len(address) / 3)
+
+
+def _render_both(tmp_path, rows, calendar_name="Conformance"):
+    csv_file = tmp_path / "cal.csv"
+    with open(csv_file, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    with patch("src.utils.ical.lookup_coordinates", side_effect=_coords):
+        with patch.object(settings, "ical_serializer", "icalendar"):
+            reference = csv_to_ical(csv_file, calendar_name)
+        with patch.object(settings, "ical_serializer", "fast"):
+            fast = csv_to_ical(csv_file, calendar_name)
+    return reference, fast
+
+
+def _assert_equivalent(reference: bytes, fast: bytes):
+    assert DTSTAMP.sub(b"", fast) == DTSTAMP.sub(b"", reference)
+    ref_events = Calendar.from_ical(reference).walk("VEVENT")
+    fast_events = Calendar.from_ical(fast).walk("VEVENT")
+    assert len(ref_events) == len(fast_events)
+    for ref_event, fast_event in zip(ref_events, fast_events):
+        assert ref_event.keys() == fast_event.keys()
+        for key in ref_event:
+            if key != "DTSTAMP":
+                assert ref_event[key].to_ical() == fast_event[key].to_ical()
+                assert ref_event[key].params == fast_event[key].params
+
+
+def test_fast_serializer_matches_test_data(tmp_path):
+    rows = [
+        {
+            "date": "11.04.2026",
+            "time": "09:00",
+            "duration": "8h",
+            "location_name": 'Bäckerei; Muster, "x"',
+            "location": "Musterstraße 123 12345 Musterstadt",
+            "place": "Germany",
+            "name": "Test, Event; \\ x",
+            "description": "A long description with ümlauts äöü to force folding across lines, ok?\nSecond line",
+            "timezone": "America/New_York",
+        },
+        {
+            "date": "12.05.2024",
+            "time": "00:00",
+            "duration": "2d",
+            "location_name": "",
+            "location": "",
+            "place": "",
+            "name": "Holiday",
+            "description": "",
+            "timezone": "Europe/Berlin",
+        },
+    ]
+    _assert_equivalent(*_render_both(tmp_path, rows))
+
+
+@hyp_settings(max_examples=100, deadline=None)
+@given(rows=rows, calendar_name=text)
+def test_fast_serializer_conformance(tmp_path_factory, rows, calendar_name):
+    _assert_equivalent(*_render_both(tmp_path_factory.mktemp("conformance"), rows, calendar_name))
+
+
+def test_escape_text():
+    assert escape_text("a,b;c\\d\ne") == r"a\,b\;c\\d\ne"
+
+
+def test_fold_line_limits_octets():
+    line = "DESCRIPTION:" + "ä" * 100
+    for physical in fold_line(line).split("\r\n"):
+        assert len(physical.encode("utf-8")) <= 75
+    assert fold_line("SHORT:value") == "SHORT:value"
+
+
+def test_writer_quotes_parameters():
+    writer = ICalWriter()
+    writer.text("X-LOC", "geo:1,2", {"X-TITLE": 'A "B"', "VALUE": "URI", "X-APPLE-RADIUS": "70"})
+    assert writer.getvalue() == b"X-LOC;VALUE=URI;X-APPLE-RADIUS=70;X-TITLE=\"A ^'B^'\":geo:1\\,2\r\n"
@@ -106,7 +106,7 @@ def test_list_calendars_missing_data_dir(monkeypatch, tmp_path):
     monkeypatch.setattr(settings, "data_dir", missing_dir)
     response = client.get("/")
     assert response.status_code == 200
-    assert response.json() == {"calendars": []}
+    assert response.json() == {"calendars": [], "catalog": {}}
 
 
 def test_get_calendar_500_on_corrupt_csv(monkeypatch, tmp_path):
@@ -124,7 +124,7 @@ def test_list_calendars_empty_data_dir(monkeypatch, tmp_path):
     monkeypatch.setattr(settings, "data_dir", tmp_path)
     response = client.get("/")
     assert response.status_code == 200
-    assert response.json() == {"calendars": []}
+    assert response.json() == {"calendars": [], "catalog": {}}
 
 
 def test_get_calendar_content_type_is_text_calendar():
@@ -232,3 +232,13 @@ def test_path_traversal_fuzz(name):
     # inside the handler is the real security boundary.
     if ("/" not in name) and ("\\" in name):
         assert response.status_code == 400
+
+
+def test_get_calendar_etag_survives_rerender():
+    from src.utils.cache import render_cache
+
+    first = client.get("/birthdays.ics")
+    render_cache.clear()
+    second = client.get("/birthdays.ics")
+    assert second.headers["etag"] == first.headers["etag"]
+    assert second.content == first.content
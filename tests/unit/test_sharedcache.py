@@ -0,0 +1,188 @@
+import asyncio
+import os
+import pickle
+import shutil
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.main import app
+from src.settings import settings
+from src.utils.cache import RenderedCalendar, cache_key, render_cache
+from src.utils.geostore import get_geocode_store
+from src.utils.metrics import CACHE_REQUESTS, RENDER_SECONDS
+from src.utils.render import current_render, render_calendar, render_pool
+from src.utils.sharedcache import SharedRenderStore, get_shared_store
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+
+def _key(path: str = "/data/a.csv", mtime_ns: int = 1) -> tuple:
+    return (path, mtime_ns, 10, ("fingerprint",))
+
+
+@pytest.fixture
+def shared_dir(monkeypatch, tmp_path):
+    directory = tmp_path / "shared"
+    monkeypatch.setattr(settings, "shared_cache_dir", directory)
+    return directory
+
+
+def test_round_trip_preserves_payload_and_variants(tmp_path):
+    store = SharedRenderStore(tmp_path)
+    rendered = RenderedCalendar.from_content(
+        b"BEGIN:VCALENDAR", 12.5, unresolved=frozenset({"x"}), encodings={"gzip": b"zz", "br": b"b"}
+    )
+    store.put(_key(), rendered)
+
+    loaded = store.get(_key())
+    assert loaded.content == rendered.content
+    assert loaded.etag == rendered.etag
+    assert loaded.last_modified == 12.5
+    assert loaded.unresolved == {"x"}
+    assert loaded.encodings == {"gzip": b"zz", "br": b"b"}
+    assert list(loaded.encodings) == ["gzip", "br"]
+
+
+def test_stale_and_missing_versions_miss(tmp_path):
+    store = SharedRenderStore(tmp_path)
+    store.put(_key(), RenderedCalendar.from_content(b"v1", 0.0))
+    assert store.get(_key(mtime_ns=2)) is None
+    assert store.get(_key(path="/data/b.csv")) is None
+    store.discard("/data/a.csv")
+    assert store.get(_key()) is None
+
+
+def test_corrupt_entry_is_ignored(tmp_path):
+    store = SharedRenderStore(tmp_path)
+    store.put(_key(), RenderedCalendar.from_content(b"payload", 0.0))
+    (entry,) = tmp_path.glob("*.ics")
+    entry.write_bytes(entry.read_bytes()[:20])
+    assert store.get(_key()) is None
+
+
+def test_entry_without_stamp_is_ignored(tmp_path):
+    store = SharedRenderStore(tmp_path)
+    store.put(_key(), RenderedCalendar.from_content(b"payload", 0.0))
+    (entry,) = tmp_path.glob("*.ics")
+    data = entry.read_bytes()
+    entry.write_bytes(data.replace(b'"stamp"', b'"stomp"'))
+    assert store.get(_key()) is None
+
+
+def test_get_or_render_renders_once(tmp_path):
+    store = SharedRenderStore(tmp_path)
+    calls = []
+
+    def render():
+        calls.append(1)
+        return RenderedCalendar.from_content(b"payload", 0.0)
+
+    first = store.get_or_render(_key(), render)
+    second = store.get_or_render(_key(), render)
+    assert len(calls) == 1
+    assert first.etag == second.etag
+
+
+def test_get_shared_store_follows_settings(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "shared_cache_dir", None)
+    assert get_shared_store() is None
+    monkeypatch.setattr(settings, "shared_cache_dir", tmp_path)
+    assert get_shared_store().directory == tmp_path
+
+
+def test_render_calendar_reuses_other_workers_render(monkeypatch, shared_dir, tmp_path):
+    monkeypatch.setattr(settings, "geocode_enabled", False)
+    csv_path = tmp_path / "birthdays.csv"
+    shutil.copy(DATA_DIR / "birthdays.csv", csv_path)
+    key = cache_key(csv_path, os.stat(csv_path))
+
+    first = render_calendar(csv_path, "birthdays", 0.0, key)
+    with patch("src.utils.render.csv_to_ical") as convert:
+        second = render_calendar(csv_path, "birthdays", 0.0, key)
+    convert.assert_not_called()
+    assert second.content == first.content
+
+
+def test_render_calendar_refreshes_when_coordinates_arrive(monkeypatch, shared_dir, tmp_path):
+    csv_path = tmp_path / "birthdays.csv"
+    shutil.copy(DATA_DIR / "birthdays.csv", csv_path)
+    key = cache_key(csv_path, os.stat(csv_path))
+
+    first = render_calendar(csv_path, "birthdays", 0.0, key)
+    assert first.unresolved
+    for address in first.unresolved:
+        get_geocode_store().put(address, (52.5, 13.4))
+
+    refreshed = render_calendar(csv_path, "birthdays", 0.0, key)
+    assert not refreshed.unresolved
+    assert b"GEO:52.5;13.4" in refreshed.content
+
+
+def test_hits_are_views_of_one_kept_open_mapping(tmp_path):
+    store = SharedRenderStore(tmp_path)
+    store.put(_key(), RenderedCalendar.from_content(b"payload", 0.0, encodings={"gzip": b"zz"}))
+
+    first, second = store.get(_key()), store.get(_key())
+    assert isinstance(first.content, memoryview) and first.content.readonly
+    assert second is first
+    # Views are copied only when sent to another process.
+    assert pickle.loads(pickle.dumps(first)).content == b"payload"
+
+    store.put(_key(mtime_ns=2), RenderedCalendar.from_content(b"v2", 0.0))
+    assert store.get(_key(mtime_ns=2)).content == b"v2"
+    assert first.content == b"payload"
+
+
+def test_pool_serves_shared_hits_without_rendering_or_local_copy(monkeypatch, shared_dir, tmp_path):
+    monkeypatch.setattr(settings, "geocode_enabled", False)
+    csv_path = tmp_path / "birthdays.csv"
+    shutil.copy(DATA_DIR / "birthdays.csv", csv_path)
+    stat = os.stat(csv_path)
+    key = cache_key(csv_path, stat)
+
+    async def render():
+        return await render_pool.render(key, csv_path, "birthdays", stat.st_mtime)
+
+    asyncio.run(render())
+    assert render_cache.peek(key) is None
+    count = RENDER_SECONDS.count(calendar="birthdays")
+    with patch.object(render_pool, "_submit") as submit:
+        rendered = asyncio.run(render())
+    submit.assert_not_called()
+    assert isinstance(rendered.content, memoryview)
+    assert RENDER_SECONDS.count(calendar="birthdays") == count
+
+
+def test_route_counts_shared_hits(monkeypatch, shared_dir):
+    monkeypatch.setattr(settings, "data_dir", DATA_DIR)
+    monkeypatch.setattr(settings, "geocode_enabled", False)
+    client = TestClient(app)
+    client.get("/birthdays.ics")
+    hits, misses = CACHE_REQUESTS.value(result="hit"), CACHE_REQUESTS.value(result="miss")
+
+    assert client.get("/birthdays.ics").status_code == 200
+
+    assert CACHE_REQUESTS.value(result="hit") == hits + 1
+    assert CACHE_REQUESTS.value(result="miss") == misses
+
+
+def test_shared_staleness_is_checked_off_the_event_loop(monkeypatch, shared_dir, tmp_path):
+    csv_path = tmp_path / "birthdays.csv"
+    shutil.copy(DATA_DIR / "birthdays.csv", csv_path)
+    stat = os.stat(csv_path)
+    key = cache_key(csv_path, stat)
+    assert render_calendar(csv_path, "birthdays", 0.0, key).unresolved
+    loop_thread = threading.get_ident()
+    checked_in = []
+
+    def has_new_coordinates(rendered):
+        checked_in.append(threading.get_ident())
+        return False
+
+    monkeypatch.setattr("src.utils.render._has_new_coordinates", has_new_coordinates)
+    assert asyncio.run(current_render(key)) is not None
+    assert checked_in and loop_thread not in checked_in
@@ -0,0 +1,110 @@
+import csv
+import os
+import re
+from unittest.mock import patch
+
+import pytest
+from pydantic import ValidationError
+
+from src.models import CSVEntry
+from src.settings import settings
+from src.utils.ical import csv_to_ical
+from src.utils.snapshot import compile_snapshot, ensure_snapshot, load_snapshot, snapshot_path
+
+CSV = (
+    "date,time,duration,location_name,location,name,description,timezone\n"
+    "12.05.2024,00:00,1d,,,Holiday,A full day holiday,Europe/Berlin\n"
+    "13.05.2024,09:30,90min,Congress Center,Musterplatz 1 12345 Musterstadt,Talk,Ümlaut description,Asia/Tokyo\n"
+    "14.05.2024,09:30,90min,Congress Center,Musterplatz 1 12345 Musterstadt,Talk,Ümlaut description,Asia/Tokyo\n"
+)
+DTSTAMP = re.compile(rb"DTSTAMP:\d{8}T\d{6}Z\r\n")
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / "cal.csv"
+    path.write_text(CSV)
+    return path
+
+
+def test_snapshot_roundtrip(csv_file):
+    compile_snapshot(csv_file)
+    snapshot = load_snapshot(csv_file)
+
+    assert snapshot is not None
+    assert snapshot.rows == 3
+    assert list(snapshot.all_day) == [1, 0, 0]
+    assert list(snapshot.duration) == [86400, 5400, 5400]
+    assert snapshot.start[1] == 1715560200  # 2024-05-13 09:30 Asia/Tokyo
+    # Identical values are interned once.
+    assert len(snapshot.strings) < 3 * 9
+
+    with open(csv_file, encoding="utf-8") as f:
+        expected = [CSVEntry(**row) for row in csv.DictReader(f)]
+    assert list(snapshot.entries()) == expected
+
+
+def test_snapshot_is_written_to_cache_dir(csv_file):
+    path = compile_snapshot(csv_file)
+    assert path == snapshot_path(csv_file)
+    assert path.parent == settings.cache_dir / "snapshots"
+    assert path.exists()
+    assert not list(csv_file.parent.glob("*.snapshot"))
+
+
+def test_snapshots_of_same_named_calendars_do_not_collide(tmp_path, csv_file):
+    other = tmp_path / "other" / "cal.csv"
+    other.parent.mkdir()
+    other.write_text(CSV.splitlines(keepends=True)[0] + CSV.splitlines(keepends=True)[1])
+    compile_snapshot(csv_file)
+    compile_snapshot(other)
+    assert load_snapshot(csv_file).rows == 3
+    assert load_snapshot(other).rows == 1
+
+
+def test_snapshot_is_stale_after_csv_change(csv_file):
+    compile_snapshot(csv_file)
+    csv_file.write_text(CSV + "15.05.2024,10:00,1h,,,Extra,Desc,Europe/Berlin\n")
+    os.utime(csv_file, ns=(0, os.stat(csv_file).st_mtime_ns + 1_000_000_000))
+    assert load_snapshot(csv_file) is None
+    assert ensure_snapshot(csv_file).rows == 4
+
+
+def test_snapshot_is_stale_after_settings_change(monkeypatch, csv_file):
+    compile_snapshot(csv_file)
+    monkeypatch.setattr(settings, "default_place", "Austria")
+    assert load_snapshot(csv_file) is None
+
+
+def test_corrupt_snapshot_is_ignored(csv_file):
+    compile_snapshot(csv_file)
+    path = snapshot_path(csv_file)
+    path.write_bytes(path.read_bytes()[:40])
+    assert load_snapshot(csv_file) is None
+
+
+def test_compile_snapshot_validates_rows(tmp_path):
+    bad = tmp_path / "bad.csv"
+    bad.write_text("date,time,duration,name\n01.01.2025,10:00,1h,Missing columns\n")
+    with pytest.raises(ValidationError):
+        compile_snapshot(bad)
+    assert not snapshot_path(bad).exists()
+
+
+def test_ensure_snapshot_tolerates_unwritable_directory(csv_file):
+    with patch("src.utils.snapshot.tempfile.mkstemp", side_effect=PermissionError("read-only")):
+        assert ensure_snapshot(csv_file) is None
+
+
+def test_rendering_from_snapshot_matches_csv(monkeypatch, csv_file):
+    monkeypatch.setattr(settings, "geocode_enabled", False)
+    monkeypatch.setattr(settings, "snapshot_enabled", False)
+    from_csv = csv_to_ical(csv_file, "cal")
+
+    monkeypatch.setattr(settings, "snapshot_enabled", True)
+    compile_snapshot(csv_file)
+    with patch("src.utils.ingest.csv.DictReader") as reader:
+        from_snapshot = csv_to_ical(csv_file, "cal")
+        reader.assert_not_called()
+
+    assert DTSTAMP.sub(b"", from_snapshot) == DTSTAMP.sub(b"", from_csv)
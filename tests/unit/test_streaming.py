@@ -0,0 +1,61 @@
+import re
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from icalendar import Calendar
+
+from src.main import app
+from src.settings import settings
+from src.utils.ical import csv_to_ical, iter_ical
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+DTSTAMP = re.compile(rb"DTSTAMP:\d{8}T\d{6}Z\r\n")
+
+
+@pytest.mark.parametrize("serializer", ["icalendar", "fast"])
+def test_iter_ical_chunks_concatenate_to_csv_to_ical(monkeypatch, serializer):
+    monkeypatch.setattr(settings, "ical_serializer", serializer)
+    monkeypatch.setattr(settings, "geocode_enabled", False)
+    csv_path = DATA_DIR / "birthdays.csv"
+
+    chunks = list(iter_ical(csv_path, "birthdays"))
+
+    assert chunks[0].startswith(b"BEGIN:VCALENDAR\r\n")
+    assert b"BEGIN:VEVENT" not in chunks[0]
+    assert chunks[-1] == b"END:VCALENDAR\r\n"
+    assert chunks[-2].startswith(b"BEGIN:VTIMEZONE")
+    assert all(chunk.startswith(b"BEGIN:VEVENT") for chunk in chunks[1:-2])
+    assert len(chunks) == 3 + len(Calendar.from_ical(b"".join(chunks)).walk("VEVENT"))
+    assert DTSTAMP.sub(b"", b"".join(chunks)) == DTSTAMP.sub(b"", csv_to_ical(csv_path, "birthdays"))
+
+
+def test_iter_ical_is_lazy(tmp_path):
+    chunks = iter_ical(tmp_path / "missing.csv", "missing")
+    with pytest.raises(FileNotFoundError):
+        list(chunks)
+
+
+def test_large_calendar_is_streamed(monkeypatch):
+    monkeypatch.setattr(settings, "data_dir", DATA_DIR)
+    monkeypatch.setattr(settings, "stream_threshold_bytes", 1)
+    client = TestClient(app)
+
+    response = client.get("/birthdays.ics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/calendar")
+    assert "etag" not in response.headers
+    assert "Emma Müller" in response.text
+    assert response.text.endswith("END:VCALENDAR\r\n")
+
+    conditional = client.get("/birthdays.ics", headers={"If-Modified-Since": response.headers["last-modified"]})
+    assert conditional.status_code == 304
+
+
+def test_streamed_calendar_reports_parse_errors(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "data_dir", tmp_path)
+    monkeypatch.setattr(settings, "stream_threshold_bytes", 1)
+    (tmp_path / "bad.csv").write_text("date,time,duration,location,name,description\nnot-a-date,x,1h,,Bad,Desc\n")
+
+    response = TestClient(app).get("/bad.ics")
+    assert response.status_code == 500
@@ -0,0 +1,74 @@
+from pathlib import Path
+
+import pytest
+from icalendar import Calendar
+
+from src.models import CSVEntry
+from src.settings import settings
+from src.utils.ical import csv_to_ical
+from src.utils.timezones import TimezoneTracker, tzid_for, vtimezone
+
+HEADER = "date,time,duration,location,name,description,timezone\n"
+
+
+def _calendar(tmp_path: Path, body: str) -> Path:
+    path = tmp_path / "cal.csv"
+    path.write_text(HEADER + body, encoding="utf-8")
+    return path
+
+
+def test_tzid_for_utc_is_none():
+    assert tzid_for("UTC") is None
+    assert tzid_for("Europe/Berlin") == "Europe/Berlin"
+
+
+def test_vtimezone_is_limited_to_span_and_memoised():
+    component = vtimezone("Europe/Berlin", 2024, 2024)
+    assert component is vtimezone("Europe/Berlin", 2024, 2024)
+    (timezone,) = Calendar.from_ical(b"BEGIN:VCALENDAR\r\n" + component + b"END:VCALENDAR\r\n").walk("VTIMEZONE")
+    starts = [sub["DTSTART"].dt.year for sub in timezone.subcomponents]
+    assert set(starts) == {2024}
+
+
+def test_tracker_ignores_all_day_and_merges_years():
+    def entry(date, duration, zone):
+        return CSVEntry(
+            date=date, time="10:00", duration=duration, location="", name="n", description="", timezone=zone
+        )
+
+    tracker = TimezoneTracker()
+    entries = [
+        entry("01.01.2023", "1h", "Europe/Berlin"),
+        entry("01.01.2026", "1h", "Europe/Berlin"),
+        entry("01.01.2020", "1d", "Asia/Tokyo"),
+        entry("01.01.2024", "1h", "UTC"),
+    ]
+    assert list(tracker.track(entries)) == entries
+    components = tracker.components()
+    assert components.count(b"BEGIN:VTIMEZONE") == 1
+    # Events may run into the year after the last one that starts.
+    assert components == vtimezone("Europe/Berlin", 2023, 2027)
+
+
+@pytest.mark.parametrize("serializer", ["icalendar", "fast"])
+def test_calendar_includes_each_zone_once(monkeypatch, tmp_path, serializer):
+    monkeypatch.setattr(settings, "geocode_enabled", False)
+    monkeypatch.setattr(settings, "ical_serializer", serializer)
+    path = _calendar(
+        tmp_path,
+        "01.03.2025,09:00,1h,,A,x,Europe/Berlin\n"
+        "02.03.2025,09:00,1h,,B,x,Europe/Berlin\n"
+        "03.03.2025,09:00,1h,,C,x,America/New_York\n"
+        "04.03.2025,09:00,1h,,D,x,UTC\n"
+        "05.03.2025,00:00,1d,,E,x,Asia/Tokyo\n",
+    )
+    cal = Calendar.from_ical(csv_to_ical(path, "cal"))
+    assert sorted(str(tz["TZID"]) for tz in cal.walk("VTIMEZONE")) == ["America/New_York", "Europe/Berlin"]
+    assert not cal.get_missing_tzids()
+
+
+def test_vtimezone_can_be_disabled(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "geocode_enabled", False)
+    monkeypatch.setattr(settings, "vtimezone_enabled", False)
+    path = _calendar(tmp_path, "01.03.2025,09:00,1h,,A,x,Europe/Berlin\n")
+    assert b"VTIMEZONE" not in csv_to_ical(path, "cal")
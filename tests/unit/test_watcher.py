@@ -0,0 +1,95 @@
+import asyncio
+import os
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.settings import settings
+from src.utils.cache import cache_key, render_cache
+from src.utils.metrics import CACHE_REQUESTS
+from src.utils.watcher import DataDirWatcher, scan_directory
+
+CSV = "date,time,duration,location,name,description\n01.01.2025,10:00,1h,,Event,Desc\n"
+
+
+def _is_cached(path):
+    return render_cache.peek(cache_key(path.resolve(), os.stat(path))) is not None
+
+
+def test_scan_directory_lists_csv_files_only(tmp_path):
+    (tmp_path / "a.csv").write_text(CSV)
+    (tmp_path / ".a.snapshot").write_bytes(b"")
+    (tmp_path / "notes.txt").write_text("")
+    assert set(scan_directory(tmp_path)) == {"a"}
+    assert scan_directory(tmp_path / "missing") == {}
+
+
+def test_refresh_indexes_and_prerenders(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "geocode_enabled", False)
+    csv_file = tmp_path / "a.csv"
+    csv_file.write_text(CSV)
+    watcher = DataDirWatcher(tmp_path)
+    watcher.directory = tmp_path
+    requests = CACHE_REQUESTS.value(result="hit"), CACHE_REQUESTS.value(result="miss")
+
+    async def scenario():
+        assert await watcher.refresh() == {"a"}
+        assert _is_cached(csv_file)
+        assert await watcher.refresh() == set()
+
+        csv_file.write_text(CSV.replace("Event", "Edited"))
+        os.utime(csv_file, ns=(0, os.stat(csv_file).st_mtime_ns + 1_000_000_000))
+        (tmp_path / "b.csv").write_text(CSV)
+        assert await watcher.refresh() == {"a", "b"}
+        assert _is_cached(csv_file)
+
+        csv_file.unlink()
+        assert await watcher.refresh() == {"a"}
+
+    asyncio.run(scenario())
+    assert watcher.calendars == ["b"]
+    assert len(render_cache) == 1
+    # Pre-rendering is not a client request.
+    assert (CACHE_REQUESTS.value(result="hit"), CACHE_REQUESTS.value(result="miss")) == requests
+
+
+@pytest.mark.parametrize("inotify", [True, False], ids=["inotify", "polling"])
+def test_watcher_picks_up_new_files(monkeypatch, tmp_path, inotify):
+    monkeypatch.setattr(settings, "geocode_enabled", False)
+    monkeypatch.setattr(settings, "watch_poll_interval", 0.05)
+    if not inotify:
+        monkeypatch.setattr("src.utils.watcher._open_inotify", lambda directory: None)
+    watcher = DataDirWatcher(tmp_path)
+
+    async def scenario():
+        watcher.start()
+        await asyncio.sleep(0.1)
+        (tmp_path / "late.csv").write_text(CSV)
+        for _ in range(100):
+            if watcher.calendars:
+                break
+            await asyncio.sleep(0.05)
+        await watcher.stop()
+
+    asyncio.run(scenario())
+    assert watcher.calendars == ["late"]
+    assert not watcher.running
+
+
+def test_list_calendars_served_from_watcher_index(monkeypatch, tmp_path):
+    from src.main import app
+
+    monkeypatch.setattr(settings, "data_dir", tmp_path)
+    monkeypatch.setattr(settings, "geocode_enabled", False)
+    (tmp_path / "indexed.csv").write_text(CSV)
+
+    with TestClient(app) as client:
+        for _ in range(100):
+            if client.get("/").json()["calendars"] == ["indexed"] and _is_cached(tmp_path / "indexed.csv"):
+                break
+            time.sleep(0.05)
+        listing = client.get("/").json()
+        assert listing["calendars"] == ["indexed"]
+        assert _is_cached(tmp_path / "indexed.csv")
+        assert listing["catalog"]["indexed"]["etag"] is not None
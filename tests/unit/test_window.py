@@ -0,0 +1,118 @@
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+import pytz
+from fastapi.testclient import TestClient
+from icalendar import Calendar
+
+from src.main import app
+from src.settings import settings
+from src.utils.window import CalendarIndex, build_index, clear_indexes, parse_timestamp
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def data_dir(monkeypatch, tmp_path):
+    for name in ("birthdays.csv", "allday.csv"):
+        shutil.copy(DATA_DIR / name, tmp_path / name)
+    monkeypatch.setattr(settings, "data_dir", tmp_path)
+    monkeypatch.setattr(settings, "geocode_enabled", False)
+    clear_indexes()
+    yield tmp_path
+    clear_indexes()
+
+
+def _summaries(response) -> list[str]:
+    return [str(event["SUMMARY"]) for event in Calendar.from_ical(response.content).walk("VEVENT")]
+
+
+def _ts(value: str) -> float:
+    return pytz.timezone("Europe/Berlin").localize(datetime.fromisoformat(value)).timestamp()
+
+
+def test_window_includes_overlapping_events():
+    index = CalendarIndex([30, 10, 20], [5, 15, 1], lambda i: i)
+    assert index.window(None, None) == [1, 2, 0]
+    assert index.window(21, None) == [1, 0]
+    assert index.window(None, 20) == [1]
+    assert index.window(26, 31) == [0]
+
+
+@pytest.mark.parametrize("snapshot_enabled", [True, False])
+def test_build_index_from_csv_and_snapshot(monkeypatch, data_dir, snapshot_enabled):
+    monkeypatch.setattr(settings, "snapshot_enabled", snapshot_enabled)
+    index = build_index(data_dir / "allday.csv")
+    names = [entry.name for entry in index.window(_ts("2024-05-16T00:00"), _ts("2024-05-17T00:00"))]
+    assert names == ["Long Event"]
+
+
+def test_parse_timestamp_formats():
+    assert parse_timestamp("2024-05-10") == _ts("2024-05-10T00:00")
+    assert parse_timestamp("20240510") == _ts("2024-05-10T00:00")
+    assert parse_timestamp("2024-05-10T09:00") == _ts("2024-05-10T09:00")
+    assert parse_timestamp("20240510T070000Z") == _ts("2024-05-10T09:00")
+    assert parse_timestamp("2024-05-10T07:00:00Z") == _ts("2024-05-10T09:00")
+    with pytest.raises(ValueError):
+        parse_timestamp("next tuesday")
+
+
+def test_from_to_query_filters_events(data_dir):
+    full = _summaries(client.get("/birthdays.ics"))
+    windowed = client.get("/birthdays.ics", params={"from": "2024-05-15", "to": "2024-06-10"})
+    assert windowed.status_code == 200
+    assert _summaries(windowed) == ["Lukas Schmidt", "Sarah Wagner"]
+    assert set(_summaries(windowed)) < set(full)
+    assert windowed.headers["etag"] != client.get("/birthdays.ics").headers["etag"]
+
+    again = client.get(
+        "/birthdays.ics",
+        params={"from": "2024-05-15", "to": "2024-06-10"},
+        headers={"If-None-Match": windowed.headers["etag"]},
+    )
+    assert again.status_code == 304
+
+
+def test_since_returns_no_events_when_unchanged(data_dir):
+    mtime = os.stat(data_dir / "birthdays.csv").st_mtime
+    later = datetime.fromtimestamp(mtime + 60, pytz.utc).strftime("%Y%m%dT%H%M%SZ")
+    earlier = datetime.fromtimestamp(mtime - 60, pytz.utc).strftime("%Y%m%dT%H%M%SZ")
+
+    unchanged = client.get("/birthdays.ics", params={"since": later})
+    changed = client.get("/birthdays.ics", params={"since": earlier})
+
+    assert unchanged.status_code == 200
+    assert _summaries(unchanged) == []
+    assert _summaries(changed) == _summaries(client.get("/birthdays.ics"))
+
+
+def test_since_served_dtstamp_returns_no_events(data_dir):
+    csv_path = data_dir / "birthdays.csv"
+    os.utime(csv_path, (1700000000.7, 1700000000.7))
+    served = client.get("/birthdays.ics")
+    (dtstamp,) = {
+        str(event.get("DTSTAMP").to_ical(), "ascii") for event in Calendar.from_ical(served.content).walk("VEVENT")
+    }
+
+    delta = client.get("/birthdays.ics", params={"since": dtstamp})
+    assert delta.status_code == 200
+    assert _summaries(delta) == []
+
+
+def test_invalid_query_date_is_rejected(data_dir):
+    response = client.get("/birthdays.ics", params={"from": "soon"})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("params", [{"from": "0001-01-01"}, {"to": "9999-12-31T23:59"}, {"since": "00010101"}])
+def test_out_of_range_query_date_is_rejected(data_dir, params):
+    with pytest.raises(ValueError):
+        parse_timestamp(next(iter(params.values())))
+    assert client.get("/birthdays.ics", params=params).status_code == 400
+    if "since" not in params:
+        assert client.get("/birthdays/events", params=params).status_code == 400